@@ -0,0 +1,71 @@
+"""Compare one browser per job against the warm BrowserPool.
+
+The old Selenium scraper launched Chrome for every scraper, loaded pages
+one at a time and downloaded every image, stylesheet and font. Both
+setups load the same stand-in pages. Needs Chrome and selenium.
+
+    python -m benchmarks.bench_browser --jobs 4 --pages 5 --workers 3
+"""
+
+import argparse
+import logging
+import time
+
+from bs4 import BeautifulSoup
+
+from benchmarks.stand_in_server import StandInServer
+from core.browser_pool import BrowserPool, BrowserWorker
+
+def job_urls(server_url, job, pages):
+    return [f"{server_url}/search?search_terms=term+{job}&page={page}" for page in range(1, pages + 1)]
+
+def count_cards(html):
+    return len(BeautifulSoup(html, 'lxml').find_all('div', class_='result'))
+
+def run_per_job_browser(server_url, jobs, pages):
+    cards = 0
+    for job in range(jobs):
+        worker = BrowserWorker(block_resources=False, max_pages=pages + 1)
+        worker.start()
+        try:
+            for url in job_urls(server_url, job, pages):
+                cards += count_cards(worker.get(url))
+        finally:
+            worker.stop()
+    return cards
+
+def run_pool(server_url, jobs, pages, workers):
+    cards = 0
+    with BrowserPool(workers=workers, delay_range=(0, 0), max_pages_per_driver=pages * 2) as pool:
+        urls = [url for job in range(jobs) for url in job_urls(server_url, job, pages)]
+        for response in pool.fetch_many(urls):
+            cards += count_cards(response.content) if response else 0
+    return cards
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=4, help='scraper jobs (search terms)')
+    parser.add_argument('--pages', type=int, default=5, help='pages per job')
+    parser.add_argument('--workers', type=int, default=3, help='browsers in the pool')
+    parser.add_argument('--latency', type=float, default=0.1, help='server latency per page (s)')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    total_pages = args.jobs * args.pages
+
+    with StandInServer(latency=args.latency, total_pages=args.pages) as server:
+        for name, run in (
+            ('per-job browser', lambda: run_per_job_browser(server.url, args.jobs, args.pages)),
+            ('browser pool', lambda: run_pool(server.url, args.jobs, args.pages, args.workers)),
+        ):
+            server.httpd.asset_requests = 0
+            server.httpd.asset_bytes = 0
+            start = time.perf_counter()
+            cards = run()
+            elapsed = time.perf_counter() - start
+            print(f"{name:>15}: {total_pages / elapsed:6.2f} pages/s, {cards} cards, "
+                  f"{server.httpd.asset_bytes / total_pages / 1024:6.1f} KiB of assets per page "
+                  f"({server.httpd.asset_requests} asset requests)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""End-to-end run against the stand-in server, tracked across commits.
+
+Scrapes --terms search terms through TermScheduler, then verifies an
+address per scraped domain, and reports pages/s, cards/s, p95 fetch
+latency, verifications/s and peak RSS. Each run is appended to
+benchmarks/results/history.jsonl under the current commit and compared
+with the last run that used the same arguments.
+
+    python -m benchmarks.bench_e2e --terms 8 --pages 5 --jitter 0.1 --error-rate 0.02
+
+Use --fixtures benchmarks/fixtures to parse pages recorded from the live
+site (see record_fixtures.py) instead of the rendered stand-in pages.
+"""
+
+import argparse
+import json
+import logging
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.stand_in_server import StandInServer
+from config import settings
+from core.email_verifier import EmailVerifier
+from core.metrics import metrics
+from core.scheduler import TermScheduler
+from utils.data_cleaner import extract_domain
+
+HISTORY = Path(__file__).parent / 'results' / 'history.jsonl'
+# Lower is better for these; higher for the rest
+LOWER_IS_BETTER = ('p95_fetch_seconds', 'peak_rss_mb')
+
+def git_revision():
+    try:
+        sha = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f"{sha}-dirty" if dirty else sha
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return round(peak * scale / 2 ** 20, 1)
+
+def run_scrape(args):
+    scheduler = TermScheduler(workers=args.workers, pages_to_scrape=args.pages, use_checkpoints=False)
+    terms = [f"term {i}" for i in range(args.terms)]
+    leads = []
+    start = time.perf_counter()
+    try:
+        for _, term_leads in scheduler.run(terms):
+            leads.extend(term_leads)
+    finally:
+        scheduler.close()
+    return leads, time.perf_counter() - start
+
+def run_verify(server_url, leads):
+    domains = {extract_domain(lead.get('website') or '') for lead in leads} - {''}
+    verifier = EmailVerifier(api_key='bench', api_base=f"{server_url}/v2", use_cache=False)
+    start = time.perf_counter()
+    try:
+        verified = verifier.verify_many(f"info@{domain}" for domain in domains)
+    finally:
+        verifier.close()
+    return len(verified), time.perf_counter() - start
+
+def previous_run(params):
+    if not HISTORY.exists():
+        return None
+    last = None
+    for line in HISTORY.read_text().splitlines():
+        entry = json.loads(line)
+        if entry['params'] == params:
+            last = entry
+    return last
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--terms', type=int, default=8)
+    parser.add_argument('--pages', type=int, default=5, help='result pages per term')
+    parser.add_argument('--workers', type=int, default=4, help='term workers')
+    parser.add_argument('--latency', type=float, default=0.05, help='server latency per request (s)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra random latency, up to (s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests failed')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--fixtures', type=Path, help='directory of recorded result pages')
+    parser.add_argument('--no-history', action='store_true', help="don't record this run")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+    tmp = Path(tempfile.mkdtemp())
+    # Measure the crawl itself: no cache, no politeness delays, no early stop
+    settings.HTTP_CACHE_ENABLED = False
+    settings.HOST_RATE_LIMIT = settings.ADAPTIVE_MAX_RATE = 1000
+    settings.HOST_BURST = 50
+    settings.RETRY_BACKOFF_BASE = 0.01
+    settings.SEEN_PAGES_CUTOFF = 0
+    settings.HUNTER_RATE_LIMIT = 1000
+    settings.HUNTER_CACHE_DB = tmp / 'hunter_cache.db'
+    settings.METRICS_DIR = tmp / 'metrics'
+
+    params = {name: str(value) if isinstance(value, Path) else value
+              for name, value in vars(args).items() if name != 'no_history'}
+    with StandInServer(latency=args.latency, total_pages=args.pages, jitter=args.jitter,
+                       error_rate=args.error_rate, error_status=args.error_status,
+                       fixtures_dir=args.fixtures) as server:
+        settings.YELLOW_PAGES_BASE_URL = server.url
+        metrics.reset()
+        leads, scrape_seconds = run_scrape(args)
+        summary = metrics.summary()
+        errors_injected = server.httpd.errors_injected
+        verified, verify_seconds = run_verify(server.url, leads)
+
+    counters = summary['counters']
+    fetch_timing = summary['timings'].get('fetch_seconds', {})
+    results = {
+        'pages_per_second': round(counters.get('pages_parsed', 0) / scrape_seconds, 2),
+        'cards_per_second': round(counters.get('cards_parsed', 0) / scrape_seconds, 2),
+        'p95_fetch_seconds': fetch_timing.get('p95'),
+        'verifications_per_second': round(verified / verify_seconds, 2) if verify_seconds else None,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    print(f"{len(leads)} leads, {counters.get('pages_parsed', 0)} pages, "
+          f"{counters.get('fetch_retries', 0)} retries ({errors_injected} injected errors), "
+          f"{verified} verifications")
+
+    previous = previous_run(params)
+    for name, value in results.items():
+        line = f"{name:>25}: {value}"
+        old = previous['results'].get(name) if previous else None
+        if value is not None and old:
+            change = (value - old) / old * 100
+            better = change < 0 if name in LOWER_IS_BETTER else change > 0
+            line += f"  ({change:+.1f}% vs {previous['revision']}{'' if better or not change else ', worse'})"
+        print(line)
+
+    if not args.no_history:
+        HISTORY.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            'revision': git_revision(),
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+            'params': params,
+            'results': results,
+        }
+        with open(HISTORY, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Compare pages/s of the sync and async fetch backends.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_fetch --terms 4 --pages 5 --latency 0.2
+"""
+
+import argparse
+import logging
+import time
+
+from benchmarks.stand_in_server import StandInServer
+from core.rate_limiter import HostRateLimiter
+from scrapers.yellow_pages_scraper import YellowPagesScraper
+
+def run_backend(backend, server_url, terms, pages, host_rate):
+    limiter = HostRateLimiter(host_rate, capacity=host_rate)
+    start = time.perf_counter()
+    fetched = 0
+    for i in range(terms):
+        # No response cache: the second backend would be served the first one's pages
+        scraper = YellowPagesScraper(f"term {i}", backend=backend, rate_limiter=limiter, cache=False)
+        scraper.base_url = server_url
+        try:
+            scraper.search_companies(pages_to_scrape=pages)
+        finally:
+            scraper.close()
+        fetched += pages
+    elapsed = time.perf_counter() - start
+    return fetched / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--terms', type=int, default=4)
+    parser.add_argument('--pages', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.2, help='server latency per page (s)')
+    parser.add_argument('--host-rate', type=float, default=50, help='per-host requests/s')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with StandInServer(latency=args.latency, total_pages=args.pages) as server:
+        for backend in ('sync', 'async'):
+            rate = run_backend(backend, server.url, args.terms, args.pages, args.host_rate)
+            print(f"{backend:>5}: {rate:8.1f} pages/s")
+
+if __name__ == '__main__':
+    main()
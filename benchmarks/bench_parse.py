@@ -0,0 +1,76 @@
+"""Measure cards/s of each result-page parser backend.
+
+Parses saved result pages (for example the HTTP cache bodies) or, when
+no directory is given, pages rendered by the stand-in server. Both
+backends must produce identical output or the benchmark fails. With
+--workers the pages also go through a ParsePool of each size, to show
+how the parse stage scales with cores.
+
+    python -m benchmarks.bench_parse --pages-dir data/http_cache/bodies
+    python -m benchmarks.bench_parse --pages 400 --workers 1 2 4 8
+"""
+
+import argparse
+import logging
+import time
+from pathlib import Path
+
+from benchmarks.stand_in_server import render_results_page
+from core.parse_pool import ParsePool
+from scrapers.parsers import PARSERS
+from scrapers.yellow_pages_scraper import parse_result_page_in_worker
+
+def load_pages(pages_dir, count):
+    if pages_dir:
+        return [path.read_bytes() for path in sorted(Path(pages_dir).iterdir()) if path.is_file()]
+    return [render_results_page('plumber', page, total_pages=count).encode('utf-8')
+            for page in range(1, count + 1)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages-dir', help='directory of saved result pages')
+    parser.add_argument('--pages', type=int, default=50, help='pages to render without --pages-dir')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workers', type=int, nargs='*', default=[],
+                        help='ParsePool sizes to measure (parse + clean per page)')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.CRITICAL)
+    pages = load_pages(args.pages_dir, args.pages)
+
+    results = {}
+    for name, parser_class in PARSERS.items():
+        page_parser = parser_class()
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            parsed = [page_parser.parse_cards(page) for page in pages]
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        cards = sum(len(cards) for cards in parsed if cards)
+        results[name] = parsed
+        print(f"{name:>5}: {cards / best:10.0f} cards/s ({len(pages)} pages, {cards} cards)")
+
+    outputs = list(results.values())
+    if any(output != outputs[0] for output in outputs[1:]):
+        raise SystemExit("Parser backends disagree on the parsed output")
+    print("All backends produced identical output")
+
+    for workers in args.workers:
+        pool = ParsePool(workers=workers, max_pending=workers * 4)
+        try:
+            # Warm the worker processes before timing
+            for future in [pool.submit(parse_result_page_in_worker, pages[0], 'plumber', 'lxml')
+                           for _ in range(workers)]:
+                future.result()
+            start = time.perf_counter()
+            futures = [pool.submit(parse_result_page_in_worker, page, 'plumber', 'lxml')
+                       for page in pages]
+            cards = sum(len(future.result() or []) for future in futures)
+            elapsed = time.perf_counter() - start
+        finally:
+            pool.close()
+        print(f"pool x{workers:<2}: {cards / elapsed:10.0f} cards/s (lxml, parse + clean)")
+
+if __name__ == '__main__':
+    main()
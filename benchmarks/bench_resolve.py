@@ -0,0 +1,86 @@
+"""Measure fuzzy entity resolution speed, pair count and accuracy.
+
+Generates companies and 1-3 records of each, as overlapping search terms
+and the two scraper variants produce them: legal-form variants ('Corp.'
+/ 'Corporation'), reworded addresses, missing phones or websites, and
+some records with the other variant's 'name' column. Reports records/s,
+candidate pairs per record (which must stay flat as rows grow) and
+pairwise precision and recall against the known companies.
+
+    python -m benchmarks.bench_resolve --companies 300000
+"""
+
+import argparse
+import logging
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.entity_resolution import assign_entities
+
+WORDS = ['aladdin', 'acme', 'allied', 'apex', 'best', 'blue', 'city', 'metro', 'quality', 'reliable',
+         'royal', 'star', 'summit', 'united', 'valley', 'empire', 'liberty', 'pioneer', 'premier', 'eagle']
+TRADES = ['plumbing', 'electric', 'roofing', 'hvac', 'landscaping', 'painting', 'cleaning', 'movers']
+SUFFIXES = [('Corp.', 'Corporation'), ('Inc', 'Incorporated'), ('LLC', ''), ('Co.', 'Company'), ('', '')]
+STREETS = [('St', 'Street'), ('Ave', 'Avenue'), ('Rd', 'Road'), ('Blvd', 'Boulevard')]
+
+def make_records(companies, seed=0):
+    """Records and the company each belongs to"""
+    rng = random.Random(seed)
+    records, truth = [], []
+    for i in range(companies):
+        name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {rng.choice(TRADES).title()}"
+        if rng.random() < 0.5:
+            name = f"{name} {i}"  # most names are unique, the rest collide across cities
+        suffix = rng.choice(SUFFIXES)
+        street = rng.choice(STREETS)
+        number = rng.randint(1, 9999)
+        street_name = rng.choice(WORDS).title()
+        zip_code = f"{rng.randint(10000, 99999)}"
+        phone = f"({rng.randint(201, 989)}) 555-{i % 10000:04d}"
+        website = f"www.company{i}.com" if rng.random() < 0.6 else ''
+        for copy in range(rng.choice((1, 1, 2, 3))):
+            record = {
+                'company_name': f"{name} {suffix[copy % 2]}".strip(),
+                'phone': phone if copy == 0 or rng.random() < 0.7 else '',
+                'website': website if rng.random() < 0.8 else '',
+                'address': f"{number} {street_name} {street[copy % 2]}, Springfield, NY {zip_code}",
+                'industry': 'plumbers',
+            }
+            if copy and rng.random() < 0.3:
+                # The other scraper variant: 'name' instead of 'company_name', no address
+                record = {'name': record['company_name'], 'phone': phone, 'category': 'plumbers'}
+            records.append(record)
+            truth.append(i)
+    return pd.DataFrame(records), np.array(truth)
+
+def pair_count(labels):
+    sizes = pd.Series(labels).value_counts().to_numpy()
+    return int((sizes * (sizes - 1) // 2).sum())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--companies', type=int, default=300_000)
+    args = parser.parse_args()
+
+    # assign_entities logs the candidate pair count per record
+    logging.basicConfig(level=logging.INFO, format='  %(message)s')
+
+    for companies in (args.companies // 10, args.companies):
+        df, truth = make_records(companies)
+        start = time.perf_counter()
+        _, entity_ids = assign_entities(df)
+        elapsed = time.perf_counter() - start
+
+        predicted = entity_ids.to_numpy()
+        true_pairs = pair_count(truth)
+        found_pairs = pair_count(predicted)
+        correct_pairs = pair_count(predicted.astype(np.int64) * (int(truth.max()) + 1) + truth)
+        print(f"{len(df):>9,} records in {elapsed:6.2f}s ({len(df) / elapsed:,.0f} records/s): "
+              f"{len(np.unique(predicted)):,} entities for {companies:,} companies, "
+              f"precision {correct_pairs / max(found_pairs, 1):.3f}, recall {correct_pairs / max(true_pairs, 1):.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Check that `run.py --help` stays fast to start.
+
+Runs the CLI under `python -X importtime`, adds up the import time of
+every module the interpreter doesn't load on its own, and exits non-zero
+if that is over the budget or if a heavy dependency got imported. Cron
+and orchestration start the CLI hundreds of times a day, so keep this in CI.
+
+    python -m benchmarks.bench_startup --budget-ms 40
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# None of these may be imported just to print help
+HEAVY_MODULES = ('pandas', 'numpy', 'pyarrow', 'requests', 'aiohttp', 'bs4', 'lxml', 'selenium')
+DEFAULT_BUDGET_MS = 40
+
+def import_times(args):
+    """(module, self microseconds) of every import the command performs"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', *args], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, module = line[len('import time:'):].split('|')
+        times.append((module.strip(), int(self_us)))
+    return times
+
+def help_import_times(repeat=5):
+    """(total ms, per-module times) of `run.py --help`'s own imports, fastest of ``repeat`` runs"""
+    # The interpreter's own startup (site, .pth hooks) is not ours to budget
+    baseline = {module for module, _ in import_times(['-c', 'pass'])}
+    best = None
+    for _ in range(repeat):
+        times = [(module, us) for module, us in import_times(['run.py', '--help'])
+                 if module not in baseline]
+        total = sum(us for _, us in times) / 1000
+        if best is None or total < best[0]:
+            best = (total, times)
+    return best
+
+def heavy_imports(times):
+    return sorted({module for module, _ in times if module.split('.')[0] in HEAVY_MODULES})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help='import time allowed for --help')
+    parser.add_argument('--repeat', type=int, default=5, help='runs to take the fastest of')
+    args = parser.parse_args()
+
+    total, times = help_import_times(args.repeat)
+    for module, us in sorted(times, key=lambda item: -item[1])[:10]:
+        print(f"{us / 1000:8.2f} ms  {module}")
+    print(f"run.py --help imports: {total:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    heavy = heavy_imports(times)
+    if heavy:
+        print(f"FAIL: heavy modules imported: {', '.join(heavy)}")
+        return 1
+    if total > args.budget_ms:
+        print("FAIL: over budget")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
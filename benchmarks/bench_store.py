@@ -0,0 +1,99 @@
+"""Compare lead store queries with scanning the lead CSVs in pandas.
+
+Loads synthetic leads into a throwaway LeadStore in batched transactions,
+writes the same leads to a CSV, then times a few typical questions both
+ways: an indexed filter, a full-text search and the two combined.
+
+    python -m benchmarks.bench_store --rows 1000000
+"""
+
+import argparse
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from core.lead_store import LeadStore
+
+INDUSTRIES = ['Plumbers', 'Electricians', 'Roofers', 'Dentists', 'Lawyers', 'Movers', 'Florists', 'Bakeries']
+WORDS = ['aladdin', 'acme', 'allied', 'apex', 'best', 'blue', 'city', 'metro', 'quality', 'reliable',
+         'royal', 'star', 'summit', 'united', 'valley', 'empire', 'liberty', 'pioneer', 'premier', 'eagle']
+STREETS = ['Main St', 'Broadway', 'Oak Ave', 'Elm St', 'Park Ave', 'Lake Rd']
+RESULTS = ['deliverable', 'deliverable', 'undeliverable', 'risky', '']
+
+def make_leads(rows, seed=0):
+    rng = random.Random(seed)
+    for i in range(rows):
+        industry = rng.choice(INDUSTRIES)
+        has_email = rng.random() < 0.4
+        yield {
+            'company_name': f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {industry} {i}",
+            'phone': f"+1{rng.randint(2010000000, 9899999999)}",
+            'website': f"https://www.company{i}.com" if rng.random() < 0.6 else '',
+            'address': f"{rng.randint(1, 9999)} {rng.choice(STREETS)}, Springfield, NY {rng.randint(10000, 99999)}",
+            'industry': industry,
+            'source': 'Yellow Pages',
+            'date_scraped': '2024-01-01 00:00:00',
+            'email': f"info@company{i}.com" if has_email else '',
+            'email_result': rng.choice(RESULTS) if has_email else '',
+        }
+
+def scan_csv(path, industry=None, zip_prefix=None, text=None, has_website=False, verified=False):
+    """What answering a question took before the store: load every CSV row, then filter"""
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    mask = pd.Series(True, index=df.index)
+    if industry:
+        mask &= df['industry'].str.lower() == industry.lower()
+    if zip_prefix:
+        mask &= df['address'].str.extract(r'(\d{5})\s*$', expand=False).fillna('').str.startswith(zip_prefix)
+    if text:
+        mask &= df['company_name'].str.contains(text, case=False)
+    if has_website:
+        mask &= df['website'] != ''
+    if verified:
+        mask &= df['email_result'] == 'deliverable'
+    return int(mask.sum())
+
+QUESTIONS = [
+    ('plumbers in ZIP 100xx with website and verified email',
+     dict(industry='plumbers', zip_prefix='100', has_website=True, verified=True)),
+    ("name contains 'summit'", dict(text='summit')),
+    ("'acme' dentists in ZIP 2xxxx", dict(text='acme', industry='dentists', zip_prefix='2')),
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    directory = Path(tempfile.mkdtemp())
+    store = LeadStore(directory / 'leads.db')
+    start = time.perf_counter()
+    store.write_many(make_leads(args.rows))
+    store.flush()
+    elapsed = time.perf_counter() - start
+    size = sum(path.stat().st_size for path in directory.glob('leads.db*'))
+    print(f"loaded {args.rows:,} leads in {elapsed:.1f}s ({args.rows / elapsed:,.0f}/s), "
+          f"{size / 1e6:.0f} MB on disk")
+
+    csv_path = directory / 'leads.csv'
+    pd.DataFrame(make_leads(args.rows)).to_csv(csv_path, index=False)
+
+    for question, filters in QUESTIONS:
+        start = time.perf_counter()
+        matches = store.count(**filters)
+        first_page = store.query(limit=50, **filters)
+        store_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        scanned = scan_csv(csv_path, **filters)
+        scan_ms = (time.perf_counter() - start) * 1000
+        print(f"{question}: {matches:,} leads, store {store_ms:.1f} ms "
+              f"(count + {len(first_page)} rows), CSV scan {scan_ms:,.0f} ms ({scanned:,} leads)")
+    store.close()
+
+if __name__ == '__main__':
+    main()
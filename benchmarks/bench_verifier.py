@@ -0,0 +1,46 @@
+"""Show what batching, dedup and caching save in EmailVerifier.
+
+Runs verify_many and search_domains twice against the stand-in Hunter
+API, with a throwaway cache. The second pass should make no API calls.
+
+    python -m benchmarks.bench_verifier --emails 500 --latency 0.05
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.stand_in_server import StandInServer
+from config import settings
+from core.email_verifier import EmailVerifier
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--emails', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.05, help='stand-in API latency (s)')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    settings.HUNTER_CACHE_DB = Path(tempfile.mkdtemp()) / 'hunter_cache.db'
+    settings.HUNTER_RATE_LIMIT = 1000
+
+    # Every address appears twice, as leads from overlapping search terms do
+    emails = [f"info@company-{i % (args.emails // 2)}.example.com" for i in range(args.emails)]
+    domains = [email.split('@')[1] for email in emails]
+
+    with StandInServer(latency=args.latency) as server:
+        for run in ('cold', 'warm'):
+            verifier = EmailVerifier(api_key='bench', api_base=f"{server.url}/v2")
+            server.httpd.hunter_calls = 0
+            start = time.perf_counter()
+            verified = verifier.verify_many(emails)
+            found = verifier.search_domains(domains)
+            elapsed = time.perf_counter() - start
+            verifier.close()
+            print(f"{run}: {len(emails) * 2} lookups -> {server.httpd.hunter_calls} API calls, "
+                  f"{len(verified)} emails / {len(found)} domains in {elapsed:.2f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Copy real result pages out of the HTTP cache into a fixtures directory.
+
+Run a normal crawl first (HTTP_CACHE_ENABLED = True), then:
+
+    python -m benchmarks.record_fixtures --out benchmarks/fixtures --limit 50
+
+The stand-in server serves these pages with --fixtures, so benchmarks
+parse the live site's markup instead of the rendered stand-in pages.
+"""
+
+import argparse
+import json
+import shutil
+from pathlib import Path
+
+from config import settings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cache-dir', type=Path, default=settings.HTTP_CACHE_DIR)
+    parser.add_argument('--out', type=Path, default=Path(__file__).parent / 'fixtures')
+    parser.add_argument('--limit', type=int, default=50, help='most pages to copy')
+    args = parser.parse_args()
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    copied = 0
+    for entry_path in sorted((args.cache_dir / 'entries').glob('*.json')):
+        entry = json.loads(entry_path.read_text())
+        if entry['status_code'] != 200 or '/search' not in entry['url']:
+            continue
+        body = args.cache_dir / 'bodies' / entry['body_hash']
+        if not body.exists():
+            continue
+        shutil.copyfile(body, args.out / f"{entry['body_hash'][:16]}.html")
+        copied += 1
+        if copied >= args.limit:
+            break
+    print(f"Recorded {copied} result pages to {args.out}")
+
+if __name__ == '__main__':
+    main()
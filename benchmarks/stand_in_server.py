@@ -0,0 +1,286 @@
+
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+CARD_TEMPLATE = """
+<div class="result">
+  <h2 class="company-name">{name}</h2>
+  <div class="phones">({area}) 555-{line:04d}</div>
+  <a class="website-link" href="www.{slug}.example.com">Website</a>
+  <div class="address">{number} Main St,
+      Springfield, IL 627{zip:02d}</div>
+</div>"""
+
+# Subresources a real result page pulls in; plain HTTP never requests them,
+# a browser does unless they are blocked
+STATIC_ASSETS = {
+    '/static/site.css': ('text/css', b'.result { margin: 0 }\n' * 4000),
+    '/static/logo.png': ('image/png', b'\x89PNG\r\n\x1a\n' + b'\0' * 60000),
+    '/static/font.woff2': ('font/woff2', b'wOF2' + b'\0' * 40000),
+}
+
+ASSET_LINKS = (
+    '<link rel="stylesheet" href="/static/site.css">'
+    '<style>@font-face { font-family: Site; src: url(/static/font.woff2); } '
+    'body { font-family: Site }</style>'
+)
+
+def render_results_page(search_term, page, cards_per_page=30, total_pages=10):
+    """Render a Yellow Pages style result page with the selectors the scraper uses"""
+    cards = []
+    if page <= total_pages:
+        for i in range(cards_per_page):
+            n = (page - 1) * cards_per_page + i
+            cards.append(CARD_TEMPLATE.format(
+                name=f"{search_term.title()} Company {n}",
+                area=200 + n % 700,
+                line=n % 10000,
+                slug=f"{search_term.lower().replace(' ', '-')}-{n}",
+                number=100 + n,
+                zip=n % 100,
+            ))
+    pagination = ""
+    if cards:
+        first = (page - 1) * cards_per_page + 1
+        next_link = f'<a class="next" href="?page={page + 1}">Next</a>' if page < total_pages else ""
+        pagination = (
+            '<div class="pagination"><span class="showing-count">'
+            f"Showing {first}-{first + len(cards) - 1} of {cards_per_page * total_pages:,}"
+            f"</span>{next_link}</div>"
+        )
+    return (
+        f"<html><head><title>Search results</title>{ASSET_LINKS}</head><body>"
+        '<img src="/static/logo.png" alt="logo">'
+        f"<div class=\"search-results organic\">{''.join(cards)}</div>"
+        f"{pagination}</body></html>"
+    )
+
+# Company websites, for enrichment. Which kind of site a host gets is
+# fixed by its name, so runs are comparable
+SITE_HOMEPAGE = """<html><head><title>{name}</title></head><body>
+<nav><a href="/">Home</a> <a href="/about-us">About us</a> <a href="/contact">Contact</a></nav>
+<h1>{name}</h1>{filler}<p>Serving the area since 19{year:02d}.</p>{homepage_email}
+<footer><a href="https://www.facebook.com/{slug}">Facebook</a>
+<a href="https://www.linkedin.com/company/{slug}">LinkedIn</a></footer>
+</body></html>"""
+SITE_CONTACT = """<html><body><h1>Contact {name}</h1>
+<p>Call us or write to <a href="mailto:{local}@{domain}">{local}@{domain}</a>.</p>
+<p>Owner: <a href="mailto:owner.{slug}@gmail.com">owner.{slug}@gmail.com</a></p>
+<img src="/img/badge@2x.png"></body></html>"""
+SITE_ABOUT = """<html><body><h1>About {name}</h1><p>A family business.</p>
+<a href="https://twitter.com/{slug}">Twitter</a></body></html>"""
+SITE_NO_CONTACT = """<html><body><h1>Contact</h1><p>Use the form below.</p><form></form></body></html>"""
+
+def site_kind(host):
+    """'normal', 'no_email', 'slow' or 'huge' for a company website host"""
+    return ('no_email', 'slow', 'huge', 'normal', 'normal', 'normal',
+            'normal', 'normal', 'normal', 'normal')[zlib.crc32(host.encode('utf-8')) % 10]
+
+def render_company_page(host, path):
+    """A page of a made-up company website, or None for an unknown path"""
+    domain = host[4:] if host.startswith('www.') else host
+    slug = domain.split('.')[0]
+    kind = site_kind(host)
+    fields = {
+        'name': slug.replace('-', ' ').title(), 'slug': slug, 'domain': domain,
+        'local': ('info', 'contact', 'hello', 'sales')[len(slug) % 4],
+        'year': zlib.crc32(slug.encode('utf-8')) % 100,
+    }
+    if path in ('/', '/index.html'):
+        # A megabyte of inline markup before anything useful, as page builders produce
+        filler = '<div class="spacer"></div>' * 40000 if kind == 'huge' else ''
+        homepage_email = f'<p>Email: {fields["local"]}@{domain}</p>' if kind == 'huge' else ''
+        return SITE_HOMEPAGE.format(filler=filler, homepage_email=homepage_email, **fields)
+    if path == '/contact':
+        return SITE_NO_CONTACT if kind == 'no_email' else SITE_CONTACT.format(**fields)
+    if path == '/about-us':
+        return SITE_ABOUT.format(**fields)
+    return None
+
+def load_fixture_pages(fixtures_dir):
+    """Recorded result pages (``*.html``) from a directory, in name order"""
+    return [path.read_bytes() for path in sorted(Path(fixtures_dir).glob('*.html'))]
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        config = self.server.config
+        parts = urlsplit(self.path)
+        if parts.path in STATIC_ASSETS:
+            return self._static(parts.path)
+        host = (self.headers.get('Host') or '').split(':')[0].lower()
+        if host.endswith('.example.com'):
+            return self._company_site(host, parts.path)
+
+        self.server.request_count += 1
+        delay = config['latency'] + self.server.rng.uniform(0, config['jitter'])
+        if delay:
+            time.sleep(delay)
+        if (self.server.request_count <= config['fail_first']
+                or self.server.rng.random() < config['error_rate']):
+            return self._injected_error(config['error_status'])
+
+        query = parse_qs(parts.query)
+        if parts.path.startswith('/v2/'):
+            return self._hunter(parts.path, query)
+
+        term = query.get('search_terms', ['plumber'])[0]
+        page = int(query.get('page', ['1'])[0])
+        fixtures = self.server.fixtures
+        if fixtures and page <= config['total_pages']:
+            # The same (term, page) always gets the same recorded page
+            body = fixtures[zlib.crc32(f"{term}:{page}".encode('utf-8')) % len(fixtures)]
+        else:
+            body = render_results_page(
+                term, page, config['cards_per_page'], config['total_pages']
+            ).encode('utf-8')
+
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _injected_error(self, status):
+        self.server.errors_injected += 1
+        self.send_response(status)
+        if status in (429, 503):
+            self.send_header('Retry-After', str(self.server.config['retry_after']))
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def _company_site(self, host, path):
+        self.server.site_requests += 1
+        if site_kind(host) == 'slow':
+            time.sleep(self.server.config['slow_site_delay'])
+        page = render_company_page(host, path)
+        if page is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = page.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+            self.server.site_bytes += len(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # Clients stop reading large pages once their byte budget is spent
+            pass
+
+    def _static(self, path):
+        self.server.asset_requests += 1
+        self.server.asset_bytes += len(STATIC_ASSETS[path][1])
+        content_type, body = STATIC_ASSETS[path]
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _hunter(self, path, query):
+        """Mock of the two Hunter.io endpoints EmailVerifier calls"""
+        self.server.hunter_calls += 1
+        if path == '/v2/email-verifier':
+            email = query.get('email', [''])[0]
+            deliverable = not email.startswith('bounce')
+            data = {
+                'result': 'deliverable' if deliverable else 'undeliverable',
+                'score': 91 if deliverable else 12,
+                'status': 'valid' if deliverable else 'invalid',
+                'email': email,
+            }
+        elif path == '/v2/domain-search':
+            domain = query.get('domain', [''])[0]
+            data = {
+                'domain': domain,
+                'emails': [{'value': f"{name}@{domain}", 'type': 'generic', 'confidence': 90}
+                           for name in ('info', 'sales')],
+            }
+        else:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body = json.dumps({'data': data}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients hanging up mid-response (timeouts, byte budgets) are expected
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+class StandInServer:
+    """Local Yellow Pages stand-in served from a background thread"""
+
+    def __init__(self, latency=0.1, cards_per_page=30, total_pages=10, jitter=0.0,
+                 error_rate=0.0, error_status=503, fixtures_dir=None, seed=0, slow_site_delay=2.0,
+                 fail_first=0, retry_after=0):
+        self.httpd = QuietHTTPServer(('127.0.0.1', 0), StandInHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.request_count = 0
+        self.httpd.hunter_calls = 0
+        self.httpd.errors_injected = 0
+        self.httpd.rng = random.Random(seed)
+        # Recorded pages replace the rendered ones for pages up to total_pages
+        self.httpd.fixtures = load_fixture_pages(fixtures_dir) if fixtures_dir else []
+        self.httpd.asset_requests = 0
+        self.httpd.asset_bytes = 0
+        # Requests for company websites (any *.example.com Host)
+        self.httpd.site_requests = 0
+        self.httpd.site_bytes = 0
+        self.httpd.config = {
+            'latency': latency,
+            'jitter': jitter,  # extra random delay, up to this many seconds
+            'error_rate': error_rate,  # share of requests answered with error_status
+            'error_status': error_status,
+            'fail_first': fail_first,  # requests answered with error_status before any succeeds
+            'retry_after': retry_after,  # Retry-After seconds sent with a 429 or 503
+            'cards_per_page': cards_per_page,
+            'total_pages': total_pages,
+            'slow_site_delay': slow_site_delay,  # seconds every page of a 'slow' company site takes
+        }
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,21 @@
+
+import logging
+from datetime import datetime
+
+from config import settings
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+def init(log_to_file: bool = True, level: int = logging.INFO):
+    """Create the data directories and set up logging.
+
+    Importing modules has no side effects; entry points call this once
+    before doing any work.
+    """
+    settings.ensure_dirs()
+    handlers = [logging.StreamHandler()]
+    if log_to_file:
+        handlers.insert(0, logging.FileHandler(
+            settings.LOG_DIR / f'scraper_{datetime.now().strftime("%Y%m%d")}.log'
+        ))
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=handlers)
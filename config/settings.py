@@ -11,15 +11,122 @@ INPUT_DIR = DATA_DIR / 'input'
 OUTPUT_DIR = DATA_DIR / 'output'
 LOG_DIR = DATA_DIR / 'logs'
 
-# Create directories if they don't exist
-OUTPUT_DIR.mkdir(exist_ok=True)
-LOG_DIR.mkdir(exist_ok=True)
-INPUT_DIR.mkdir(exist_ok=True)
-
 # Scraper settings
 REQUEST_TIMEOUT = 30
 REQUEST_DELAY = 2  # seconds between requests to be polite
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
 
+YELLOW_PAGES_BASE_URL = 'https://www.yellowpages.com'
+
+# Geo fan-out (core/geo_planner.py): every term is queried once per location
+LOCATIONS_FILE = None  # e.g. INPUT_DIR / 'locations.txt': one 'City, ST', ZIP or region per line
+DEFAULT_LOCATION = 'United States'  # used when there is no locations file
+YIELD_DB = DATA_DIR / 'query_yield.db'  # new leads per page of each (term, location) in past runs
+YIELD_DECAY = 0.5  # weight each earlier run keeps in the yield estimate
+GEO_MAX_JOBS = 0  # run only this many most promising (term, location) queries (0 = all)
+
+# Fetch engine settings
+FETCH_BACKEND = 'sync'  # 'sync' (requests, one page at a time) or 'async' (aiohttp, concurrent)
+MAX_CONCURRENT_REQUESTS = 20  # in-flight requests across all hosts (async backend)
+MAX_CONNECTIONS_PER_HOST = 8  # pooled connections kept open per host (async backend)
+HOST_RATE_LIMIT = 1 / REQUEST_DELAY  # requests per second allowed per host
+HOST_BURST = 1  # token bucket capacity per host
+MAX_RETRIES = 3  # retries after a 429, 5xx or connection error
+RETRY_BACKOFF_BASE = 1.0  # seconds; the backoff ceiling doubles per attempt, with full jitter
+RETRY_BACKOFF_MAX = 60
+
+# Adaptive rate control: per-host rate and concurrency follow latency and error rates (AIMD)
+ADAPTIVE_RATE_CONTROL = True  # False keeps HOST_RATE_LIMIT fixed
+ADAPTIVE_MIN_RATE = 0.1  # requests per second per host, floor after slowdowns
+ADAPTIVE_MAX_RATE = 4  # ceiling while a host stays healthy
+ADAPTIVE_RATE_STEP = 0.1  # added to a healthy host's rate per adjustment
+ADAPTIVE_INTERVAL = 2.0  # seconds between adjustments
+ADAPTIVE_LATENCY_TARGET = 3.0  # p95 latency (s) above which a host counts as struggling
+ADAPTIVE_WINDOW = 200  # recent responses per host the reported percentiles cover
+
+# Parsing
+PARSER_BACKEND = 'lxml'  # 'lxml' (fast, precompiled selectors) or 'bs4' (reference BeautifulSoup path)
+PARSE_WORKERS = os.cpu_count() or 1  # parser processes used in thread mode; 0 parses on the fetch thread
+PARSE_QUEUE_SIZE = 64  # fetched pages allowed to wait for a parser before fetching blocks
+
+# Headless browser pool (core/browser_pool.py) for pages plain HTTP can't get
+BROWSER_FALLBACK = False  # render blocked or empty result pages in the pool (needs selenium)
+BROWSER_WORKERS = 3  # warm Chrome drivers kept open
+BROWSER_MAX_PAGES_PER_DRIVER = 50  # pages loaded before a driver is replaced, bounding memory
+BROWSER_HEADLESS = True
+BROWSER_BLOCK_RESOURCES = True  # skip images, stylesheets and fonts
+BROWSER_PAGE_TIMEOUT = 30
+BROWSER_DELAY_RANGE = (2, 5)  # seconds each driver waits after a page load
+
+# Cross-run lead deduplication on phone, website domain and name
+USE_DEDUP = True
+DEDUP_DB = DATA_DIR / 'dedup_index.db'
+
+# Fuzzy entity resolution (`run.py resolve`): merges records of one company across files and runs
+RESOLVE_MATCH_THRESHOLD = 0.75  # weighted name/address/phone/domain similarity needed to merge two records
+RESOLVE_MAX_BLOCK = 200  # blocking keys shared by more records than this are too common to compare on
+
+# HTTP response cache: re-running the parser replays stored pages instead of re-crawling
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_DIR = DATA_DIR / 'http_cache'
+HTTP_CACHE_TTL = 12 * 3600  # seconds before a cached page is revalidated
+HTTP_CACHE_MAX_BYTES = 2 * 1024 ** 3  # least recently used pages are evicted past this size
+HTTP_CACHE_OFFLINE = False  # serve only from the cache, never touch the network
+
+# Search term scheduling (run.py)
+TERM_WORKERS = 4  # search terms scraped at the same time
+TERM_WORKER_MODE = 'thread'  # 'thread' (shared session and rate limit) or 'process'
+MAX_PAGES_PER_TERM = 100  # upper bound; the page count is read from page 1
+SEEN_PAGES_CUTOFF = 2  # stop a term after this many pages in a row of known leads (0 = never)
+PAGE_FETCH_WINDOW = 10  # pages of a term the async backend requests at once
+
+# Resumable crawls: finished pages are recorded and replayed on restart
+USE_CHECKPOINTS = True
+CHECKPOINT_DB = DATA_DIR / 'checkpoints.db'
+CHECKPOINT_MAX_AGE_HOURS = 24  # older checkpoints are ignored so new crawls start fresh
+
+# Delta crawls (core/fingerprints.py): skip unchanged result pages and write only
+# new, changed and vanished leads (column 'change') to a delta_<timestamp> file,
+# or with OUTPUT_FORMAT 'dataset' to OUTPUT_DIR/delta_dataset instead of LEAD_DATASET_DIR
+DELTA_CRAWL = False
+FINGERPRINT_DB = DATA_DIR / 'fingerprints.db'
+
+# Email verification (Hunter.io)
+HUNTER_API_KEY = os.getenv('HUNTER_API_KEY')
+HUNTER_API_BASE = 'https://api.hunter.io/v2'
+HUNTER_RATE_LIMIT = 10  # API calls per second
+HUNTER_MAX_WORKERS = 8  # concurrent API calls in verify_many / search_domains
+HUNTER_MAX_CALLS = None  # per-run budget of API calls (credits); None means no limit
+HUNTER_MAX_RETRIES = 2  # retries after a 429 response
+HUNTER_CACHE_DB = DATA_DIR / 'hunter_cache.db'
+HUNTER_CACHE_TTL = 30 * 24 * 3600  # seconds a verification or domain search stays cached
+
+# Website enrichment (core/enrichment.py): emails and social links from each lead's own site,
+# so only domains without one need a Hunter domain search
+ENRICH_WEBSITES = False  # enrich leads while scraping; `run.py verify` always tries it first
+ENRICH_CONCURRENCY = 20  # domains crawled at once
+ENRICH_MAX_PAGES = 4  # pages per domain: the homepage plus linked contact/about pages
+ENRICH_MAX_BYTES = 512 * 1024  # bytes read per domain, over all its pages
+ENRICH_DOMAIN_TIMEOUT = 15  # seconds per domain
+
+# Run metrics (core/metrics.py): a JSON summary per run, optionally Prometheus text and profiles
+METRICS_DIR = DATA_DIR / 'metrics'
+METRICS_PROMETHEUS = False  # also write metrics_<timestamp>.prom for a node_exporter textfile collector
+PROFILE_STAGES = ()  # e.g. ('parse', 'clean'); only stages run in the main process are profiled
+PROFILER = 'cprofile'  # or 'pyinstrument' (pip install pyinstrument)
+
 # Output settings
-OUTPUT_FILENAME = 'leads_{timestamp}.csv'
\ No newline at end of file
+OUTPUT_FILENAME = 'leads_{timestamp}.csv'
+OUTPUT_FORMAT = 'csv'  # 'csv', 'parquet' or 'dataset' (both need pyarrow)
+LEAD_DATASET_DIR = OUTPUT_DIR / 'leads_dataset'  # 'dataset' output: Parquet partitioned by run date and industry
+WRITE_BATCH_SIZE = 500  # leads buffered before each flush to disk
+
+# Local lead store (core/lead_store.py): every scraped lead in one indexed SQLite file, for `run.py query`
+USE_LEAD_STORE = True
+LEAD_STORE_DB = DATA_DIR / 'leads.db'
+LEAD_STORE_BATCH_SIZE = 5000  # leads per insert transaction
+
+def ensure_dirs():
+    """Create the data directories; called from config.runtime.init, not at import"""
+    for directory in (INPUT_DIR, OUTPUT_DIR, LOG_DIR):
+        directory.mkdir(parents=True, exist_ok=True)
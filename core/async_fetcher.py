@@ -0,0 +1,167 @@
+
+import asyncio
+import logging
+import threading
+import time
+
+import aiohttp
+
+from config import settings
+from core.fetch_result import FetchResult
+from core.metrics import metrics
+from core.rate_controller import RETRY_STATUSES, backoff_delay, create_rate_limiter, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+class AsyncFetcher:
+    """Concurrent HTTP fetcher backed by one pooled aiohttp session.
+
+    The event loop runs on a daemon thread so synchronous callers (and
+    several worker threads at once) can submit batches with ``fetch_many``
+    while the connection pool stays warm between batches.
+    """
+
+    def __init__(self, headers=None, max_concurrency=None, per_host_limit=None,
+                 rate_limiter=None, timeout=None, cache=None):
+        self.headers = headers or {'User-Agent': settings.USER_AGENT}
+        self.max_concurrency = max_concurrency or settings.MAX_CONCURRENT_REQUESTS
+        self.per_host_limit = per_host_limit or settings.MAX_CONNECTIONS_PER_HOST
+        self.rate_limiter = rate_limiter or create_rate_limiter()
+        self.timeout = timeout or settings.REQUEST_TIMEOUT
+        self.cache = cache
+
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name='async-fetcher', daemon=True
+                )
+                self._thread.start()
+        return self._loop
+
+    async def _get_session(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                limit_per_host=self.per_host_limit,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def fetch(self, url, params=None):
+        """Fetch one URL, returning a FetchResult or None on failure.
+        
+        Retries like BaseScraper.make_request: 429, 5xx and connection
+        errors get jittered backoff that respects Retry-After.
+        """
+        headers = {}
+        if self.cache:
+            cached, entry = self.cache.get(url, params)
+            if cached:
+                logger.debug(f"Cache hit: {url}")
+                metrics.inc('cache_hits')
+                return cached
+            if self.cache.offline:
+                logger.warning(f"Offline mode, no cached response for {url}")
+                return None
+            headers = self.cache.revalidation_headers(entry)
+
+        session = await self._get_session()
+        for attempt in range(settings.MAX_RETRIES + 1):
+            retries_left = attempt < settings.MAX_RETRIES
+            retry_after = None
+            # Wait for the host's slot first, so requests queued for one slow
+            # host don't hold connection slots other hosts could use
+            await self.rate_limiter.acquire_async(url)
+            start = None
+            status = None
+            try:
+                async with self._semaphore:
+                    start = time.perf_counter()
+                    async with session.get(url, params=params, headers=headers) as response:
+                        content = await response.read()
+                        status = response.status
+                        if status == 304 and self.cache:
+                            logger.debug(f"Not modified, using cached response: {url}")
+                            metrics.inc('cache_revalidated')
+                            return self.cache.revalidated(entry)
+                        if status in RETRY_STATUSES and retries_left:
+                            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                        elif status >= 400:
+                            logger.error(f"Request failed for {url}: HTTP {status}")
+                            metrics.inc('fetch_errors')
+                            return None
+                        else:
+                            logger.debug(f"Successfully requested: {response.url}")
+                            metrics.inc('fetch_bytes', len(content))
+                            if self.cache:
+                                return self.cache.store(url, params, status, response.headers,
+                                                        content, response.charset)
+                            return FetchResult(
+                                str(response.url),
+                                status,
+                                dict(response.headers),
+                                content,
+                                response.charset or 'utf-8',
+                            )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not retries_left:
+                    logger.error(f"Request failed for {url}: {e!r}")
+                    return None
+                logger.warning(f"Request failed for {url}: {e!r}, retrying")
+            finally:
+                if start is None:
+                    # Cancelled before the request went out
+                    self.rate_limiter.abandon(url)
+                else:
+                    latency = time.perf_counter() - start
+                    self.rate_limiter.release(url, latency, status)
+                    metrics.inc('fetch_requests')
+                    if status is None:
+                        metrics.inc('fetch_errors')
+                    else:
+                        metrics.observe('fetch_seconds', latency)
+
+            # Back off outside the slots so other requests keep flowing
+            if retry_after:
+                self.rate_limiter.pause(url, retry_after)
+            wait = backoff_delay(attempt, retry_after)
+            metrics.inc('fetch_retries')
+            if status is not None:
+                logger.warning(f"HTTP {status} for {url}, retrying in {wait:.1f}s")
+            await asyncio.sleep(wait)
+        return None
+
+    async def fetch_all(self, request_list):
+        return await asyncio.gather(
+            *(self.fetch(url, params) for url, params in request_list)
+        )
+
+    def fetch_many(self, request_list):
+        """Fetch ``(url, params)`` pairs concurrently; results keep input order"""
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self.fetch_all(list(request_list)), loop)
+        return future.result()
+
+    def close(self):
+        if self._loop is None:
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+            self._session = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
@@ -1,57 +1,153 @@
 
 import requests
-import time
 import logging
-from datetime import datetime
+import time
 from pathlib import Path
 
 from config import settings
+from core.http_cache import ResponseCache
+from core.metrics import metrics
+from core.rate_controller import RETRY_STATUSES, backoff_delay, create_rate_limiter, parse_retry_after
+from utils.lead_writer import open_lead_writer
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(settings.LOG_DIR / f'scraper_{datetime.now().strftime("%Y%m%d")}.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+def create_session(pool_size=None):
+    """Build a requests session, optionally with a larger connection pool for shared use"""
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': settings.USER_AGENT
+    })
+    if pool_size:
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+    return session
+
 class BaseScraper:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': settings.USER_AGENT
-        })
+    def __init__(self, backend=None, fetcher=None, rate_limiter=None, session=None, cache=None):
+        # A session passed in is shared with other scrapers and not closed here
+        self.session = session or create_session()
+        self._owns_session = session is None
         self.scraped_data = []
-        
-    def make_request(self, url, params=None):
-        """Make HTTP request with error handling and delays"""
-        try:
-            time.sleep(settings.REQUEST_DELAY)
-            response = self.session.get(
-                url, 
-                params=params, 
-                timeout=settings.REQUEST_TIMEOUT
+        # 'sync' uses the requests session one page at a time, 'async'
+        # hands batches to an AsyncFetcher so pages load concurrently
+        self.backend = backend or settings.FETCH_BACKEND
+        self.rate_limiter = rate_limiter or create_rate_limiter()
+        self._fetcher = fetcher
+        self._owns_fetcher = fetcher is None
+        # Response cache; None builds one from settings, False turns it off
+        if cache is None and settings.HTTP_CACHE_ENABLED:
+            cache = ResponseCache()
+        self.cache = cache or None
+
+    @property
+    def fetcher(self):
+        if self._fetcher is None:
+            from core.async_fetcher import AsyncFetcher
+            self._fetcher = AsyncFetcher(
+                headers=dict(self.session.headers),
+                rate_limiter=self.rate_limiter,
+                cache=self.cache,
             )
-            response.raise_for_status()  # Raise exception for bad status codes
-            logger.info(f"Successfully requested: {url}")
+        return self._fetcher
+
+    def make_request(self, url, params=None):
+        """Make HTTP request with error handling, per-host rate limiting and retries.
+        
+        429s, 5xx responses and connection errors are retried up to
+        ``MAX_RETRIES`` times with jittered backoff, waiting at least as
+        long as any Retry-After header asks.
+        """
+        headers = {}
+        if self.cache:
+            cached, entry = self.cache.get(url, params)
+            if cached:
+                logger.debug(f"Cache hit: {url}")
+                metrics.inc('cache_hits')
+                return cached
+            if self.cache.offline:
+                logger.warning(f"Offline mode, no cached response for {url}")
+                return None
+            headers = self.cache.revalidation_headers(entry)
+            
+        for attempt in range(settings.MAX_RETRIES + 1):
+            retries_left = attempt < settings.MAX_RETRIES
+            self.rate_limiter.acquire(url)
+            start = time.perf_counter()
+            response = None
+            try:
+                response = self.session.get(
+                    url, 
+                    params=params, 
+                    headers=headers,
+                    timeout=settings.REQUEST_TIMEOUT
+                )
+            except requests.exceptions.RequestException as e:
+                if not retries_left:
+                    logger.error(f"Request failed for {url}: {e}")
+                    return None
+                wait = backoff_delay(attempt)
+                logger.warning(f"Request failed for {url}: {e}, retrying in {wait:.1f}s")
+                metrics.inc('fetch_retries')
+                time.sleep(wait)
+                continue
+            finally:
+                latency = time.perf_counter() - start
+                status = response.status_code if response is not None else None
+                self.rate_limiter.release(url, latency, status)
+                metrics.inc('fetch_requests')
+                if status is None:
+                    metrics.inc('fetch_errors')
+                else:
+                    metrics.observe('fetch_seconds', latency)
+                
+            if response.status_code == 304 and self.cache:
+                logger.debug(f"Not modified, using cached response: {url}")
+                metrics.inc('cache_revalidated')
+                return self.cache.revalidated(entry)
+            if response.status_code in RETRY_STATUSES and retries_left:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if retry_after:
+                    # Hold back every request to this host, not just this one
+                    self.rate_limiter.pause(url, retry_after)
+                wait = backoff_delay(attempt, retry_after)
+                logger.warning(f"HTTP {response.status_code} for {url}, retrying in {wait:.1f}s")
+                metrics.inc('fetch_retries')
+                time.sleep(wait)
+                continue
+            try:
+                response.raise_for_status()  # Raise exception for bad status codes
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Request failed for {url}: {e}")
+                metrics.inc('fetch_errors')
+                return None
+            logger.debug(f"Successfully requested: {url}")
+            metrics.inc('fetch_bytes', len(response.content))
+            if self.cache:
+                self.cache.store(url, params, response.status_code, response.headers,
+                                 response.content, response.encoding)
             return response
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed for {url}: {e}")
-            return None
+
+    def make_requests(self, request_list):
+        """Fetch several ``(url, params)`` pairs, concurrently on the async backend"""
+        if self.backend == 'async':
+            return self.fetcher.fetch_many(request_list)
+        return [self.make_request(url, params) for url, params in request_list]
+
+    def close(self):
+        """Release pooled connections held by this scraper"""
+        if self._fetcher is not None and self._owns_fetcher:
+            self._fetcher.close()
+            self._fetcher = None
+        if self._owns_session:
+            self.session.close()
             
     def save_to_csv(self, data, filename=None):
-        """Save scraped data to CSV file"""
-        if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = settings.OUTPUT_DIR / f"leads_{timestamp}.csv"
-        
-        # This will be implemented after we create data_cleaner
-        # For now, we'll create a simple save method
-        import pandas as pd
-        df = pd.DataFrame(data)
-        df.to_csv(filename, index=False)
-        logger.info(f"Data saved to {filename}")
-        return filename
\ No newline at end of file
+        """Save scraped data to CSV file, in batches like the streamed exports"""
+        with open_lead_writer(filename, 'csv') as writer:
+            writer.write_many(data)
+        logger.info(f"Data saved to {writer.path}")
+        return writer.path
\ No newline at end of file
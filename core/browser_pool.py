@@ -0,0 +1,191 @@
+
+import logging
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium_stealth import stealth
+
+from config import settings
+from core.fetch_result import FetchResult
+from core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.5 Safari/605.1.15",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:115.0) Gecko/20100101 Firefox/115.0",
+]
+
+# Subresources the scrapers never look at; Chrome is told not to download them
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.css', '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+]
+
+class BrowserWorker:
+    """One headless Chrome, replaced with a fresh one after ``max_pages`` loads"""
+
+    def __init__(self, headless=True, block_resources=True, page_timeout=30, max_pages=50):
+        self.headless = headless
+        self.block_resources = block_resources
+        self.page_timeout = page_timeout
+        self.max_pages = max_pages
+        self.pages_loaded = 0
+        self.driver = None
+
+    def start(self):
+        options = Options()
+        if self.headless:
+            options.add_argument("--headless=new")  # new headless mode
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--start-maximized")
+        options.add_argument(f"user-agent={random.choice(USER_AGENTS)}")
+        # Hand the page back once the DOM is ready instead of waiting for every subresource
+        options.page_load_strategy = 'eager'
+        if self.block_resources:
+            options.add_experimental_option(
+                'prefs', {'profile.managed_default_content_settings.images': 2}
+            )
+
+        self.driver = webdriver.Chrome(service=Service(), options=options)
+        self.driver.set_page_load_timeout(self.page_timeout)
+        if self.block_resources:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+
+        stealth(
+            self.driver,
+            languages=["en-US", "en"],
+            vendor="Google Inc.",
+            platform="Win32",
+            webgl_vendor="Intel Inc.",
+            renderer="Intel Iris OpenGL Engine",
+            fix_hairline=True,
+        )
+        self.pages_loaded = 0
+
+    def get(self, url: str) -> str:
+        """Load a URL and return the rendered page source"""
+        if self.driver is None:
+            self.start()
+        self.driver.get(url)
+        self.pages_loaded += 1
+        html = self.driver.page_source
+        if self.pages_loaded >= self.max_pages:
+            # Chrome's memory only grows over a long session
+            logger.info(f"Recycling browser after {self.pages_loaded} pages")
+            self.stop()
+        return html
+
+    def stop(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except WebDriverException as e:
+                logger.warning(f"Error closing browser: {e}")
+            self.driver = None
+
+class BrowserPool:
+    """Warm headless browsers shared by every caller that needs a rendered page.
+
+    ``workers`` drivers are started up front and handed out one page at a
+    time, so Chrome's startup cost is paid once per driver instead of once
+    per scraper. Pacing comes from ``rate_limiter`` when one is given (an
+    AdaptiveRateController speeds up or backs off with the site); otherwise
+    each driver waits ``delay_range`` seconds after a load, like the
+    single-browser scraper did.
+    """
+
+    def __init__(self, workers=None, max_pages_per_driver=None, headless=None,
+                 block_resources=None, page_timeout=None, delay_range=None, rate_limiter=None):
+        self.workers = workers or settings.BROWSER_WORKERS
+        self.rate_limiter = rate_limiter
+        self.delay_range = None if rate_limiter else delay_range or settings.BROWSER_DELAY_RANGE
+        if headless is None:
+            headless = settings.BROWSER_HEADLESS
+        if block_resources is None:
+            block_resources = settings.BROWSER_BLOCK_RESOURCES
+
+        self._idle = queue.Queue()
+        self._workers = [
+            BrowserWorker(
+                headless=headless,
+                block_resources=block_resources,
+                page_timeout=page_timeout or settings.BROWSER_PAGE_TIMEOUT,
+                max_pages=max_pages_per_driver or settings.BROWSER_MAX_PAGES_PER_DRIVER,
+            )
+            for _ in range(self.workers)
+        ]
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='browser')
+        self._lock = threading.Lock()
+        self.pages_loaded = 0
+
+        # Start the drivers side by side; each launch takes seconds
+        start = time.perf_counter()
+        try:
+            list(self._executor.map(BrowserWorker.start, self._workers))
+        except Exception:
+            self.close()
+            raise
+        for worker in self._workers:
+            self._idle.put(worker)
+        logger.info(f"Started {self.workers} browsers in {time.perf_counter() - start:.1f}s")
+
+    def fetch(self, url: str) -> Optional[FetchResult]:
+        """Render a URL on the next free browser; None if the load failed"""
+        worker = self._idle.get()
+        try:
+            if self.rate_limiter:
+                self.rate_limiter.acquire(url)
+            start = time.perf_counter()
+            status = None
+            try:
+                with metrics.stage('browser'):
+                    html = worker.get(url)
+                status = 200
+                if self.delay_range:
+                    time.sleep(random.uniform(*self.delay_range))  # human-like wait
+            except WebDriverException as e:
+                logger.error(f"Browser failed to load {url}: {e.msg}")
+                worker.stop()  # a crashed or hung driver is replaced on next use
+                return None
+            finally:
+                # Only a load that got past acquire holds a slot to give back
+                if self.rate_limiter:
+                    self.rate_limiter.release(url, time.perf_counter() - start, status)
+        finally:
+            self._idle.put(worker)
+
+        with self._lock:
+            self.pages_loaded += 1
+        metrics.inc('browser_pages')
+        metrics.inc('fetch_bytes', len(html))
+        # Selenium doesn't expose the status code; a rendered page counts as 200
+        return FetchResult(url, 200, {}, html.encode('utf-8'), 'utf-8')
+
+    def fetch_many(self, urls: List[str]) -> List[Optional[FetchResult]]:
+        """Render many URLs across the pool, results in the same order"""
+        return list(self._executor.map(self.fetch, urls))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        for worker in self._workers:
+            worker.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,130 @@
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from utils.lead import Lead, as_dict
+
+class CheckpointStore:
+    """Durable record of finished (search_term, location, page) work.
+
+    Each completed page is stored together with the leads it produced so
+    a restarted run can replay it instead of fetching it again. Entries
+    older than ``max_age_hours`` are ignored, which lets a crashed run
+    resume while the next scheduled crawl still starts fresh.
+    """
+
+    def __init__(self, path=None, max_age_hours: Optional[float] = None):
+        self.path = path or settings.CHECKPOINT_DB
+        if max_age_hours is None:
+            max_age_hours = settings.CHECKPOINT_MAX_AGE_HOURS
+        self.max_age = max_age_hours * 3600
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS pages (
+                    search_term TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    page INTEGER NOT NULL,
+                    last_page INTEGER NOT NULL,
+                    lead_count INTEGER NOT NULL,
+                    leads TEXT NOT NULL,
+                    completed_at REAL NOT NULL,
+                    PRIMARY KEY (search_term, location, page)
+                )
+            ''')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS plans (
+                    search_term TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    total_pages INTEGER NOT NULL,
+                    planned_at REAL NOT NULL,
+                    PRIMARY KEY (search_term, location)
+                )
+            ''')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS terms (
+                    search_term TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    completed_at REAL NOT NULL,
+                    PRIMARY KEY (search_term, location)
+                )
+            ''')
+
+    def _cutoff(self) -> float:
+        return time.time() - self.max_age
+
+    def completed_pages(self, search_term: str, location: str) -> Dict[int, bool]:
+        """Map each finished page to whether it was the end of the results"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT page, last_page FROM pages '
+                'WHERE search_term = ? AND location = ? AND completed_at >= ?',
+                (search_term, location, self._cutoff()),
+            ).fetchall()
+        return {page: bool(last_page) for page, last_page in rows}
+
+    def get_leads(self, search_term: str, location: str, page: int) -> List[Lead]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT leads FROM pages WHERE search_term = ? AND location = ? AND page = ?',
+                (search_term, location, page),
+            ).fetchone()
+        return [Lead.from_dict(lead) for lead in json.loads(row[0])] if row else []
+
+    def mark_done(self, search_term: str, location: str, page: int,
+                  leads: List[Any], last_page: bool = False):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (search_term, location, page, int(last_page), len(leads),
+                 json.dumps([as_dict(lead) for lead in leads]), time.time()),
+            )
+
+    def get_total_pages(self, search_term: str, location: str) -> Optional[int]:
+        """Page count read from page 1 of this search, if it was recorded"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT total_pages FROM plans '
+                'WHERE search_term = ? AND location = ? AND planned_at >= ?',
+                (search_term, location, self._cutoff()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_total_pages(self, search_term: str, location: str, total_pages: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?)',
+                (search_term, location, total_pages, time.time()),
+            )
+
+    def term_done(self, search_term: str, location: str) -> bool:
+        """Whether a search ran to its end (or its seen-page cutoff) with no failed page"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT 1 FROM terms WHERE search_term = ? AND location = ? AND completed_at >= ?',
+                (search_term, location, self._cutoff()),
+            ).fetchone()
+        return row is not None
+
+    def mark_term_done(self, search_term: str, location: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO terms VALUES (?, ?, ?)',
+                (search_term, location, time.time()),
+            )
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM pages')
+            self._conn.execute('DELETE FROM plans')
+            self._conn.execute('DELETE FROM terms')
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,139 @@
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List
+
+from config import settings
+from utils.data_cleaner import (
+    clean_address_text,
+    clean_phone_number,
+    extract_domain,
+    normalize_company_name,
+)
+
+logger = logging.getLogger(__name__)
+
+# Hosts shared by many businesses, so they say nothing about identity
+SHARED_DOMAINS = frozenset({
+    'facebook.com', 'instagram.com', 'linkedin.com', 'twitter.com', 'x.com',
+    'yelp.com', 'yellowpages.com', 'google.com', 'sites.google.com',
+    'business.site', 'wixsite.com', 'godaddysites.com', 'squarespace.com',
+})
+
+def dedup_keys(lead: Dict[str, Any]) -> List[str]:
+    """Identity keys of a lead: normalized phone and website domain.
+
+    Leads with neither fall back to normalized name plus address, so
+    same-named branches at different addresses stay distinct.
+    """
+    keys = []
+    phone = clean_phone_number(lead.get('phone') or '')
+    if sum(c.isdigit() for c in phone) >= 7:
+        keys.append(f"phone:{phone}")
+    domain = extract_domain(lead.get('website') or '')
+    if domain and domain not in SHARED_DOMAINS:
+        keys.append(f"domain:{domain}")
+    if not keys:
+        name = normalize_company_name(lead.get('company_name') or lead.get('name') or '')
+        if name:
+            address = clean_address_text(lead.get('address') or '').lower()
+            keys.append(f"name:{name}|{address}")
+    return keys
+
+def _key_hash(key: str) -> int:
+    # 64-bit signed so it fits SQLite's INTEGER PRIMARY KEY (the rowid)
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+class DedupIndex:
+    """Persistent set of lead identity keys, shared across runs.
+
+    Keys are stored as 64-bit hashes in SQLite's rowid B-tree, so a
+    lookup is a few page reads however many leads are known, and each
+    batch of leads is checked with one query. Keys from a duplicate are
+    recorded too, so a company seen with a new phone or domain is also
+    recognised by those next time.
+    """
+
+    def __init__(self, path=None, flush_every: int = 5000):
+        self.path = path or settings.DEDUP_DB
+        self.flush_every = flush_every
+        self.duplicates = 0
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS seen (key INTEGER PRIMARY KEY)')
+
+    def __reduce__(self):
+        # A copy in another process opens its own connection to the same file
+        return DedupIndex, (self.path, self.flush_every)
+
+    def _known(self, hashes) -> set:
+        hashes = list(hashes)
+        known = set()
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            rows = self._conn.execute(
+                f"SELECT key FROM seen WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            known.update(row[0] for row in rows)
+        return known
+
+    def filter_new(self, leads: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return the leads not seen before (in earlier runs or earlier in this batch)"""
+        leads = list(leads)
+        lead_hashes = [[_key_hash(key) for key in dedup_keys(lead)] for lead in leads]
+
+        new_leads = []
+        with self._lock:
+            seen = self._known({h for hashes in lead_hashes for h in hashes} - self._pending)
+            seen |= self._pending
+            for lead, hashes in zip(leads, lead_hashes):
+                if not hashes:
+                    new_leads.append(lead)  # nothing to match on
+                    continue
+                if not seen.isdisjoint(hashes):
+                    self.duplicates += 1
+                else:
+                    new_leads.append(lead)
+                fresh = set(hashes) - seen
+                seen |= fresh
+                self._pending |= fresh
+
+            if len(self._pending) >= self.flush_every:
+                self._flush()
+        return new_leads
+
+    def known_keys(self, keys: Iterable[str]) -> set:
+        """The subset of ``keys`` already in the index; nothing is recorded"""
+        by_hash = {_key_hash(key): key for key in keys}
+        with self._lock:
+            known = self._pending.intersection(by_hash)
+            known |= self._known(by_hash.keys() - self._pending)
+        return {by_hash[h] for h in known}
+
+    def is_duplicate(self, lead: Dict[str, Any]) -> bool:
+        """Check (and record) a single lead"""
+        return not self.filter_new([lead])
+
+    def _flush(self):
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO seen (key) VALUES (?)', ((h,) for h in self._pending)
+            )
+        self._pending = set()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._conn.close()
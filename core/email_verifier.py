@@ -1,71 +1,189 @@
 
 import requests
 import logging
-from typing import Dict, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
 from config import settings
+from core.metrics import metrics
+from core.rate_controller import parse_retry_after
+from core.rate_limiter import TokenBucket
+from core.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
 class EmailVerifier:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, api_base: Optional[str] = None,
+                 use_cache: bool = True, max_workers: Optional[int] = None,
+                 max_calls: Optional[int] = None):
         # Get API key from environment variables
-        self.api_key = api_key 
-        self.base_url = "https://api.hunter.io/v2/email-verifier"
-        
+        self.api_key = api_key or settings.HUNTER_API_KEY
+        api_base = (api_base or settings.HUNTER_API_BASE).rstrip('/')
+        self.base_url = f"{api_base}/email-verifier"
+        self.domain_search_url = f"{api_base}/domain-search"
+
+        self.max_workers = max_workers or settings.HUNTER_MAX_WORKERS
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # Hunter allows a fixed number of calls per second and per month;
+        # the bucket covers the first, max_calls/quota_exhausted the second
+        self.rate_limiter = TokenBucket(settings.HUNTER_RATE_LIMIT, settings.HUNTER_RATE_LIMIT)
+        self.calls_left = max_calls if max_calls is not None else settings.HUNTER_MAX_CALLS
+        self.quota_exhausted = False
+        self.api_calls = 0
+        self._lock = threading.Lock()
+
+        self.verify_cache = None
+        self.domain_cache = None
+        if use_cache:
+            self.verify_cache = TTLCache(settings.HUNTER_CACHE_DB, settings.HUNTER_CACHE_TTL, 'email-verifier')
+            self.domain_cache = TTLCache(settings.HUNTER_CACHE_DB, settings.HUNTER_CACHE_TTL, 'domain-search')
+
     def verify_email(self, email: str) -> Dict:
         """Verify an email address using Hunter.io API"""
-        if not self.api_key or not email or '@' not in email:
-            return {'result': 'invalid', 'score': 0}
-        
-        try:
-            params = {
-                'email': email,
-                'api_key': self.api_key
-            }
-            
-            response = requests.get(
-                f"{self.base_url}",
-                params=params,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    'result': data['data']['result'],
-                    'score': data['data']['score'],
-                    'status': data['data']['status']
-                }
-            else:
-                logger.warning(f"Email verification API error: {response.status_code}")
-                return {'result': 'unknown', 'score': 0}
-                
-        except Exception as e:
-            logger.error(f"Email verification failed: {e}")
-            return {'result': 'unknown', 'score': 0}
-    
+        return self.verify_many([email]).get(self._normalize(email), {'result': 'invalid', 'score': 0})
+
     def extract_domain_emails(self, domain: str) -> list:
         """Find emails for a domain"""
+        return self.search_domains([domain]).get(self._normalize(domain), [])
+
+    def verify_many(self, emails: Iterable[str]) -> Dict[str, Dict]:
+        """Verify many addresses at once, keyed by normalized address.
+
+        Duplicates are checked once, cached results cost nothing, and the
+        remaining addresses are verified concurrently under the rate limit.
+        """
+        results = {}
+        pending = set()
+        for email in emails:
+            email = self._normalize(email)
+            if not self.api_key or not email or '@' not in email:
+                results[email] = {'result': 'invalid', 'score': 0}
+            else:
+                pending.add(email)
+
+        results.update(self._run_batch(pending, self.verify_cache, self._verify_uncached))
+        return results
+
+    def search_domains(self, domains: Iterable[str]) -> Dict[str, List]:
+        """Find emails for many domains at once, keyed by normalized domain"""
         if not self.api_key:
-            return []
-        
+            return {self._normalize(domain): [] for domain in domains}
+        pending = {self._normalize(domain) for domain in domains}
+        pending.discard('')
+        return self._run_batch(pending, self.domain_cache, self._search_domain_uncached)
+
+    def _run_batch(self, keys, cache, fetch):
+        results = cache.get_many(keys) if cache else {}
+        missing = [key for key in keys if key not in results]
+        if results:
+            logger.info(f"Hunter cache answered {len(results)} of {len(keys)} lookups")
+            metrics.inc('verifier_cache_hits', len(results))
+        if not missing:
+            return results
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for key, (value, cacheable) in zip(missing, executor.map(fetch, missing)):
+                results[key] = value
+                if cacheable and cache:
+                    cache.set(key, value)
+        return results
+
+    def _verify_uncached(self, email: str):
+        data = self._call_api(self.base_url, {'email': email})
         try:
-            params = {
-                'domain': domain,
-                'api_key': self.api_key
-            }
-            
-            response = requests.get(
-                "https://api.hunter.io/v2/domain-search",
-                params=params,
-                timeout=30
-            )
-            
+            return {
+                'result': data['data']['result'],
+                'score': data['data']['score'],
+                'status': data['data']['status']
+            }, True
+        except (KeyError, TypeError) as e:
+            if data is not None:
+                logger.error(f"Email verification failed: unexpected response {e!r}")
+            return {'result': 'unknown', 'score': 0}, False
+
+    def _search_domain_uncached(self, domain: str):
+        data = self._call_api(self.domain_search_url, {'domain': domain})
+        try:
+            return data['data']['emails'], True
+        except (KeyError, TypeError) as e:
+            if data is not None:
+                logger.error(f"Domain email search failed: unexpected response {e!r}")
+            return [], False
+
+    def _take_call(self) -> bool:
+        """Reserve one API call against the quota"""
+        with self._lock:
+            if self.quota_exhausted:
+                return False
+            if self.calls_left is not None:
+                if self.calls_left <= 0:
+                    self.quota_exhausted = True
+                    logger.warning("Hunter call budget used up, skipping remaining lookups")
+                    return False
+                self.calls_left -= 1
+            self.api_calls += 1
+        return True
+
+    def _refund_call(self):
+        """Give back a reserved call Hunter never charged for"""
+        with self._lock:
+            if self.calls_left is not None:
+                self.calls_left += 1
+            self.api_calls -= 1
+
+    def _call_api(self, url: str, params: Dict) -> Optional[Dict]:
+        """GET a Hunter endpoint; None if the call failed or the quota is gone"""
+        params = dict(params, api_key=self.api_key)
+        for attempt in range(settings.HUNTER_MAX_RETRIES + 1):
+            if not self._take_call():
+                return None
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.get(url, params=params, timeout=30)
+            except requests.exceptions.RequestException as e:
+                self._refund_call()
+                logger.error(f"Hunter request failed: {e}")
+                return None
+
+            # Rejected calls (rate limit, quota) aren't charged
+            if response.status_code in (402, 403, 429):
+                self._refund_call()
+            else:
+                metrics.inc('verifier_api_calls')
             if response.status_code == 200:
-                data = response.json()
-                return data['data']['emails']
-            return []
-            
-        except Exception as e:
-            logger.error(f"Domain email search failed: {e}")
-            return []
\ No newline at end of file
+                try:
+                    return response.json()
+                except ValueError as e:
+                    logger.error(f"Hunter returned invalid JSON: {e}")
+                    return None
+            if response.status_code == 429 and attempt < settings.HUNTER_MAX_RETRIES:
+                # Per-second limit hit: wait as long as Hunter asks, then retry
+                wait = parse_retry_after(response.headers.get('Retry-After'))
+                if wait is None:
+                    wait = 1.0
+                logger.warning(f"Hunter rate limited, retrying in {wait:.1f}s")
+                time.sleep(wait)
+                continue
+            if response.status_code in (402, 403):
+                with self._lock:
+                    self.quota_exhausted = True
+                logger.warning(f"Hunter quota exhausted (HTTP {response.status_code})")
+                return None
+            logger.warning(f"Hunter API error: {response.status_code}")
+            return None
+        return None
+
+    @staticmethod
+    def _normalize(value: str) -> str:
+        return value.strip().lower() if value else ''
+
+    def close(self):
+        self.session.close()
+        for cache in (self.verify_cache, self.domain_cache):
+            if cache:
+                cache.close()
@@ -0,0 +1,244 @@
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urljoin, urlsplit
+
+import aiohttp
+
+from config import settings
+from core.dedup_index import SHARED_DOMAINS
+from core.metrics import metrics
+from utils.data_cleaner import extract_domain
+
+logger = logging.getLogger(__name__)
+
+EMAIL_RE = re.compile(rb'(?:mailto:)?([A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,24})')
+# Things that look like addresses but aren't: asset names (logo@2x.png),
+# placeholders and error-tracker DSNs
+NOT_EMAIL_RE = re.compile(
+    r'\.(?:png|jpe?g|gif|svg|webp|css|js)$|@(?:\d+x\.|example\.|domain\.|email\.|sentry|wixpress)',
+    re.IGNORECASE,
+)
+SOCIAL_RE = re.compile(
+    rb'href=["\'](https?://(?:www\.)?(facebook|linkedin|twitter|x|instagram|youtube)\.com/[^"\'\s?#]+)',
+    re.IGNORECASE,
+)
+SOCIAL_FIELDS = {'facebook': 'facebook', 'linkedin': 'linkedin', 'twitter': 'twitter',
+                 'x': 'twitter', 'instagram': 'instagram', 'youtube': 'youtube'}
+# Columns enrichment adds to every lead, empty when nothing was found
+ENRICH_COLUMNS = ('email', 'facebook', 'linkedin', 'twitter', 'instagram', 'youtube')
+# Links worth following from the homepage
+CONTACT_LINK_RE = re.compile(
+    rb'href=["\']([^"\'#\s]*(?:contact|about|team|impressum|kontakt)[^"\'#\s]*)["\']',
+    re.IGNORECASE,
+)
+# Tried when the homepage doesn't link anything that looks like a contact page
+FALLBACK_PATHS = ('/contact', '/about')
+# Preferred mailbox names when a site lists several addresses
+GENERIC_MAILBOXES = ('info', 'contact', 'hello', 'sales', 'office', 'enquiries', 'admin')
+
+def pick_email(emails: List[str], domain: str) -> Optional[str]:
+    """The address to use for a company: same-domain generic mailboxes first"""
+    if not emails:
+        return None
+    def rank(email):
+        local, _, host = email.partition('@')
+        same_domain = host == domain or host.endswith('.' + domain)
+        generic = local in GENERIC_MAILBOXES
+        return (not same_domain, not generic, emails.index(email))
+    return min(emails, key=rank)
+
+class SiteReport:
+    """What one domain's crawl found and spent; filled in as pages arrive,
+    so a crawl cut off by its time budget still reports its first pages"""
+
+    __slots__ = ('domain', 'emails', 'social', 'pages', 'bytes', 'timed_out')
+
+    def __init__(self, domain):
+        self.domain = domain
+        self.emails: List[str] = []
+        self.social: Dict[str, str] = {}
+        self.pages = 0
+        self.bytes = 0
+        self.timed_out = False
+
+    @property
+    def email(self) -> Optional[str]:
+        return pick_email(self.emails, self.domain)
+
+    def add_page(self, content: bytes):
+        self.pages += 1
+        for match in EMAIL_RE.finditer(content):
+            email = match.group(1).decode('ascii', 'ignore').lower().strip('.')
+            if email not in self.emails and not NOT_EMAIL_RE.search(email):
+                self.emails.append(email)
+        for match in SOCIAL_RE.finditer(content):
+            field = SOCIAL_FIELDS[match.group(2).decode('ascii').lower()]
+            self.social.setdefault(field, match.group(1).decode('ascii', 'ignore'))
+
+class WebsiteEnricher:
+    """Find contact emails and social links on leads' own websites.
+
+    Each domain gets its homepage plus the contact/about pages it links
+    to, one page at a time and within ``max_pages``, ``max_bytes`` and
+    ``timeout`` seconds; many domains are crawled at once over one pooled
+    aiohttp session. Like AsyncFetcher, the event loop runs on a daemon
+    thread so synchronous code can call ``enrich`` directly.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, max_pages: Optional[int] = None,
+                 max_bytes: Optional[int] = None, timeout: Optional[float] = None, resolver=None):
+        self.concurrency = concurrency or settings.ENRICH_CONCURRENCY
+        self.max_pages = max_pages or settings.ENRICH_MAX_PAGES
+        self.max_bytes = max_bytes or settings.ENRICH_MAX_BYTES
+        self.timeout = timeout or settings.ENRICH_DOMAIN_TIMEOUT
+        # Custom aiohttp resolver, e.g. to point test domains at a local server
+        self.resolver = resolver
+
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name='website-enricher', daemon=True
+                )
+                self._thread.start()
+        return self._loop
+
+    async def _get_session(self):
+        if self._session is None:
+            connector_kwargs = {'limit': self.concurrency, 'limit_per_host': 1}
+            if self.resolver is not None:
+                connector_kwargs['resolver'] = self.resolver
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(**connector_kwargs),
+                headers={'User-Agent': settings.USER_AGENT, 'Accept': 'text/html'},
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def _fetch_page(self, session, url, report) -> Optional[bytes]:
+        """Body of an HTML page, cut off at what is left of the byte budget"""
+        if report.bytes >= self.max_bytes:
+            return None
+        try:
+            async with session.get(url, max_redirects=3) as response:
+                if response.status >= 400 or 'html' not in response.headers.get('Content-Type', 'text/html'):
+                    return None
+                chunks = []
+                async for chunk in response.content.iter_chunked(16384):
+                    chunks.append(chunk[:self.max_bytes - report.bytes])
+                    report.bytes += len(chunks[-1])
+                    if report.bytes >= self.max_bytes:
+                        metrics.inc('enrich_truncated_pages')
+                        break
+                return b''.join(chunks)
+        except (aiohttp.ClientError, UnicodeError, ValueError) as e:
+            logger.debug(f"Enrichment fetch failed for {url}: {e!r}")
+            return None
+
+    async def _crawl_site(self, session, homepage, report):
+        host = urlsplit(homepage).hostname or ''
+        content = await self._fetch_page(session, homepage, report)
+        if content is None:
+            return
+        report.add_page(content)
+
+        links = []
+        for match in CONTACT_LINK_RE.finditer(content):
+            url = urljoin(homepage, match.group(1).decode('ascii', 'ignore'))
+            if urlsplit(url).hostname == host and url not in links:
+                links.append(url)
+        links = links or [urljoin(homepage, path) for path in FALLBACK_PATHS]
+        for url in links[:self.max_pages - 1]:
+            content = await self._fetch_page(session, url, report)
+            if content is not None:
+                report.add_page(content)
+
+    async def _enrich_domain(self, semaphore, domain, homepage) -> SiteReport:
+        report = SiteReport(domain)
+        async with semaphore:
+            session = await self._get_session()
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._crawl_site(session, homepage, report), self.timeout)
+            except asyncio.TimeoutError:
+                report.timed_out = True
+                metrics.inc('enrich_timeouts')
+            metrics.observe('enrich_seconds', time.perf_counter() - start)
+        metrics.inc('enrich_pages', report.pages)
+        metrics.inc('enrich_bytes', report.bytes)
+        return report
+
+    async def _enrich_all(self, homepages):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        reports = await asyncio.gather(
+            *(self._enrich_domain(semaphore, domain, url) for domain, url in homepages.items())
+        )
+        return {report.domain: report for report in reports}
+
+    def crawl(self, homepages: Dict[str, str]) -> Dict[str, SiteReport]:
+        """Crawl ``{domain: homepage_url}`` concurrently; returns a SiteReport per domain"""
+        if not homepages:
+            return {}
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self._enrich_all(homepages), loop).result()
+
+    def enrich(self, leads: Iterable[Any]) -> List[Any]:
+        """Fill ``email`` and social link fields of leads from their websites, in place.
+
+        Each website domain is crawled once however many leads share it;
+        directory and social-network domains are skipped.
+        """
+        leads = list(leads)
+        homepages = {}
+        for lead in leads:
+            website = lead.get('website') or ''
+            domain = extract_domain(website)
+            if domain and domain not in SHARED_DOMAINS and not lead.get('email'):
+                homepages.setdefault(domain, website)
+        reports = self.crawl(homepages)
+
+        found = 0
+        for lead in leads:
+            for field in ENRICH_COLUMNS:
+                if not lead.get(field):
+                    lead[field] = ''
+            report = reports.get(extract_domain(lead.get('website') or ''))
+            if report is None:
+                continue
+            if report.email:
+                lead['email'] = report.email
+                found += 1
+            for field, url in report.social.items():
+                lead[field] = url
+        metrics.inc('enrich_domains', len(reports))
+        metrics.inc('enrich_emails_found', sum(1 for report in reports.values() if report.email))
+        logger.info(f"Website enrichment: {len(reports)} domains crawled, emails for {found} leads")
+        return leads
+
+    def close(self):
+        if self._loop is None:
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+            self._session = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,222 @@
+
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import settings
+from core.dedup_index import SHARED_DOMAINS
+from utils.data_cleaner import clean_dataframe, extract_domain, normalize_company_name
+from utils.lead import Lead
+
+logger = logging.getLogger(__name__)
+
+# Column names of the other scraper variant (yellowpages-scraper/) and older exports
+COLUMN_ALIASES = {'name': 'company_name', 'category': 'industry'}
+ZIP_RE = r'.*\b(\d{5})(?:-\d{4})?\b'
+# Spelled-out street words, so '100 Main Street' and '100 Main St.' compare equal
+STREET_WORDS = {
+    'street': 'st', 'avenue': 'ave', 'road': 'rd', 'boulevard': 'blvd', 'drive': 'dr',
+    'lane': 'ln', 'court': 'ct', 'place': 'pl', 'highway': 'hwy', 'parkway': 'pkwy',
+    'suite': 'ste', 'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+}
+STREET_WORD_RE = r'\b(?:' + '|'.join(STREET_WORDS) + r')\b'
+# What sources write for a missing value; blanked, or every 'N/A' address
+# would look like one street shared by all the records that have it
+PLACEHOLDERS = {'n/a', 'na', 'none', 'null', 'unknown', '-', '--'}
+# Weight of each kind of evidence in a pair's score. Evidence missing on
+# either side doesn't count against a pair; the score is averaged over
+# what both records have
+WEIGHTS = {'name': 0.4, 'street': 0.3, 'phone': 0.4, 'domain': 0.4}
+
+def _map_unique(values: pd.Series, func) -> pd.Series:
+    """values.map(func), calling func once per distinct value"""
+    codes, uniques = pd.factorize(values)
+    mapped = np.array([func(value) for value in uniques] + [''], dtype=object)
+    return pd.Series(mapped[codes], index=values.index)
+
+def prepare(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Cleaned leads, and the normalized fields resolution compares on.
+
+    The other scraper variant's columns are folded into the Lead ones
+    first, so files from both can be resolved together.
+    """
+    df = df.copy()
+    for old, new in COLUMN_ALIASES.items():
+        if old in df:
+            values = df.pop(old)
+            df[new] = values if new not in df else df[new].mask(df[new].isna() | (df[new] == ''), values)
+    for column in ('company_name', 'phone', 'website', 'address'):
+        if column in df:
+            df[column] = df[column].mask(df[column].astype(str).str.strip().str.lower().isin(PLACEHOLDERS), '')
+    cleaned = clean_dataframe(df.reset_index(drop=True)).astype({
+        column: object for column in ('company_name', 'phone', 'website', 'industry', 'address')
+    })
+    keys = pd.DataFrame(index=cleaned.index)
+    keys['name'] = _map_unique(cleaned['company_name'], normalize_company_name)
+    digits = cleaned['phone'].str.replace(r'\D', '', regex=True).str[-10:]
+    keys['phone'] = digits.where(digits.str.len() >= 7, '')
+    domains = _map_unique(cleaned['website'], extract_domain)
+    keys['domain'] = domains.where(~domains.isin(SHARED_DOMAINS), '')
+    # The street line; city and state are shared by every company of a search
+    street = cleaned['address'].str.lower().str.split(',').str[0].fillna('')
+    street = street.str.replace(STREET_WORD_RE, lambda match: STREET_WORDS[match.group(0)], regex=True)
+    keys['street'] = street.str.replace(r'[^\w\s]', '', regex=True).str.split().str.join(' ')
+    keys['zip'] = cleaned['address'].str.extract(ZIP_RE, expand=False).fillna('')
+    return cleaned, keys
+
+def blocking_keys(keys: pd.DataFrame) -> pd.DataFrame:
+    """(key, row) for every way two records could be the same company.
+
+    Records are only ever compared with records sharing a key: the same
+    phone, website domain, or name prefix (first four letters of the first
+    two name words) on its own and within a ZIP code.
+    """
+    tokens = keys['name'].str.split(' ', n=2)
+    prefix = tokens.str[0].str[:4] + ' ' + tokens.str[1].fillna('').str[:4]
+    has_name = keys['name'] != ''
+    has_zip = has_name & (keys['zip'] != '')
+    parts = [
+        'phone:' + keys['phone'][keys['phone'] != ''],
+        'domain:' + keys['domain'][keys['domain'] != ''],
+        'name:' + prefix[has_name],
+        'namezip:' + prefix[has_zip] + '|' + keys['zip'][has_zip],
+    ]
+    blocks = pd.concat(parts).rename('key').rename_axis('row').reset_index()
+    return blocks[['key', 'row']]
+
+def candidate_pairs(blocks: pd.DataFrame, max_block: Optional[int] = None) -> pd.DataFrame:
+    """Distinct (left, right) record pairs, left < right, that share a blocking key.
+
+    Keys shared by more than ``max_block`` records (a call-centre number,
+    'abc plum') are skipped, which bounds the work per key and keeps the
+    pair count near linear in the number of records.
+    """
+    max_block = max_block or settings.RESOLVE_MAX_BLOCK
+    sizes = blocks['key'].map(blocks['key'].value_counts())
+    oversized = blocks['key'][sizes > max_block].nunique()
+    if oversized:
+        logger.info(f"Skipped {oversized} blocking keys shared by more than {max_block} records")
+    blocks = blocks[(sizes > 1) & (sizes <= max_block)]
+    pairs = blocks.merge(blocks, on='key', suffixes=('_left', '_right'))
+    pairs = pairs[pairs['row_left'] < pairs['row_right']]
+    pairs = pairs[['row_left', 'row_right']].drop_duplicates()
+    return pairs.rename(columns={'row_left': 'left', 'row_right': 'right'}).reset_index(drop=True)
+
+def trigram_similarity(values: pd.Series, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Jaccard similarity of the character trigram sets of values[left] and values[right].
+
+    Each distinct value is split into trigrams once; pairs are then
+    scored with array operations on integer trigram codes, with no Python
+    per pair.
+    """
+    rows = np.unique(np.concatenate([left, right]))
+    value_codes, uniques = pd.factorize(values.iloc[rows])
+    trigrams = pd.Series([{s[i:i + 3] for i in range(len(s) - 2)} for s in '  ' + uniques + ' '])
+    exploded = trigrams.explode().dropna()
+    trigram_codes, _ = pd.factorize(exploded)
+    # Per distinct value, then per row through the value's code
+    per_value = np.bincount(exploded.index, minlength=len(uniques))
+    value_start = np.concatenate([[0], np.cumsum(per_value)[:-1]])
+    row_count = per_value[value_codes]
+    tri_rows = np.repeat(rows, row_count)
+    offsets = np.arange(len(tri_rows)) - np.repeat(np.cumsum(row_count) - row_count, row_count)
+    codes = trigram_codes.astype(np.int64)[np.repeat(value_start[value_codes], row_count) + offsets]
+    order = np.lexsort((codes, tri_rows))
+    tri_rows, codes = tri_rows[order], codes[order]
+
+    # Trigrams of row r are codes[start[r]:start[r] + count[r]]
+    count = np.bincount(tri_rows, minlength=len(values))
+    start = np.concatenate([[0], np.cumsum(count)[:-1]])
+
+    # Every trigram of each pair's left value, looked up among the right value's
+    pair_index = np.repeat(np.arange(len(left)), count[left])
+    offsets = np.arange(len(pair_index)) - np.repeat(np.cumsum(count[left]) - count[left], count[left])
+    left_codes = codes[start[left][pair_index] + offsets]
+    width = int(codes.max()) + 1 if len(codes) else 1
+    # (row, code) keys are sorted already, so membership is a binary search
+    haystack = tri_rows * width + codes
+    needles = right[pair_index] * width + left_codes
+    found = np.searchsorted(haystack, needles).clip(max=max(len(haystack) - 1, 0))
+    shared = haystack[found] == needles if len(haystack) else np.zeros(len(needles), dtype=bool)
+    intersection = np.bincount(pair_index[shared], minlength=len(left))
+    union = count[left] + count[right] - intersection
+    return np.divide(intersection, union, out=np.zeros(len(left)), where=union > 0)
+
+def score_pairs(keys: pd.DataFrame, pairs: pd.DataFrame) -> pd.Series:
+    """Match score in [0, 1] of each candidate pair"""
+    left, right = pairs['left'].to_numpy(), pairs['right'].to_numpy()
+    total = np.zeros(len(pairs))
+    weight = np.zeros(len(pairs))
+    for field, field_weight in WEIGHTS.items():
+        values = keys[field]
+        present = (values.to_numpy()[left] != '') & (values.to_numpy()[right] != '')
+        if field in ('name', 'street'):
+            similarity = trigram_similarity(values, left[present], right[present])
+        else:
+            similarity = (values.to_numpy()[left[present]] == values.to_numpy()[right[present]]).astype(float)
+        if field == 'street':
+            # Same street line in another ZIP code is another place
+            zips = keys['zip'].to_numpy()
+            left_zip, right_zip = zips[left[present]], zips[right[present]]
+            similarity[(left_zip != '') & (right_zip != '') & (left_zip != right_zip)] = 0
+        total[present] += field_weight * similarity
+        weight[present] += field_weight
+    score = np.divide(total, weight, out=np.zeros(len(pairs)), where=weight > 0)
+    # A name alone is not enough: chains have many branches of the same name
+    score[weight <= WEIGHTS['name']] = 0
+    return pd.Series(score, index=pairs.index, name='score')
+
+def connected_components(n: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Component label (its lowest row) of each of n rows, given matched pairs"""
+    labels = np.arange(n)
+    while True:
+        # Hook each pair onto the lower label, then jump pointers to the root
+        lowest = np.minimum(labels[left], labels[right])
+        np.minimum.at(labels, labels[left], lowest)
+        np.minimum.at(labels, labels[right], lowest)
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+        if np.array_equal(labels[left], labels[right]):
+            return labels
+
+def assign_entities(df: pd.DataFrame, threshold: Optional[float] = None,
+                    max_block: Optional[int] = None) -> Tuple[pd.DataFrame, pd.Series]:
+    """Cleaned leads and the entity id of each; records of one company share an id"""
+    threshold = threshold if threshold is not None else settings.RESOLVE_MATCH_THRESHOLD
+    cleaned, keys = prepare(df)
+    pairs = candidate_pairs(blocking_keys(keys), max_block)
+    scores = score_pairs(keys, pairs)
+    matched = pairs[scores >= threshold]
+    labels = connected_components(len(cleaned), matched['left'].to_numpy(), matched['right'].to_numpy())
+    logger.info(f"Entity resolution: {len(cleaned)} records, {len(pairs)} candidate pairs "
+                f"({len(pairs) / max(len(cleaned), 1):.2f} per record), {len(matched)} matches, "
+                f"{len(np.unique(labels))} entities")
+    return cleaned, pd.Series(labels, index=cleaned.index, name='entity_id')
+
+def merge_entities(cleaned: pd.DataFrame, entity_ids: pd.Series) -> pd.DataFrame:
+    """One canonical lead per entity.
+
+    Fields come from the entity's most complete record, gaps filled from
+    its other records; ``records`` counts the records merged.
+    """
+    filled = cleaned.replace('', np.nan)
+    completeness = filled.notna().sum(axis=1)
+    order = np.lexsort((-completeness.to_numpy(), entity_ids.to_numpy()))
+    ranked = filled.iloc[order].assign(entity_id=entity_ids.to_numpy()[order])
+    grouped = ranked.groupby('entity_id', sort=False)
+    canonical = grouped.first()
+    canonical['records'] = grouped.size()
+    columns = [name for name in Lead.FIELDS if name in canonical]
+    columns += [name for name in canonical if name not in columns]
+    return canonical[columns].fillna('').reset_index()
+
+def resolve_entities(df: pd.DataFrame, threshold: Optional[float] = None,
+                     max_block: Optional[int] = None) -> pd.DataFrame:
+    """Merge records of the same company into canonical leads"""
+    cleaned, entity_ids = assign_entities(df, threshold, max_block)
+    return merge_entities(cleaned, entity_ids)
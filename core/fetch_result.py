@@ -0,0 +1,28 @@
+
+class FetchResult:
+    """Minimal response object shared by the non-requests fetch paths.
+
+    Exposes the attributes the scrapers read from ``requests.Response``
+    (``url``, ``status_code``, ``headers``, ``content`` and ``text``) so
+    callers don't need to know which backend produced the page.
+    """
+
+    __slots__ = ('url', 'status_code', 'headers', 'content', 'encoding')
+
+    def __init__(self, url, status_code, headers, content, encoding='utf-8'):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def __repr__(self):
+        return f"<FetchResult [{self.status_code}] {self.url}>"
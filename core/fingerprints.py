@@ -0,0 +1,166 @@
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, List, Optional, Set, Tuple
+
+from config import settings
+from utils.data_cleaner import clean_address_text, normalize_company_name
+from utils.lead import Lead, as_dict
+
+# Where the listings sit on a result page; ads, tracking tokens and the
+# rest of the page change on every request and must not count as changes.
+# UPDATE THESE FOR THE LIVE SITE
+LISTINGS_START = b'class="search-results'
+LISTINGS_END = b'class="pagination'
+WHITESPACE_RE = re.compile(rb'\s+')
+
+# Fields that make up a lead's content; industry, source and date_scraped
+# describe the crawl, not the company
+CONTENT_FIELDS = ('company_name', 'phone', 'website', 'address')
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def page_fingerprint(content: bytes) -> str:
+    """Hash of a result page's listings markup, whitespace-normalized"""
+    content = content or b''
+    start = content.find(LISTINGS_START)
+    if start != -1:
+        end = content.find(LISTINGS_END, start)
+        content = content[start:end if end != -1 else None]
+    return _digest(WHITESPACE_RE.sub(b' ', content).strip())
+
+def lead_identity(lead) -> str:
+    """Which company a lead is: normalized name plus address, stable across edits"""
+    name = normalize_company_name(lead.get('company_name') or '')
+    address = clean_address_text(lead.get('address') or '').lower()
+    return _digest(f"{name}|{address}".encode('utf-8'))
+
+def lead_fingerprint(lead) -> str:
+    """Hash of a lead's cleaned content fields"""
+    return _digest('\x1f'.join(str(lead.get(name) or '') for name in CONTENT_FIELDS).encode('utf-8'))
+
+class FingerprintStore:
+    """Page and lead fingerprints of every (search_term, location) from the last crawl.
+
+    A result page whose fingerprint matches needn't be parsed at all; its
+    leads are known from last time. Parsed pages are compared lead by
+    lead, so only new and changed leads go into the delta, and leads of a
+    fully crawled search that no page listed any more come back as vanished.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or settings.FINGERPRINT_DB
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS pages (
+                    search_term TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    page INTEGER NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    lead_ids TEXT NOT NULL,
+                    PRIMARY KEY (search_term, location, page)
+                )
+            ''')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS leads (
+                    search_term TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    lead_id TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    lead TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (search_term, location, lead_id)
+                )
+            ''')
+
+    def _page(self, search_term, location, page):
+        with self._lock:
+            return self._conn.execute(
+                'SELECT fingerprint, lead_ids FROM pages '
+                'WHERE search_term = ? AND location = ? AND page = ?',
+                (search_term, location, page),
+            ).fetchone()
+
+    def unchanged_page(self, search_term: str, location: str, page: int,
+                       fingerprint: str) -> Optional[List[str]]:
+        """Lead ids of the page if its fingerprint is the stored one, else None"""
+        row = self._page(search_term, location, page)
+        if row is None or row[0] != fingerprint:
+            return None
+        return json.loads(row[1])
+
+    def page_lead_ids(self, search_term: str, location: str, page: int) -> List[str]:
+        """Lead ids recorded for a page, whatever its fingerprint"""
+        row = self._page(search_term, location, page)
+        return json.loads(row[1]) if row else []
+
+    def record_page(self, search_term: str, location: str, page: int, fingerprint: str,
+                    leads: List[Any]) -> Tuple[List[Any], List[str]]:
+        """Store a parsed page; returns its new or changed leads, tagged with ``change``, and all lead ids"""
+        ids = [lead_identity(lead) for lead in leads]
+        prints = [lead_fingerprint(lead) for lead in leads]
+        now = time.time()
+        with self._lock, self._conn:
+            known = {}
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                known.update(self._conn.execute(
+                    f"SELECT lead_id, fingerprint FROM leads WHERE search_term = ? AND location = ? "
+                    f"AND lead_id IN ({','.join('?' * len(chunk))})",
+                    (search_term, location, *chunk),
+                ).fetchall())
+            delta = []
+            for lead, lead_id, lead_print in zip(leads, ids, prints):
+                if known.get(lead_id) == lead_print:
+                    continue
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO leads VALUES (?, ?, ?, ?, ?, ?)',
+                    (search_term, location, lead_id, lead_print, json.dumps(as_dict(lead)), now),
+                )
+                lead['change'] = 'changed' if lead_id in known else 'new'
+                delta.append(lead)
+                known[lead_id] = lead_print
+            self._conn.execute(
+                'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)',
+                (search_term, location, page, fingerprint, json.dumps(ids)),
+            )
+        return delta, ids
+
+    def pop_vanished(self, search_term: str, location: str, present_ids: Set[str]) -> List[Lead]:
+        """Remove and return the stored leads of a search that no page listed this time"""
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                'SELECT lead_id, lead FROM leads WHERE search_term = ? AND location = ?',
+                (search_term, location),
+            ).fetchall()
+            gone = [(lead_id, lead) for lead_id, lead in rows if lead_id not in present_ids]
+            self._conn.executemany(
+                'DELETE FROM leads WHERE search_term = ? AND location = ? AND lead_id = ?',
+                [(search_term, location, lead_id) for lead_id, _ in gone],
+            )
+        vanished = []
+        for _, data in gone:
+            lead = Lead.from_dict(json.loads(data))
+            lead['change'] = 'vanished'
+            vanished.append(lead)
+        return vanished
+
+    def forget_pages_after(self, search_term: str, location: str, last_page: int):
+        """Drop page fingerprints past the end of a search that got shorter"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'DELETE FROM pages WHERE search_term = ? AND location = ? AND page > ?',
+                (search_term, location, last_page),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
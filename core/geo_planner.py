@@ -0,0 +1,168 @@
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+ZIP_RE = re.compile(r'^\d{5}$')
+CITY_STATE_RE = re.compile(r'^(?P<city>.+?),?\s+(?P<state>[A-Za-z]{2})$')
+
+def load_lines(path) -> List[str]:
+    """Non-empty, non-comment lines of an input file"""
+    with open(path, 'r') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+def location_key(location: str) -> Tuple[str, str]:
+    """(kind, normalized value) of a location: a ZIP, a 'City, ST' or a state/region"""
+    location = ' '.join(location.split())
+    if ZIP_RE.match(location):
+        return 'zip', location
+    match = CITY_STATE_RE.match(location)
+    if match and match.group('city').strip(' ,'):
+        return 'city', f"{match.group('city').strip(' ,').title()}, {match.group('state').upper()}"
+    if len(location) == 2 and location.isalpha():
+        return 'state', location.upper()
+    return 'region', location.title()
+
+def dedupe_locations(locations: Iterable[str]) -> List[str]:
+    """Normalized locations with repeats and overlapping queries removed.
+
+    A state listed next to cities in it is dropped: its capped result
+    list would mostly repeat what the narrower city queries find.
+    """
+    keys = {}
+    for location in locations:
+        kind, value = location_key(location)
+        keys.setdefault(value, kind)
+    covered_states = {value[-2:] for value, kind in keys.items() if kind == 'city'}
+    planned = []
+    for value, kind in keys.items():
+        if kind == 'state' and value in covered_states:
+            logger.info(f"Skipping {value}: its cities are queried separately")
+            continue
+        planned.append(value)
+    return planned
+
+def load_locations(path=None) -> List[str]:
+    """Locations to fan each term out to; [DEFAULT_LOCATION] without a locations file"""
+    path = path or settings.LOCATIONS_FILE
+    if path is None:
+        return [settings.DEFAULT_LOCATION]
+    if not path.exists():
+        logger.warning(f"Locations file {path} not found, searching {settings.DEFAULT_LOCATION} only")
+        return [settings.DEFAULT_LOCATION]
+    return dedupe_locations(load_lines(path)) or [settings.DEFAULT_LOCATION]
+
+class YieldHistory:
+    """New leads per fetched page of every (term, location) query in earlier runs.
+
+    Older runs fade out by ``YIELD_DECAY`` per run, so a query that has been
+    mined out drops down the plan after a few runs.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or settings.YIELD_DB
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS yields (
+                    search_term TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    pages REAL NOT NULL,
+                    new_leads REAL NOT NULL,
+                    runs INTEGER NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (search_term, location)
+                )
+            ''')
+
+    def record(self, search_term: str, location: str, pages: int, new_leads: int):
+        if not pages:
+            return  # fully replayed from checkpoints, says nothing about the site
+        decay = settings.YIELD_DECAY
+        with self._lock, self._conn:
+            self._conn.execute('''
+                INSERT INTO yields VALUES (?, ?, ?, ?, 1, ?)
+                ON CONFLICT (search_term, location) DO UPDATE SET
+                    pages = pages * ? + excluded.pages,
+                    new_leads = new_leads * ? + excluded.new_leads,
+                    runs = runs + 1,
+                    updated_at = excluded.updated_at
+            ''', (search_term.lower(), location, pages, new_leads, time.time(), decay, decay))
+
+    def yields(self) -> Dict[Tuple[str, str], float]:
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT search_term, location, new_leads / pages FROM yields WHERE pages > 0'
+            ).fetchall()
+        return {(term, location): rate for term, location, rate in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def _mean(values):
+    return sum(values) / len(values) if values else None
+
+def _mean_rates(yields) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """Mean yield of each term over its locations, and of each location over its terms"""
+    by_term, by_location = defaultdict(list), defaultdict(list)
+    for (term, location), rate in yields.items():
+        by_term[term].append(rate)
+        by_location[location].append(rate)
+    return ({term: _mean(rates) for term, rates in by_term.items()},
+            {location: _mean(rates) for location, rates in by_location.items()})
+
+class QueryPlanner:
+    """Expand search terms into (term, location) jobs, best expected yield first.
+
+    Queries never run before are estimated from the same term in other
+    locations, then the same location for other terms; with no history at
+    all they go first, so every query gets measured once. ``max_jobs``
+    caps the plan so a limited request budget is spent on the top of it.
+    """
+
+    def __init__(self, locations: Optional[List[str]] = None, history: Optional[YieldHistory] = None,
+                 max_jobs: Optional[int] = None):
+        self.locations = locations if locations is not None else load_locations()
+        self.history = history
+        self.max_jobs = max_jobs if max_jobs is not None else settings.GEO_MAX_JOBS
+
+    def expected_yields(self, jobs: Iterable[Tuple[str, str]]) -> List[float]:
+        """Expected new leads per page of each (term, location) job, inf if unknown"""
+        # History is read and averaged once, so this stays linear in jobs + history
+        yields = self.history.yields() if self.history else {}
+        term_means, location_means = _mean_rates(yields)
+        expected = []
+        for search_term, location in jobs:
+            term = search_term.lower()
+            estimate = yields.get((term, location))
+            if estimate is None:
+                estimate = term_means.get(term)
+            if estimate is None:
+                estimate = location_means.get(location)
+            expected.append(float('inf') if estimate is None else estimate)
+        return expected
+
+    def expected_yield(self, search_term: str, location: str) -> float:
+        return self.expected_yields([(search_term, location)])[0]
+
+    def plan(self, search_terms: Iterable[str]) -> List[Tuple[str, str]]:
+        terms = list({term.lower(): term for term in search_terms}.values())
+        jobs = [(term, location) for term in terms for location in self.locations]
+        expected = dict(zip(jobs, self.expected_yields(jobs)))
+        # Stable sort keeps file order among equally promising jobs
+        jobs.sort(key=lambda job: -expected[job])
+        if self.max_jobs and len(jobs) > self.max_jobs:
+            logger.info(f"Planned {len(jobs)} queries, running the {self.max_jobs} most promising")
+            jobs = jobs[:self.max_jobs]
+        return jobs
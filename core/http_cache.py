@@ -0,0 +1,170 @@
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+from config import settings
+from core.fetch_result import FetchResult
+
+logger = logging.getLogger(__name__)
+
+# Response headers worth keeping: validators for revalidation plus the content type
+KEPT_HEADERS = ('ETag', 'Last-Modified', 'Content-Type')
+
+class CacheEntry:
+    __slots__ = ('key', 'url', 'status_code', 'headers', 'body_hash', 'fetched_at', 'encoding')
+
+    def __init__(self, key, url, status_code, headers, body_hash, fetched_at, encoding='utf-8'):
+        self.key = key
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.body_hash = body_hash
+        self.fetched_at = fetched_at
+        self.encoding = encoding
+
+class ResponseCache:
+    """On-disk HTTP response cache keyed by URL and query params.
+
+    Entries live in ``entries/<request key>.json`` and point at bodies
+    stored by content hash in ``bodies/``, so identical pages are kept
+    once. Stale entries are revalidated with ETag / Last-Modified, and in
+    offline mode any stored body is served and nothing touches the network.
+    Bodies are evicted least-recently-used once the total passes ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir=None, ttl=None, max_bytes=None, offline=None):
+        self.cache_dir = Path(cache_dir or settings.HTTP_CACHE_DIR)
+        self.ttl = settings.HTTP_CACHE_TTL if ttl is None else ttl
+        self.max_bytes = max_bytes or settings.HTTP_CACHE_MAX_BYTES
+        self.offline = settings.HTTP_CACHE_OFFLINE if offline is None else offline
+        self.entries_dir = self.cache_dir / 'entries'
+        self.bodies_dir = self.cache_dir / 'bodies'
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        self.bodies_dir.mkdir(parents=True, exist_ok=True)
+        self._total_bytes = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def request_key(url, params=None):
+        query = urlencode(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+        return hashlib.sha256(f"{url}?{query}".encode('utf-8')).hexdigest()
+
+    def _load_entry(self, key):
+        try:
+            with open(self.entries_dir / f"{key}.json", 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(key, **data)
+
+    def _read_body(self, entry):
+        body_path = self.bodies_dir / entry.body_hash
+        try:
+            content = body_path.read_bytes()
+        except OSError:
+            return None
+        os.utime(body_path)  # mark as recently used for eviction
+        return content
+
+    def get(self, url, params=None):
+        """Return ``(result, entry)`` for a request.
+
+        ``result`` is a FetchResult when the cache can answer without the
+        network (fresh entry, or any entry in offline mode). ``entry`` is the
+        stored metadata, used to revalidate a stale response.
+        """
+        entry = self._load_entry(self.request_key(url, params))
+        if entry is None:
+            return None, None
+        if not (self.bodies_dir / entry.body_hash).exists():
+            # Body evicted: a 304 would leave nothing to serve, so refetch unconditionally
+            (self.entries_dir / f"{entry.key}.json").unlink(missing_ok=True)
+            return None, None
+        if self.offline or time.time() - entry.fetched_at < self.ttl:
+            content = self._read_body(entry)
+            if content is None:
+                return None, None
+            return self._to_result(entry, content), entry
+        return None, entry
+
+    def revalidation_headers(self, entry):
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.headers.get('ETag'):
+            headers['If-None-Match'] = entry.headers['ETag']
+        if entry.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = entry.headers['Last-Modified']
+        return headers
+
+    def revalidated(self, entry):
+        """Handle a 304: extend the entry's lifetime and serve the stored body"""
+        content = self._read_body(entry)
+        if content is None:
+            return None
+        entry.fetched_at = time.time()
+        self._write_entry(entry)
+        return self._to_result(entry, content)
+
+    def store(self, url, params, status_code, headers, content, encoding='utf-8'):
+        body_hash = hashlib.sha256(content).hexdigest()
+        body_path = self.bodies_dir / body_hash
+        if not body_path.exists():
+            self._atomic_write(body_path, content)
+            self._account(len(content))
+
+        entry = CacheEntry(
+            self.request_key(url, params),
+            url,
+            status_code,
+            {name: headers[name] for name in KEPT_HEADERS if headers.get(name)},
+            body_hash,
+            time.time(),
+            encoding or 'utf-8',
+        )
+        self._write_entry(entry)
+        return self._to_result(entry, content)
+
+    def _write_entry(self, entry):
+        data = {name: getattr(entry, name) for name in CacheEntry.__slots__ if name != 'key'}
+        self._atomic_write(self.entries_dir / f"{entry.key}.json", json.dumps(data).encode('utf-8'))
+
+    def _atomic_write(self, path, data):
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _to_result(self, entry, content):
+        return FetchResult(entry.url, entry.status_code, dict(entry.headers), content, entry.encoding)
+
+    def _account(self, added):
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(p.stat().st_size for p in self.bodies_dir.iterdir())
+            else:
+                self._total_bytes += added
+            if self._total_bytes <= self.max_bytes:
+                return
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used bodies until the cache is under 90% of max_bytes"""
+        bodies = sorted(
+            (p.stat().st_mtime, p.stat().st_size, p) for p in self.bodies_dir.iterdir()
+        )
+        target = self.max_bytes * 0.9
+        removed = 0
+        for _, size, path in bodies:
+            if self._total_bytes <= target:
+                break
+            path.unlink(missing_ok=True)
+            self._total_bytes -= size
+            removed += 1
+        # Entries whose body is gone read as misses (get drops them) and are refetched
+        logger.info(f"Evicted {removed} cached responses ({self._total_bytes} bytes kept)")
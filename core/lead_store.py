@@ -0,0 +1,214 @@
+
+import logging
+import re
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from utils.lead import _timestamp
+from utils.lead_writer import LeadWriter
+
+logger = logging.getLogger(__name__)
+
+ZIP_RE = re.compile(r'.*\b(\d{5})(?:-\d{4})?\b')
+STORED_FIELDS = ('company_name', 'phone', 'website', 'address', 'industry', 'source', 'email', 'email_result')
+# Columns shown by `run.py query` and returned by LeadStore.query
+RESULT_COLUMNS = ('company_name', 'phone', 'website', 'address', 'zip', 'industry', 'source',
+                  'email', 'email_result', 'first_seen', 'last_seen')
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS leads (
+        id INTEGER PRIMARY KEY,
+        lead_key INTEGER NOT NULL UNIQUE,  -- 64-bit hash of the lead's identity (name + address)
+        company_name TEXT NOT NULL,
+        phone TEXT NOT NULL,
+        website TEXT NOT NULL,
+        domain TEXT NOT NULL,
+        address TEXT NOT NULL,
+        zip TEXT NOT NULL,
+        industry TEXT NOT NULL COLLATE NOCASE,
+        source TEXT NOT NULL,
+        email TEXT NOT NULL,
+        email_result TEXT NOT NULL,
+        first_seen REAL,
+        last_seen REAL
+    );
+    CREATE INDEX IF NOT EXISTS leads_industry_zip ON leads (industry, zip);
+    CREATE INDEX IF NOT EXISTS leads_zip ON leads (zip);
+    CREATE INDEX IF NOT EXISTS leads_domain ON leads (domain);
+    CREATE INDEX IF NOT EXISTS leads_phone ON leads (phone);
+'''
+
+# Full-text index over name, industry and address. It stores no text of
+# its own (external content), only the index. New rows are indexed a batch
+# at a time by LeadStore (an insert trigger costs four times as much);
+# triggers cover deletes and changed text
+FTS_SCHEMA = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS leads_fts USING fts5(
+        company_name, industry, address, content='leads', content_rowid='id'
+    );
+    CREATE TRIGGER IF NOT EXISTS leads_fts_delete AFTER DELETE ON leads BEGIN
+        INSERT INTO leads_fts (leads_fts, rowid, company_name, industry, address)
+        VALUES ('delete', old.id, old.company_name, old.industry, old.address);
+    END;
+    CREATE TRIGGER IF NOT EXISTS leads_fts_update AFTER UPDATE OF company_name, industry, address ON leads
+    WHEN old.company_name IS NOT new.company_name OR old.industry IS NOT new.industry
+        OR old.address IS NOT new.address BEGIN
+        INSERT INTO leads_fts (leads_fts, rowid, company_name, industry, address)
+        VALUES ('delete', old.id, old.company_name, old.industry, old.address);
+        INSERT INTO leads_fts (rowid, company_name, industry, address)
+        VALUES (new.id, new.company_name, new.industry, new.address);
+    END;
+'''
+
+# A lead seen again keeps its first_seen; fields it now lacks keep their old value
+UPSERT = f'''
+    INSERT INTO leads (lead_key, domain, zip, first_seen, last_seen, {', '.join(STORED_FIELDS)})
+    VALUES ({', '.join('?' * (5 + len(STORED_FIELDS)))})
+    ON CONFLICT (lead_key) DO UPDATE SET
+        {', '.join(f"{name} = COALESCE(NULLIF(excluded.{name}, ''), {name})"
+                   for name in ('domain', 'zip', *STORED_FIELDS))},
+        first_seen = MIN(COALESCE(first_seen, excluded.first_seen), COALESCE(excluded.first_seen, first_seen)),
+        last_seen = MAX(COALESCE(last_seen, excluded.last_seen), COALESCE(excluded.last_seen, last_seen))
+'''
+
+def _text(value) -> str:
+    # Missing values arrive as None, NaN or 'N/A' depending on the source file
+    return value if isinstance(value, str) and value != 'N/A' else ''
+
+def _merge_rows(old: list, new: list) -> list:
+    """Two upsert rows of one lead combined the way UPSERT would combine them"""
+    merged = [value or previous for previous, value in zip(old, new)]
+    seen = [value for value in (old[3], new[3]) if value is not None]
+    merged[3] = min(seen) if seen else None
+    seen = [value for value in (old[4], new[4]) if value is not None]
+    merged[4] = max(seen) if seen else None
+    return merged
+
+def fts_query(text: str) -> str:
+    """FTS5 query matching every word of ``text``; a trailing '*' keeps prefix search"""
+    terms = []
+    for word in text.split():
+        prefix = word.endswith('*')
+        word = word.rstrip('*').replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+class LeadStore(LeadWriter):
+    """Every lead ever scraped, in one SQLite file indexed for filtered queries.
+
+    Leads are upserted by identity (normalized name plus address), so
+    re-scraping a company updates its row instead of adding one, and
+    verification results merge into the same row. Writes are batched,
+    one transaction per ``batch_size`` leads. Filters on industry, ZIP,
+    website domain and phone use B-tree indexes and free text uses an
+    FTS5 index, so queries read a handful of pages however large the
+    store grows.
+    """
+
+    def __init__(self, path=None, batch_size: Optional[int] = None):
+        super().__init__(path or settings.LEAD_STORE_DB, batch_size or settings.LEAD_STORE_BATCH_SIZE)
+        self._conn = sqlite3.connect(str(self.path), timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA mmap_size=268435456')
+        self._conn.execute('PRAGMA cache_size=-65536')  # 64 MB: index pages stay cached during bulk loads
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+            try:
+                self._conn.executescript(FTS_SCHEMA)
+                self.full_text = True
+            except sqlite3.OperationalError as e:
+                # SQLite built without FTS5: text search falls back to LIKE scans
+                logger.warning(f"No full-text index for the lead store: {e}")
+                self.full_text = False
+
+    def _write_batch(self, batch):
+        # Only writing needs the cleaning helpers (and with them pandas)
+        from core.fingerprints import lead_identity
+        from utils.data_cleaner import extract_domain
+
+        # One row per identity: a company can come twice in a batch (under two
+        # search terms, say), and its second upsert would update a row the
+        # full-text index doesn't have yet
+        rows = {}
+        for lead in batch:
+            if not _text(lead.get('company_name')):
+                continue  # nothing to identify it by
+            identity = int.from_bytes(bytes.fromhex(lead_identity(lead))[:8], 'big', signed=True)
+            website = _text(lead.get('website'))
+            address = _text(lead.get('address'))
+            match = ZIP_RE.match(address)
+            seen = _timestamp(lead.get('date_scraped'))
+            row = [identity, extract_domain(website), match.group(1) if match else '', seen, seen,
+                   *(_text(lead.get(name)) for name in STORED_FIELDS)]
+            if identity in rows:
+                row = _merge_rows(rows[identity], row)
+            rows[identity] = row
+        with self._conn:
+            # New rows get the next rowids, so everything after this is theirs
+            last_id = self._conn.execute('SELECT MAX(id) FROM leads').fetchone()[0] or 0
+            self._conn.executemany(UPSERT, rows.values())
+            if self.full_text:
+                self._conn.execute(
+                    'INSERT INTO leads_fts (rowid, company_name, industry, address) '
+                    'SELECT id, company_name, industry, address FROM leads WHERE id > ?', (last_id,)
+                )
+
+    def _where(self, text=None, industry=None, zip_prefix=None, domain=None, phone=None,
+               has_website=False, has_email=False, verified=False):
+        clauses, params = [], []
+        if industry:
+            clauses.append('industry = ?')
+            params.append(industry)
+        if zip_prefix:
+            # A range instead of LIKE, so the (industry, zip) index is used
+            clauses.append('zip >= ? AND zip < ?')
+            params += [zip_prefix, zip_prefix[:-1] + chr(ord(zip_prefix[-1]) + 1)]
+        if domain:
+            clauses.append('domain = ?')
+            params.append(domain)
+        if phone:
+            clauses.append('phone = ?')
+            params.append(phone)
+        if has_website:
+            clauses.append("domain != ''")
+        if has_email:
+            clauses.append("email != ''")
+        if verified:
+            clauses.append("email_result = 'deliverable'")
+        if text and self.full_text:
+            clauses.append('id IN (SELECT rowid FROM leads_fts WHERE leads_fts MATCH ?)')
+            params.append(fts_query(text))
+        elif text:
+            for word in text.replace('*', '').split():
+                clauses.append("(company_name || ' ' || industry || ' ' || address) LIKE ?")
+                params.append(f"%{word}%")
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def query(self, text: Optional[str] = None, limit: Optional[int] = 100, **filters) -> List[Dict[str, Any]]:
+        """Leads matching every given filter.
+
+        ``text`` matches words of the name, industry or address ('roto*'
+        for prefixes); the other filters are ``industry``, ``zip_prefix``,
+        ``domain``, ``phone``, ``has_website``, ``has_email`` and ``verified``.
+        """
+        self.flush()
+        where, params = self._where(text, **filters)
+        sql = f"SELECT {', '.join(RESULT_COLUMNS)} FROM leads{where}"
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def count(self, text: Optional[str] = None, **filters) -> int:
+        """Number of leads matching the filters of ``query``"""
+        self.flush()
+        where, params = self._where(text, **filters)
+        return self._conn.execute(f"SELECT COUNT(*) FROM leads{where}", params).fetchone()[0]
+
+    def close(self):
+        super().close()
+        self._conn.close()
@@ -0,0 +1,212 @@
+
+import bisect
+import cProfile
+import json
+import logging
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the duration histogram buckets
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+class Histogram:
+    """Fixed-bucket histogram, cheap to record into and to merge across processes"""
+
+    __slots__ = ('counts', 'sum', 'count', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(DURATION_BUCKETS) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(DURATION_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th quantile"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(DURATION_BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {'counts': list(self.counts), 'sum': self.sum, 'count': self.count, 'max': self.max}
+
+    def merge(self, data: Dict):
+        self.counts = [a + b for a, b in zip(self.counts, data['counts'])]
+        self.sum += data['sum']
+        self.count += data['count']
+        self.max = max(self.max, data['max'])
+
+class Metrics:
+    """Counters and timing histograms for one scrape run.
+
+    ``stage(name)`` times a block into the ``<name>_seconds`` histogram
+    and, for stages listed in ``PROFILE_STAGES``, runs it under a profiler.
+    Worker processes ``drain`` what they recorded and the parent ``merge``s
+    it, so the summary covers the whole run.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profiles = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters: Dict[str, float] = {}
+            self.histograms: Dict[str, Histogram] = {}
+            self.started = time.time()
+
+    def inc(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def stage(self, name: str):
+        profiler = self._start_profile(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - start)
+            if profiler is not None:
+                profiler.disable() if settings.PROFILER == 'cprofile' else profiler.stop()
+                self._local.profiling = False
+
+    def _start_profile(self, name):
+        # One profiler per thread at a time; nested stages are covered by the outer one
+        if name not in settings.PROFILE_STAGES or getattr(self._local, 'profiling', False):
+            return None
+        key = (name, threading.get_ident())
+        with self._lock:
+            profiler = self._profiles.get(key)
+            if profiler is None:
+                if settings.PROFILER == 'pyinstrument':
+                    from pyinstrument import Profiler
+                    profiler = Profiler()
+                else:
+                    profiler = cProfile.Profile()
+                self._profiles[key] = profiler
+        self._local.profiling = True
+        profiler.enable() if settings.PROFILER == 'cprofile' else profiler.start()
+        return profiler
+
+    def drain(self) -> Dict:
+        """Snapshot and clear what this process recorded, for merging elsewhere"""
+        with self._lock:
+            data = {
+                'counters': self.counters,
+                'histograms': {name: h.to_dict() for name, h in self.histograms.items()},
+            }
+            self.counters = {}
+            self.histograms = {}
+        return data
+
+    def merge(self, data: Dict):
+        with self._lock:
+            for name, value in data['counters'].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for name, histogram in data['histograms'].items():
+                self.histograms.setdefault(name, Histogram()).merge(histogram)
+
+    def summary(self) -> Dict:
+        with self._lock:
+            elapsed = time.time() - self.started
+            counters = dict(self.counters)
+            timings = {
+                name: {
+                    'count': h.count,
+                    'total': round(h.sum, 4),
+                    'mean': round(h.sum / h.count, 6) if h.count else None,
+                    'p50': round(h.quantile(0.5), 6),
+                    'p95': round(h.quantile(0.95), 6),
+                    'max': round(h.max, 6),
+                }
+                for name, h in sorted(self.histograms.items())
+            }
+        requests = counters.get('cache_hits', 0) + counters.get('fetch_requests', 0)
+        return {
+            'started_at': datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+            'elapsed_seconds': round(elapsed, 3),
+            'cards_per_second': round(counters.get('cards_parsed', 0) / elapsed, 2) if elapsed else None,
+            'cache_hit_rate': round(counters.get('cache_hits', 0) / requests, 3) if requests else None,
+            'counters': dict(sorted(counters.items())),
+            'timings': timings,
+        }
+
+    def prometheus_text(self, prefix: str = 'leadbuilder') -> str:
+        """Everything in Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                lines.append(f"{prefix}_{name}_total {value}")
+            for name, h in sorted(self.histograms.items()):
+                metric = f"{prefix}_{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip(DURATION_BUCKETS + ('+Inf',), h.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f"{metric}_sum {h.sum}")
+                lines.append(f"{metric}_count {h.count}")
+        return '\n'.join(lines) + '\n'
+
+    def export(self, directory=None):
+        """Write the JSON summary (and Prometheus text, stage profiles if enabled); returns the JSON path"""
+        directory = directory or settings.METRICS_DIR
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+        json_path = directory / f"metrics_{stamp}.json"
+        json_path.write_text(json.dumps(self.summary(), indent=2))
+        if settings.METRICS_PROMETHEUS:
+            (directory / f"metrics_{stamp}.prom").write_text(self.prometheus_text())
+        self._write_profiles(directory, stamp)
+        return json_path
+
+    def _write_profiles(self, directory, stamp):
+        with self._lock:
+            profiles = dict(self._profiles)
+        for stage in sorted({stage for stage, _ in profiles}):
+            stage_profiles = [p for (name, _), p in profiles.items() if name == stage]
+            if settings.PROFILER == 'pyinstrument':
+                for i, profiler in enumerate(stage_profiles):
+                    path = directory / f"profile_{stage}_{stamp}_{i}.html"
+                    path.write_text(profiler.output_html())
+            else:
+                stats = pstats.Stats(stage_profiles[0])
+                for profiler in stage_profiles[1:]:
+                    stats.add(profiler)
+                path = directory / f"profile_{stage}_{stamp}.prof"
+                stats.dump_stats(str(path))
+            logger.info(f"Wrote {stage} profile to {path}")
+
+# Process-wide registry
+metrics = Metrics()
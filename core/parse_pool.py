@@ -0,0 +1,59 @@
+
+import logging
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from config import settings
+from core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+def _init_worker():
+    # A forked worker starts with a copy of the parent's numbers
+    metrics.reset()
+
+def _call_with_metrics(fn, *args):
+    """Run a job in a worker and send back the metrics it recorded"""
+    return fn(*args), metrics.drain()
+
+class ParsePool:
+    """Process pool for CPU-bound page parsing, with backpressure.
+
+    At most ``max_pending`` jobs may be queued or running. ``submit`` blocks
+    the calling fetch thread once that many response bodies are waiting,
+    so a fast crawler can't pile up unparsed pages in memory.
+    """
+
+    def __init__(self, workers=None, max_pending=None):
+        self.workers = workers or settings.PARSE_WORKERS
+        self.max_pending = max_pending or settings.PARSE_QUEUE_SIZE
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        logger.info(f"Started parse pool with {self.workers} workers")
+
+    def submit(self, fn, *args):
+        self._slots.acquire()
+        try:
+            job = self._executor.submit(_call_with_metrics, fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future = Future()
+        job.add_done_callback(lambda job: self._job_done(job, future))
+        return future
+
+    def _job_done(self, job, future):
+        self._slots.release()
+        if job.cancelled():
+            future.cancel()
+            return
+        try:
+            result, worker_metrics = job.result()
+        except BaseException as e:
+            future.set_exception(e)
+            return
+        metrics.merge(worker_metrics)
+        future.set_result(result)
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
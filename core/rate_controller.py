@@ -0,0 +1,250 @@
+
+import asyncio
+import logging
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from config import settings
+from core.rate_limiter import HostRateLimiter, TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying; other 4xx mean the request itself is wrong
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+# Responses that mean the host wants us to slow down; sites answer a
+# crawler going too fast with 403 as often as with 429
+THROTTLE_STATUSES = frozenset((403, 429, 503))
+
+def parse_retry_after(value) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Exponential backoff with full jitter, never shorter than a Retry-After"""
+    ceiling = min(settings.RETRY_BACKOFF_MAX, settings.RETRY_BACKOFF_BASE * 2 ** attempt)
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+def create_rate_limiter(share: float = 1.0):
+    """The per-host limiter settings ask for, scaled to ``share`` of the total rate"""
+    if settings.ADAPTIVE_RATE_CONTROL:
+        return AdaptiveRateController(
+            settings.HOST_RATE_LIMIT * share,
+            settings.HOST_BURST,
+            min_rate=settings.ADAPTIVE_MIN_RATE * share,
+            max_rate=settings.ADAPTIVE_MAX_RATE * share,
+        )
+    return HostRateLimiter(settings.HOST_RATE_LIMIT * share, settings.HOST_BURST)
+
+class HostState:
+    """Rate, concurrency limit and recent outcomes of one host"""
+
+    def __init__(self, rate, capacity, concurrency, window):
+        self.bucket = TokenBucket(rate, capacity)
+        self.limit = concurrency
+        self.in_flight = 0
+        self.cond = threading.Condition()
+        # (loop, future) of coroutines waiting for a slot, woken on release
+        self.waiters = []
+        self.latencies = deque(maxlen=window)
+        # Outcomes since the last adjustment; each decision only looks at
+        # what happened after the previous one
+        self.ok = self.throttled = self.errors = self.empty = 0
+        self.epoch_latencies = []
+        self.adjusted_at = time.monotonic()
+        self.decreases = 0
+
+    def wake(self):
+        """Let threads and coroutines waiting for a slot check again (hold ``cond``)"""
+        self.cond.notify_all()
+        for loop, waiter in self.waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+        self.waiters = []
+
+    @property
+    def samples(self):
+        return self.ok + self.throttled + self.errors + self.empty
+
+    def reset_epoch(self, now):
+        self.ok = self.throttled = self.errors = self.empty = 0
+        self.epoch_latencies = []
+        self.adjusted_at = now
+
+class AdaptiveRateController(HostRateLimiter):
+    """Per-host rate and concurrency limits that follow the site's health.
+
+    Every request reports its latency and status through ``release``.
+    Healthy stretches raise the host's rate by ``ADAPTIVE_RATE_STEP`` and
+    its concurrency by one; a 429/503, a high 5xx or empty-page share, or
+    a p95 latency above ``ADAPTIVE_LATENCY_TARGET`` halves both (AIMD).
+    Changes are at most once per ``ADAPTIVE_INTERVAL`` seconds, so one
+    burst of errors from parallel requests only counts once.
+    """
+
+    MIN_SAMPLES = 5
+    ERROR_RATE_LIMIT = 0.1
+    EMPTY_RATE_LIMIT = 0.2
+
+    def __init__(self, rate: float, capacity: float = 1, min_rate: Optional[float] = None,
+                 max_rate: Optional[float] = None, max_concurrency: Optional[int] = None,
+                 window: Optional[int] = None):
+        super().__init__(rate, capacity)
+        self.min_rate = min_rate if min_rate is not None else settings.ADAPTIVE_MIN_RATE
+        self.max_rate = max_rate if max_rate is not None else settings.ADAPTIVE_MAX_RATE
+        self.max_concurrency = max_concurrency or settings.MAX_CONNECTIONS_PER_HOST
+        self.window = window or settings.ADAPTIVE_WINDOW
+        self._hosts: Dict[str, HostState] = {}
+
+    def _state(self, url: str) -> HostState:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = HostState(
+                    self.rate, self.capacity, min(2, self.max_concurrency), self.window
+                )
+            return state
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        return self._state(url).bucket
+
+    def acquire(self, url: str):
+        state = self._state(url)
+        with state.cond:
+            while state.in_flight >= state.limit:
+                state.cond.wait()
+            state.in_flight += 1
+        try:
+            state.bucket.acquire()
+        except BaseException:
+            self.abandon(url)
+            raise
+
+    async def acquire_async(self, url: str):
+        state = self._state(url)
+        loop = asyncio.get_running_loop()
+        while True:
+            with state.cond:
+                if state.in_flight < state.limit:
+                    state.in_flight += 1
+                    break
+                waiter = loop.create_future()
+                state.waiters.append((loop, waiter))
+            try:
+                await waiter
+            finally:
+                with state.cond:
+                    if (loop, waiter) in state.waiters:
+                        state.waiters.remove((loop, waiter))
+        try:
+            await state.bucket.acquire_async()
+        except BaseException:
+            # Cancelled while waiting for a token: give the slot back
+            self.abandon(url)
+            raise
+
+    def release(self, url: str, latency: Optional[float] = None, status: Optional[int] = None):
+        state = self._state(url)
+        with state.cond:
+            state.in_flight = max(0, state.in_flight - 1)
+            if status is None or (status >= 500 and status not in THROTTLE_STATUSES):
+                state.errors += 1
+            elif status in THROTTLE_STATUSES:
+                state.throttled += 1
+            elif status < 400:
+                state.ok += 1
+                if latency is not None:
+                    state.latencies.append(latency)
+                    state.epoch_latencies.append(latency)
+            # Other 4xx are about the request (a bad page number), not the host's health
+            self._adjust(url, state)
+            state.wake()
+
+    def abandon(self, url: str):
+        state = self._state(url)
+        with state.cond:
+            state.in_flight = max(0, state.in_flight - 1)
+            state.wake()
+
+    def record_empty(self, url: str):
+        state = self._state(url)
+        with state.cond:
+            state.empty += 1
+            self._adjust(url, state)
+            state.wake()
+
+    def _adjust(self, url, state):
+        now = time.monotonic()
+        if now - state.adjusted_at < settings.ADAPTIVE_INTERVAL:
+            return
+        if state.throttled:
+            reason = f"{state.throttled} throttled responses"
+        elif state.samples < self.MIN_SAMPLES:
+            return
+        elif state.errors / state.samples > self.ERROR_RATE_LIMIT:
+            reason = f"{state.errors}/{state.samples} failed requests"
+        elif state.empty / state.samples > self.EMPTY_RATE_LIMIT:
+            reason = f"{state.empty}/{state.samples} empty pages"
+        elif (len(state.epoch_latencies) >= 2 and
+              percentile(state.epoch_latencies, 95) > settings.ADAPTIVE_LATENCY_TARGET):
+            reason = f"p95 latency {percentile(state.epoch_latencies, 95):.2f}s"
+        else:
+            reason = None
+
+        if reason:
+            rate = max(self.min_rate, state.bucket.rate / 2)
+            state.limit = max(1, state.limit // 2)
+            state.decreases += 1
+            logger.warning(f"Slowing down {urlsplit(url).netloc} to {rate:.2f} req/s, "
+                           f"{state.limit} in flight ({reason})")
+        else:
+            rate = min(self.max_rate, state.bucket.rate + settings.ADAPTIVE_RATE_STEP)
+            state.limit = min(self.max_concurrency, state.limit + 1)
+        state.bucket.set_rate(rate)
+        state.reset_epoch(now)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Current rate, concurrency and latency percentiles of every host"""
+        with self._lock:
+            hosts = dict(self._hosts)
+        summary = {}
+        for host, state in hosts.items():
+            with state.cond:
+                latencies = list(state.latencies)
+                summary[host] = {
+                    'rate': state.bucket.rate,
+                    'concurrency': state.limit,
+                    'p50': percentile(latencies, 50),
+                    'p95': percentile(latencies, 95),
+                    'slowdowns': state.decreases,
+                }
+        return summary
+
+def _wake(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+def percentile(values, pct) -> Optional[float]:
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
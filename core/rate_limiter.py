@@ -0,0 +1,93 @@
+
+import asyncio
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second"""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            if self.tokens >= 0 or self.rate <= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def _refill(self, now):
+        if self.rate > 0:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def set_rate(self, rate: float):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for the next ``seconds`` (e.g. a Retry-After)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.rate > 0:
+                self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class HostRateLimiter:
+    """One token bucket per host, so politeness is enforced per site"""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.capacity)
+            return bucket
+
+    def acquire(self, url: str):
+        self.bucket_for(url).acquire()
+
+    async def acquire_async(self, url: str):
+        await self.bucket_for(url).acquire_async()
+
+    def release(self, url: str, latency: Optional[float] = None, status: Optional[int] = None):
+        """Report how a request that went through ``acquire`` ended.
+
+        ``status`` is None when no response came back. The fixed-rate
+        limiter ignores it; AdaptiveRateController adjusts to it.
+        """
+
+    def abandon(self, url: str):
+        """Give back an ``acquire`` whose request was never sent"""
+
+    def record_empty(self, url: str):
+        """Report a result page that came back without listings"""
+
+    def pause(self, url: str, seconds: float):
+        self.bucket_for(url).pause(seconds)
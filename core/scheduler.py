@@ -0,0 +1,220 @@
+
+import logging
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from config import settings
+from core.base_scraper import create_session
+from core.checkpoint import CheckpointStore
+from core.dedup_index import DedupIndex
+from core.fingerprints import FingerprintStore
+from core.http_cache import ResponseCache
+from core.metrics import metrics
+from core.parse_pool import ParsePool
+from core.rate_controller import AdaptiveRateController, create_rate_limiter
+from scrapers.hybrid_scraper import HybridYellowPagesScraper, SharedBrowserPool
+from scrapers.yellow_pages_scraper import YellowPagesScraper
+
+logger = logging.getLogger(__name__)
+
+class SharedResources:
+    """Connection pool, rate limiter and fetcher shared by every scraper in a process.
+
+    Pickling sends only the constructor arguments; the copy opens its own
+    connections, sessions and pools in the process that unpickles it.
+    """
+
+    def __init__(self, workers=1, rate_share=1.0, backend=None, use_checkpoints=False,
+                 parse_workers=0, dedup=None):
+        self.backend = backend or settings.FETCH_BACKEND
+        self._args = (workers, rate_share, self.backend, use_checkpoints, parse_workers)
+        self.dedup = dedup
+        self.checkpoint = CheckpointStore() if use_checkpoints else None
+        self.fingerprints = FingerprintStore() if settings.DELTA_CRAWL else None
+        self.cache = ResponseCache() if settings.HTTP_CACHE_ENABLED else False
+        self.parse_pool = ParsePool(workers=parse_workers) if parse_workers else None
+        self.session = create_session(pool_size=workers)
+        self.rate_limiter = create_rate_limiter(rate_share)
+        # Started on the first blocked page, so runs that are never blocked never launch Chrome
+        self.browser_pool = (
+            SharedBrowserPool(self.rate_limiter) if settings.BROWSER_FALLBACK else None
+        )
+        self.fetcher = None
+        if self.backend == 'async':
+            from core.async_fetcher import AsyncFetcher
+            self.fetcher = AsyncFetcher(
+                headers=dict(self.session.headers),
+                rate_limiter=self.rate_limiter,
+                cache=self.cache or None,
+            )
+
+    def __reduce__(self):
+        return SharedResources, self._args + (self.dedup,)
+
+    def scrape(self, search_term, pages_to_scrape, location=None):
+        logger.info(f"Processing search term: {search_term}" + (f" in {location}" if location else ""))
+        scraper_kwargs = {}
+        if location:
+            scraper_kwargs['location'] = location
+        scraper_class = YellowPagesScraper
+        if self.browser_pool is not None:
+            scraper_class = HybridYellowPagesScraper
+            scraper_kwargs['browser_pool'] = self.browser_pool
+        scraper = scraper_class(
+            search_term,
+            backend=self.backend,
+            fetcher=self.fetcher,
+            rate_limiter=self.rate_limiter,
+            session=self.session,
+            checkpoint=self.checkpoint,
+            cache=self.cache,
+            parse_pool=self.parse_pool,
+            dedup=self.dedup,
+            fingerprints=self.fingerprints,
+            **scraper_kwargs,
+        )
+        try:
+            # Only one term's leads are held at a time; run.py streams them out
+            leads = list(scraper.iter_companies(pages_to_scrape=pages_to_scrape))
+            return leads, dict(scraper.page_stats)
+        finally:
+            scraper.close()
+
+    def close(self):
+        if isinstance(self.rate_limiter, AdaptiveRateController):
+            for host, stats in self.rate_limiter.stats().items():
+                if stats['p50'] is not None:
+                    logger.info(
+                        f"{host}: ended at {stats['rate']:.2f} req/s, {stats['concurrency']} in flight, "
+                        f"p50 {stats['p50']:.2f}s, p95 {stats['p95']:.2f}s, "
+                        f"{stats['slowdowns']} slowdowns"
+                    )
+        if self.fetcher is not None:
+            self.fetcher.close()
+        if self.parse_pool is not None:
+            self.parse_pool.close()
+        if self.browser_pool is not None:
+            self.browser_pool.close()
+        if self.checkpoint is not None:
+            self.checkpoint.close()
+        if self.fingerprints is not None:
+            self.fingerprints.close()
+        self.session.close()
+
+# Resources of a process-mode worker, built once by _init_process_worker
+_process_resources = None
+
+def _init_process_worker(rate_share, backend, use_checkpoints, dedup_path):
+    global _process_resources
+    metrics.reset()  # drop the parent's numbers copied in by fork
+    # A connection of its own: SQLite connections must not cross a fork
+    _process_resources = SharedResources(
+        rate_share=rate_share, backend=backend, use_checkpoints=use_checkpoints,
+        dedup=DedupIndex(dedup_path) if dedup_path else None,
+    )
+
+def _scrape_in_process(search_term, pages_to_scrape, location=None):
+    leads, page_stats = _process_resources.scrape(search_term, pages_to_scrape, location)
+    return leads, page_stats, metrics.drain()
+
+class TermScheduler:
+    """Scrape search terms on a bounded worker pool.
+
+    In thread mode every worker shares one connection pool, one per-host
+    rate limit and one ParsePool, so fetching threads never stall on parsing.
+    Process mode gives each worker process its own pool and an equal slice
+    of the rate limit so the total stays the same, and parses inline.
+
+    ``dedup`` is the run's DedupIndex, which scrapers consult to stop paging
+    once results only repeat known leads. Worker processes open their own
+    read connection and only see keys the index has flushed.
+    """
+
+    def __init__(self, workers=None, mode=None, pages_to_scrape=None, backend=None,
+                 use_checkpoints=None, dedup=None):
+        self.workers = workers or settings.TERM_WORKERS
+        self.mode = mode or settings.TERM_WORKER_MODE
+        self.pages_to_scrape = pages_to_scrape or settings.MAX_PAGES_PER_TERM
+        self.backend = backend or settings.FETCH_BACKEND
+        if use_checkpoints is None:
+            use_checkpoints = settings.USE_CHECKPOINTS
+        self.use_checkpoints = use_checkpoints
+        self.dedup = dedup
+        # Pages fetched, replayed and skipped across every term
+        self.page_stats = Counter()
+        self.last_page_stats = {}
+        # Only keep a couple of terms queued per worker so huge term lists
+        # don't turn into thousands of pending futures up front
+        self.max_pending = self.workers * 2
+        self.resources = None
+
+    def _make_executor(self):
+        if self.mode == 'process':
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_process_worker,
+                initargs=(
+                    1 / self.workers, self.backend, self.use_checkpoints,
+                    self.dedup.path if self.dedup is not None else None,
+                ),
+            )
+        if self.resources is None:
+            self.resources = SharedResources(
+                workers=self.workers,
+                backend=self.backend,
+                use_checkpoints=self.use_checkpoints,
+                parse_workers=settings.PARSE_WORKERS,
+                dedup=self.dedup,
+            )
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='term')
+
+    def _submit(self, executor, job):
+        # A job is a search term or a (search_term, location) pair from QueryPlanner
+        search_term, location = (job, None) if isinstance(job, str) else job
+        if self.mode == 'process':
+            return executor.submit(_scrape_in_process, search_term, self.pages_to_scrape, location)
+        return executor.submit(self.resources.scrape, search_term, self.pages_to_scrape, location)
+
+    def run(self, search_terms):
+        """Scrape every term, yielding (search_term, leads) as each one finishes.
+
+        Items may also be (search_term, location) jobs, which are yielded
+        back as given. ``last_page_stats`` holds the page stats of the job
+        just yielded.
+        """
+        executor = self._make_executor()
+        terms = iter(search_terms)
+        pending = {}
+        try:
+            while True:
+                while len(pending) < self.max_pending:
+                    search_term = next(terms, None)
+                    if search_term is None:
+                        break
+                    pending[self._submit(executor, search_term)] = search_term
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    search_term = pending.pop(future)
+                    try:
+                        leads, page_stats, *worker_metrics = future.result()
+                        self.page_stats.update(page_stats)
+                        self.last_page_stats = page_stats
+                        for recorded in worker_metrics:
+                            # Recorded in a worker process
+                            metrics.merge(recorded)
+                    except Exception as e:
+                        logger.error(f"Failed to process {search_term}: {e}")
+                        leads = []
+                        self.last_page_stats = {}
+                    yield search_term, leads
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def close(self):
+        if self.resources is not None:
+            self.resources.close()
+            self.resources = None
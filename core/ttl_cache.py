@@ -0,0 +1,69 @@
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+class TTLCache:
+    """Persistent key/value cache in SQLite whose entries expire after ``ttl`` seconds.
+
+    Values are stored as JSON, grouped by ``namespace`` so several kinds of
+    lookups can share one file.
+    """
+
+    def __init__(self, path, ttl: float, namespace: str = 'default'):
+        self.path = path
+        self.ttl = ttl
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            ''')
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        found = {}
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f'SELECT key, value FROM cache WHERE namespace = ? AND stored_at >= ? '
+                    f'AND key IN ({placeholders})',
+                    [self.namespace, cutoff, *chunk],
+                ).fetchall()
+                found.update((key, json.loads(value)) for key, value in rows)
+        return found
+
+    def set(self, key: str, value: Any):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)',
+                (self.namespace, key, json.dumps(value), time.time()),
+            )
+
+    def purge_expired(self):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'DELETE FROM cache WHERE namespace = ? AND stored_at < ?',
+                (self.namespace, time.time() - self.ttl),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,58 +1,389 @@
 
-import pandas as pd
+import argparse
+import logging
+import sys
 from pathlib import Path
-from datetime import datetime
-from scrapers.yellow_pages_scraper import YellowPagesScraper
-from core.email_verifier import EmailVerifier
+
 from config import settings
-import logging
+
+# Everything heavier than argparse (pandas, requests, bs4, the crawl engine)
+# is imported inside the command that needs it, so `--help`, `stats` and
+# a resume with nothing left to do start in milliseconds
 
 logger = logging.getLogger(__name__)
 
-def main():
-    logger.info("Starting B2B Lead List Builder")
-    
-    # Read search terms
-    search_terms_file = settings.INPUT_DIR / 'search_terms.txt'
+def read_search_terms(path=None):
+    search_terms_file = path or settings.INPUT_DIR / 'search_terms.txt'
     if not search_terms_file.exists():
         logger.error("Search terms file not found!")
-        return
-    
+        return None
     with open(search_terms_file, 'r') as f:
-        search_terms = [line.strip() for line in f if line.strip() and not line.startswith('#')]
-    
-    all_leads = []
-    
-    # Scrape for each search term
-    for search_term in search_terms:
-        logger.info(f"Processing search term: {search_term}")
-        
-        try:
-            scraper = YellowPagesScraper(search_term)
-            leads = scraper.search_companies(pages_to_scrape=2)  # Scrape 2 pages per term
-            all_leads.extend(leads)
-            
-        except Exception as e:
-            logger.error(f"Failed to process {search_term}: {e}")
-            continue
-    
-    # Save raw data first
-    if all_leads:
-        df = pd.DataFrame(all_leads)
-        
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = settings.OUTPUT_DIR / f'leads_{timestamp}.csv'
-        
-        df.to_csv(output_file, index=False)
-        logger.info(f"Saved {len(all_leads)} leads to {output_file}")
-        
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+def unfinished_jobs(jobs):
+    """Jobs not checkpointed as finished"""
+    from core.checkpoint import CheckpointStore
+
+    checkpoint = CheckpointStore()
+    try:
+        return [job for job in jobs if not checkpoint.term_done(*job)]
+    finally:
+        checkpoint.close()
+
+def scrape(args):
+    from core.geo_planner import QueryPlanner, YieldHistory, load_locations
+
+    logger.info("Starting B2B Lead List Builder")
+    search_terms = read_search_terms(args.terms)
+    if search_terms is None:
+        return 1
+
+    # Fan every term out over the locations file, most productive queries first
+    history = YieldHistory()
+    planner = QueryPlanner(locations=load_locations(args.locations), history=history)
+    jobs = planner.plan(search_terms)
+    logger.info(f"Planned {len(jobs)} queries: {len(search_terms)} terms x {len(planner.locations)} locations")
+    if args.dry_run:
+        for (search_term, location), expected in zip(jobs, planner.expected_yields(jobs)):
+            print(f"{search_term}\t{location}\t{'new' if expected == float('inf') else f'{expected:.2f}'}")
+        history.close()
+        return 0
+    if settings.USE_CHECKPOINTS and not unfinished_jobs(jobs):
+        logger.info("Every planned query is checkpointed as finished, nothing to do")
+        history.close()
+        return 0
+
+    from core.dedup_index import DedupIndex
+    from core.metrics import metrics
+    from core.scheduler import TermScheduler
+    from utils.lead_writer import open_lead_writer
+
+    metrics.reset()
+    sample_leads = []
+    store = None
+    if settings.USE_LEAD_STORE:
+        from core.lead_store import LeadStore
+        store = LeadStore()
+    enricher = None
+    if settings.ENRICH_WEBSITES:
+        from core.enrichment import WebsiteEnricher
+        enricher = WebsiteEnricher()
+
+    # Drop companies already found under another term or in an earlier run
+    dedup = DedupIndex() if settings.USE_DEDUP else None
+    # Scrape the search terms on a worker pool and stream each term's leads
+    # straight to disk, so memory stays flat and a crash keeps earlier rows
+    scheduler = TermScheduler(dedup=dedup)
+    try:
+        prefix = 'delta' if settings.DELTA_CRAWL else 'leads'
+        with open_lead_writer(output_format=args.format, prefix=prefix) as writer:
+            for (search_term, location), leads in scheduler.run(jobs):
+                scraped = len(leads)
+                if dedup:
+                    with metrics.stage('dedup'):
+                        # A delta's changed and vanished leads are known by definition
+                        updates = [lead for lead in leads if lead.get('change', 'new') != 'new']
+                        leads = dedup.filter_new(lead for lead in leads if lead.get('change', 'new') == 'new')
+                        leads += updates
+                logger.info(f"Finished {search_term} in {location}: {scraped} leads, {len(leads)} new")
+                if enricher:
+                    with metrics.stage('enrich'):
+                        enricher.enrich(leads)
+                history.record(search_term, location, scheduler.last_page_stats.get('pages_fetched', 0), len(leads))
+                with metrics.stage('write'):
+                    writer.write_many(leads)
+                if store:
+                    with metrics.stage('store'):
+                        store.write_many(leads)
+                metrics.inc('leads_written', len(leads))
+                if len(sample_leads) < 3:
+                    sample_leads.extend(leads[:3 - len(sample_leads)])
+    finally:
+        scheduler.close()
+        history.close()
+        if dedup:
+            dedup.close()
+        if enricher:
+            enricher.close()
+        if store:
+            store.close()
+
+    if dedup and dedup.duplicates:
+        logger.info(f"Skipped {dedup.duplicates} duplicate leads")
+
+    stats = scheduler.page_stats
+    logger.info(
+        f"Fetched {stats['pages_fetched']} result pages, replayed {stats['pages_replayed']} "
+        f"from checkpoints. Result counts planned {stats['pages_planned']} pages, "
+        f"saving {stats['empty_probes_avoided']} empty-page probes; "
+        f"{stats['pages_seen_cutoff']} planned pages skipped after pages of known leads "
+        f"({stats['pages_discarded']} fetched ahead and dropped). "
+        f"{stats['pages_browser']} blocked or empty pages rendered in a browser"
+    )
+    if settings.DELTA_CRAWL:
+        logger.info(f"Delta crawl: {stats['pages_unchanged']} unchanged pages not parsed, "
+                    f"{stats['leads_vanished']} leads vanished")
+    for name, value in stats.items():
+        metrics.inc(name, value)
+    logger.info(f"Run metrics written to {metrics.export()}")
+
+    if writer.rows_written:
+        logger.info(f"Saved {writer.rows_written} leads to {writer.path}")
+
         # Show sample output
+        import pandas as pd
+        from utils.lead import as_dict
         print("\n=== SAMPLE OUTPUT (First 3 rows) ===")
-        print(df.head(3).to_string(index=False))
-        
+        print(pd.DataFrame([as_dict(lead) for lead in sample_leads]).to_string(index=False))
+
     else:
         logger.warning("No leads were scraped!")
+    return 0
+
+def verify(args):
+    """Find and verify an email for every lead of a CSV file"""
+    import csv
+    from core.email_verifier import EmailVerifier
+    from core.enrichment import WebsiteEnricher
+    from utils.data_cleaner import extract_domain
+
+    with open(args.input, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    if not rows:
+        logger.warning(f"No leads in {args.input}")
+        return 0
+
+    # Emails on the companies' own sites are free; Hunter only searches the rest
+    missing = {extract_domain(row.get('website') or '') for row in rows if not row.get('email')}
+    with WebsiteEnricher() as enricher:
+        enricher.enrich(rows)
+    still_missing = {extract_domain(row.get('website') or '') for row in rows if not row.get('email')}
+    logger.info(f"Company websites had emails for {len(missing - still_missing)} domains, "
+                f"saving as many Hunter domain searches")
+
+    verifier = EmailVerifier()
+    try:
+        # Leads still without an email get the first one Hunter knows for their domain
+        domains = [extract_domain(row.get('website') or '') for row in rows]
+        found = verifier.search_domains(
+            domain for row, domain in zip(rows, domains) if domain and not row.get('email')
+        )
+        for row, domain in zip(rows, domains):
+            if not row.get('email') and found.get(domain):
+                row['email'] = found[domain][0].get('value', '')
+        results = verifier.verify_many(row['email'] for row in rows if row.get('email'))
+    finally:
+        verifier.close()
+
+    for row in rows:
+        result = results.get((row.get('email') or '').strip().lower(), {})
+        row['email'] = row.get('email') or ''
+        row['email_result'] = result.get('result', '')
+        row['email_score'] = result.get('score', '')
+
+    output = args.output or args.input.with_name(f"{args.input.stem}_verified.csv")
+    with open(output, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]), lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(rows)
+    if settings.USE_LEAD_STORE:
+        # Later queries can then ask for verified emails
+        from core.lead_store import LeadStore
+        with LeadStore() as store:
+            store.write_many(rows)
+    deliverable = sum(row['email_result'] == 'deliverable' for row in rows)
+    logger.info(f"Verified {len(results)} emails, {deliverable} deliverable, saved to {output}")
+    return 0
+
+def export(args):
+    """Copy leads out of the Parquet dataset (or any lead file) to CSV or Parquet"""
+    source = args.source or settings.LEAD_DATASET_DIR
+    if source.is_dir():
+        from utils.lead_writer import read_lead_dataset
+        df = read_lead_dataset(source, industry=args.industry)
+    else:
+        import pandas as pd
+        df = pd.read_parquet(source) if source.suffix == '.parquet' else pd.read_csv(source)
+        if args.industry is not None:
+            df = df[df['industry'] == args.industry]
+
+    if args.output.suffix == '.parquet':
+        df.to_parquet(args.output, index=False)
+    else:
+        df.to_csv(args.output, index=False)
+    logger.info(f"Exported {len(df)} leads to {args.output}")
+    return 0
+
+def resolve(args):
+    """Merge records of the same company across lead files into canonical leads"""
+    import pandas as pd
+    from core.entity_resolution import resolve_entities
+
+    frames = []
+    for source in args.inputs:
+        if source.is_dir():
+            from utils.lead_writer import read_lead_dataset
+            frames.append(read_lead_dataset(source))
+        elif source.suffix == '.parquet':
+            frames.append(pd.read_parquet(source))
+        else:
+            frames.append(pd.read_csv(source, dtype=str, keep_default_na=False))
+    df = pd.concat(frames, ignore_index=True)
+
+    canonical = resolve_entities(df, threshold=args.threshold)
+    if args.output.suffix == '.parquet':
+        canonical.to_parquet(args.output, index=False)
+    else:
+        canonical.to_csv(args.output, index=False)
+    logger.info(f"Resolved {len(df)} records into {len(canonical)} companies, saved to {args.output}")
+    return 0
+
+def import_leads(args):
+    """Load existing lead files into the lead store"""
+    import pandas as pd
+    from core.entity_resolution import COLUMN_ALIASES
+    from core.lead_store import LeadStore
+
+    with LeadStore() as store:
+        for source in args.inputs:
+            if source.is_dir():
+                from utils.lead_writer import read_lead_dataset
+                df = read_lead_dataset(source)
+            elif source.suffix == '.parquet':
+                df = pd.read_parquet(source)
+            else:
+                df = pd.read_csv(source, dtype=str, keep_default_na=False)
+            # Files of the other scraper variant name their columns differently
+            df = df.rename(columns={old: new for old, new in COLUMN_ALIASES.items() if new not in df})
+            store.write_many(df.to_dict('records'))
+            logger.info(f"Imported {len(df)} leads from {source}")
+        total = store.count()
+    logger.info(f"Lead store {settings.LEAD_STORE_DB} holds {total} leads")
+    return 0
+
+def query(args):
+    """Search the lead store"""
+    import time
+    from core.lead_store import LeadStore, RESULT_COLUMNS
+
+    filters = {
+        'industry': args.industry, 'zip_prefix': args.zip, 'domain': args.domain,
+        'has_website': args.has_website, 'has_email': args.has_email, 'verified': args.verified,
+    }
+    store = LeadStore()
+    try:
+        start = time.perf_counter()
+        if args.count:
+            print(store.count(args.text, **filters))
+            rows = []
+        else:
+            rows = store.query(args.text, limit=args.limit or None, **filters)
+        elapsed = (time.perf_counter() - start) * 1000
+    finally:
+        store.close()
+
+    if args.output:
+        import csv
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS, lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        for row in rows:
+            print('\t'.join(str(row[name] or '') for name in ('company_name', 'phone', 'website', 'address',
+                                                             'industry', 'email', 'email_result')))
+    logger.info(f"{'Counted' if args.count else f'{len(rows)} leads'} in {elapsed:.1f} ms")
+    return 0
+
+def stats(args):
+    """Summary of the last run's metrics and the best and worst queries so far"""
+    import json
+
+    runs = sorted(settings.METRICS_DIR.glob('metrics_*.json'))
+    if runs:
+        summary = json.loads(runs[-1].read_text())
+        counters = summary['counters']
+        print(f"Last run {summary['started_at']}: {summary['elapsed_seconds']}s, "
+              f"{counters.get('leads_written', 0)} leads written, "
+              f"{counters.get('pages_fetched', 0)} pages fetched, "
+              f"{summary['cards_per_second']} cards/s, cache hit rate {summary['cache_hit_rate']}")
+    else:
+        print("No run metrics yet")
+
+    if settings.YIELD_DB.exists():
+        from core.geo_planner import YieldHistory
+        history = YieldHistory()
+        yields = sorted(history.yields().items(), key=lambda item: -item[1])
+        history.close()
+        print(f"\nNew leads per page, {len(yields)} queries:")
+        shown = yields if len(yields) <= 2 * args.top else yields[:args.top] + yields[-args.top:]
+        for (search_term, location), rate in shown:
+            print(f"{rate:8.2f}  {search_term} in {location}")
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='run.py', description="B2B Lead List Builder")
+    parser.add_argument('-v', '--verbose', action='store_true', help='log at DEBUG level')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+
+    cmd = commands.add_parser('scrape', help='scrape the search terms (default)')
+    cmd.add_argument('--terms', type=Path, help='search terms file (default data/input/search_terms.txt)')
+    cmd.add_argument('--locations', type=Path,
+                     help='locations file to fan every term out over (default LOCATIONS_FILE, or United States only)')
+    cmd.add_argument('--format', choices=('csv', 'parquet', 'dataset'), help='output format (default OUTPUT_FORMAT)')
+    cmd.add_argument('--dry-run', action='store_true', help='print the planned queries and exit')
+    cmd.set_defaults(func=scrape)
+
+    cmd = commands.add_parser('verify', help='find and verify emails for a leads CSV')
+    cmd.add_argument('input', type=Path)
+    cmd.add_argument('-o', '--output', type=Path, help='default <input>_verified.csv')
+    cmd.set_defaults(func=verify)
+
+    cmd = commands.add_parser('export', help='export leads from the Parquet dataset')
+    cmd.add_argument('output', type=Path, help='.csv or .parquet file')
+    cmd.add_argument('--source', type=Path, help='dataset directory or lead file (default LEAD_DATASET_DIR)')
+    cmd.add_argument('--industry', help='only this industry')
+    cmd.set_defaults(func=export)
+
+    cmd = commands.add_parser('resolve', help='merge duplicate companies across lead files')
+    cmd.add_argument('output', type=Path, help='.csv or .parquet file')
+    cmd.add_argument('inputs', type=Path, nargs='+', help='lead files or dataset directories, of either scraper')
+    cmd.add_argument('--threshold', type=float, help='match score to merge at (default RESOLVE_MATCH_THRESHOLD)')
+    cmd.set_defaults(func=resolve)
+
+    cmd = commands.add_parser('import', help='load lead files into the lead store')
+    cmd.add_argument('inputs', type=Path, nargs='+', help='lead files or dataset directories')
+    cmd.set_defaults(func=import_leads)
+
+    cmd = commands.add_parser('query', help='search the lead store')
+    cmd.add_argument('text', nargs='?', help="words of the name, industry or address; 'roto*' for a prefix")
+    cmd.add_argument('--industry', help='e.g. plumbers (any case)')
+    cmd.add_argument('--zip', help='ZIP code or prefix, e.g. 100')
+    cmd.add_argument('--domain', help='website domain')
+    cmd.add_argument('--has-website', action='store_true')
+    cmd.add_argument('--has-email', action='store_true')
+    cmd.add_argument('--verified', action='store_true', help='only deliverable emails')
+    cmd.add_argument('--limit', type=int, default=50, help='0 for all')
+    cmd.add_argument('--count', action='store_true', help='print the number of matches only')
+    cmd.add_argument('-o', '--output', type=Path, help='write matches to a CSV file instead')
+    cmd.set_defaults(func=query)
+
+    cmd = commands.add_parser('stats', help='show the last run and query yields')
+    cmd.add_argument('--top', type=int, default=10, help='best and worst queries to show')
+    cmd.set_defaults(func=stats)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    argv = sys.argv[1:] if argv is None else argv
+    args = parser.parse_args(argv)
+    if args.command is None:
+        # Plain `python run.py` (what cron runs) still means scrape
+        args = parser.parse_args([*argv, 'scrape'])
+
+    from config import runtime
+    runtime.init(level=logging.DEBUG if args.verbose else logging.INFO)
+    return args.func(args)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
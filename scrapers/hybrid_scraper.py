@@ -0,0 +1,107 @@
+
+import logging
+import re
+import threading
+
+import requests
+
+from scrapers.yellow_pages_scraper import YellowPagesScraper
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses the site answers bots with (make_request returns None for them)
+# and page text that means a bot check instead of listings. UPDATE FOR THE LIVE SITE
+BLOCK_MARKERS = (b'captcha', b'access denied', b'are you a robot', b'unusual traffic')
+# A listing card: 'result' as a whole class token, the parsers' selector;
+# 'no-result' or 'result-count' elsewhere on a page don't count
+CARD_MARKER_RE = re.compile(rb'class=(["\'])(?:[^"\']*\s)?result(?:\s[^"\']*)?\1')
+# A genuine "nothing matched" page; not worth a browser render
+NO_RESULTS_MARKER = b'no results found'
+
+def browser_reason(response):
+    """Why a plain HTTP response needs a browser render, or None if it's usable"""
+    if response is None:
+        return 'request failed or blocked'
+    content = response.content or b''
+    if CARD_MARKER_RE.search(content):
+        return None
+    lowered = content.lower()
+    if any(marker in lowered for marker in BLOCK_MARKERS):
+        return 'bot check'
+    if NO_RESULTS_MARKER in lowered:
+        return None
+    return 'no listings'
+
+class HybridYellowPagesScraper(YellowPagesScraper):
+    """YellowPagesScraper that renders a page in a headless browser only when
+    plain HTTP gets blocked or comes back without listings.
+
+    Every page is first requested through ``make_request``. Only the
+    failures go to a BrowserPool, which is started on the first one, so a
+    run that is never blocked never launches Chrome.
+    """
+
+    def __init__(self, *args, browser_pool=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # A BrowserPool, or a callable returning a shared one
+        self._browser_pool = browser_pool
+        self._owns_browser_pool = browser_pool is None
+
+    @property
+    def browser_pool(self):
+        if self._browser_pool is None:
+            from core.browser_pool import BrowserPool
+            self._browser_pool = BrowserPool(rate_limiter=self.rate_limiter)
+        elif callable(self._browser_pool):
+            self._browser_pool = self._browser_pool()
+        return self._browser_pool
+
+    def _iter_responses(self, pages):
+        for page, response in super()._iter_responses(pages):
+            reason = browser_reason(response)
+            if reason and response is not None:
+                # Soft blocks count against the host's health like 429s do
+                self._record_empty(page, blocked=reason == 'bot check')
+            if reason:
+                response = self._render_page(page, reason) or response
+            yield page, response
+
+    def _render_page(self, page, reason):
+        search_url, params = self._page_request(page)
+        url = requests.Request('GET', search_url, params=params).prepare().url
+        logger.info(f"Page {page} of {self.search_term}: {reason}, rendering in browser")
+        response = self.browser_pool.fetch(url)
+        if response is None:
+            return None
+        self.page_stats['pages_browser'] += 1
+        if self.cache:
+            # Replace a cached bot check so the next run doesn't render again
+            response = self.cache.store(search_url, params, response.status_code, {},
+                                        response.content, response.encoding)
+        return response
+
+    def close(self):
+        if self._owns_browser_pool and self._browser_pool is not None:
+            self._browser_pool.close()
+            self._browser_pool = None
+        super().close()
+
+class SharedBrowserPool:
+    """Lazily started BrowserPool shared by every scraper in a process"""
+
+    def __init__(self, rate_limiter=None):
+        self.rate_limiter = rate_limiter
+        self.pool = None
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            if self.pool is None:
+                from core.browser_pool import BrowserPool
+                self.pool = BrowserPool(rate_limiter=self.rate_limiter)
+            return self.pool
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
@@ -0,0 +1,220 @@
+
+import logging
+import re
+
+from bs4 import BeautifulSoup
+from bs4.dammit import EncodingDetector
+from lxml import etree
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# "Showing 1-30 of 1,234" style result count
+RESULT_COUNT_RE = re.compile(r'(\d[\d,]*)\s*-\s*(\d[\d,]*)\s+of\s+(\d[\d,]*)')
+
+def page_count_from_pagination(count_text, has_next):
+    """Number of result pages given page 1's result count text and next link"""
+    match = RESULT_COUNT_RE.search(count_text or '')
+    if match:
+        first, last, total = (int(group.replace(',', '')) for group in match.groups())
+        if last >= first:
+            return -(-total // (last - first + 1))
+    if not has_next:
+        # No count, but no next link either: page 1 is the last page
+        return 1
+    return None
+
+class SoupPageParser:
+    """Reference parser: full BeautifulSoup tree plus one find() per field"""
+
+    name = 'bs4'
+
+    def parse_cards(self, content):
+        """Return the raw fields of every result card, or None if the page has no cards"""
+        soup = BeautifulSoup(content, 'lxml')
+        company_cards = soup.find_all('div', class_='result')  # UPDATE THIS SELECTOR
+
+        if not company_cards:
+            return None
+        return [self.parse_card(card) for card in company_cards]
+
+    def page_count(self, content):
+        """Total result pages as reported on page 1, or None if it doesn't say"""
+        soup = BeautifulSoup(content, 'lxml')
+        pagination = soup.find('div', class_='pagination')  # UPDATE THIS SELECTOR
+        if pagination is None:
+            return None
+        count_elem = pagination.find('span', class_='showing-count')
+        return page_count_from_pagination(
+            count_elem.text if count_elem else '',
+            has_next=pagination.find('a', class_='next') is not None,
+        )
+
+    def parse_card(self, card):
+        """Extract company information from a single result card"""
+        try:
+            # THESE SELECTORS ARE EXAMPLES - YOU MUST INSPECT THE WEBSITE AND UPDATE THEM
+            name_elem = card.find('h2', class_='company-name')
+            company_name = name_elem.text.strip() if name_elem else "N/A"
+
+            # Phone number
+            phone_elem = card.find('div', class_='phones')
+            phone = phone_elem.text.strip() if phone_elem else "N/A"
+
+            # Website
+            website_elem = card.find('a', class_='website-link')
+            website = website_elem['href'] if website_elem else "N/A"
+
+            # Address
+            address_elem = card.find('div', class_='address')
+            address = address_elem.text.strip() if address_elem else "N/A"
+
+            return {
+                'company_name': company_name,
+                'phone': phone,
+                'website': website,
+                'address': address,
+            }
+
+        except Exception as e:
+            logger.error(f"Error parsing company card: {e}")
+            return None
+
+class LxmlPageParser:
+    """Fast parser: lxml tree, precompiled card XPath, one walk per card.
+
+    Produces exactly what SoupPageParser does. Each field takes the first
+    descendant with the matching tag and class in document order, the same
+    thing ``card.find`` returns.
+    """
+
+    name = 'lxml'
+
+    CARD_XPATH = etree.XPath(
+        "//div[contains(concat(' ', normalize-space(@class), ' '), ' result ')]"
+    )
+    # (tag, class) -> output field
+    FIELD_SELECTORS = {
+        ('h2', 'company-name'): 'company_name',
+        ('div', 'phones'): 'phone',
+        ('a', 'website-link'): 'website',
+        ('div', 'address'): 'address',
+    }
+    FIELD_TAGS = frozenset(tag for tag, _ in FIELD_SELECTORS)
+    PAGINATION_XPATH = etree.XPath(
+        "//div[contains(concat(' ', normalize-space(@class), ' '), ' pagination ')]"
+    )
+    RESULT_COUNT_XPATH = etree.XPath(
+        "string(.//span[contains(concat(' ', normalize-space(@class), ' '), ' showing-count ')])",
+        smart_strings=False,
+    )
+    NEXT_LINK_XPATH = etree.XPath(
+        "boolean(.//a[contains(concat(' ', normalize-space(@class), ' '), ' next ')])"
+    )
+    TEXT_XPATH = etree.XPath('string()', smart_strings=False)
+    # BeautifulSoup keeps text inside these tags out of .text
+    HIDDEN_TEXT_TAGS = frozenset(('script', 'style', 'template', 'rt', 'rp'))
+    HAS_HIDDEN_TEXT = etree.XPath(
+        'boolean(' + '|'.join(f'.//{tag}' for tag in sorted(HIDDEN_TEXT_TAGS)) + ')'
+    )
+
+    def __init__(self):
+        self._html_parsers = {}
+
+    def _parse_document(self, content):
+        if isinstance(content, str):
+            return etree.fromstring(content, self._html_parser(None))
+        # Use the same encoding BeautifulSoup would pick for these bytes
+        detector = EncodingDetector(content, is_html=True)
+        for encoding in detector.encodings:
+            try:
+                parser = self._html_parser(encoding)
+            except LookupError:
+                continue
+            return etree.fromstring(detector.markup, parser)
+        return None
+
+    def _html_parser(self, encoding):
+        if encoding not in self._html_parsers:
+            self._html_parsers[encoding] = etree.HTMLParser(encoding=encoding)
+        return self._html_parsers[encoding]
+
+    def parse_cards(self, content):
+        """Return the raw fields of every result card, or None if the page has no cards"""
+        root = self._parse_document(content) if content else None
+        if root is None:
+            return None
+        company_cards = self.CARD_XPATH(root)
+        if not company_cards:
+            return None
+        return [self.parse_card(card) for card in company_cards]
+
+    def page_count(self, content):
+        """Total result pages as reported on page 1, or None if it doesn't say"""
+        root = self._parse_document(content) if content else None
+        if root is None:
+            return None
+        pagination = self.PAGINATION_XPATH(root)
+        if not pagination:
+            return None
+        return page_count_from_pagination(
+            self.RESULT_COUNT_XPATH(pagination[0]),
+            has_next=self.NEXT_LINK_XPATH(pagination[0]),
+        )
+
+    def parse_card(self, card):
+        found = {}
+        for elem in card.iterdescendants(*self.FIELD_TAGS):
+            classes = elem.get('class')
+            if not classes:
+                continue
+            for class_name in classes.split():
+                field = self.FIELD_SELECTORS.get((elem.tag, class_name))
+                if field and field not in found:
+                    found[field] = elem
+            if len(found) == len(self.FIELD_SELECTORS):
+                break
+
+        website_elem = found.get('website')
+        if website_elem is not None and website_elem.get('href') is None:
+            # Same failure as the soup path's website_elem['href']
+            logger.error("Error parsing company card: 'href'")
+            return None
+
+        return {
+            'company_name': self._text(found.get('company_name')),
+            'phone': self._text(found.get('phone')),
+            'website': website_elem.get('href') if website_elem is not None else "N/A",
+            'address': self._text(found.get('address')),
+        }
+
+    def _text(self, elem):
+        if elem is None:
+            return "N/A"
+        if not self.HAS_HIDDEN_TEXT(elem):
+            return self.TEXT_XPATH(elem).strip()
+        parts = []
+        self._collect_text(elem, parts)
+        return ''.join(parts).strip()
+
+    def _collect_text(self, elem, parts):
+        if elem.text and isinstance(elem.tag, str):
+            parts.append(elem.text)
+        for child in elem:
+            # Comments and hidden-text tags contribute only their tail
+            if isinstance(child.tag, str) and child.tag not in self.HIDDEN_TEXT_TAGS:
+                self._collect_text(child, parts)
+            if child.tail:
+                parts.append(child.tail)
+
+PARSERS = {
+    'bs4': SoupPageParser,
+    'lxml': LxmlPageParser,
+}
+
+def get_parser(backend=None):
+    backend = backend or settings.PARSER_BACKEND
+    if backend not in PARSERS:
+        raise ValueError(f"Unknown parser backend: {backend}")
+    return PARSERS[backend]()
@@ -1,88 +1,356 @@
 
-from bs4 import BeautifulSoup
+from collections import Counter, deque
+from concurrent.futures import Future
+from config import settings
 from core.base_scraper import BaseScraper
-from utils.data_cleaner import clean_company_data
+from core.dedup_index import dedup_keys
+from core.fingerprints import page_fingerprint
+from core.metrics import metrics
+from scrapers.parsers import get_parser
+from utils.data_cleaner import clean_lead
+from utils.lead import Lead
 import logging
 import re
+import time
 
 logger = logging.getLogger(__name__)
 
+def parse_result_page(parser, content, search_term):
+    """Parse and clean every card on a result page; None if the page has no cards"""
+    with metrics.stage('parse'):
+        company_cards = parser.parse_cards(content)
+    if company_cards is None:
+        return None
+        
+    page_leads = []
+    # One timestamp object shared by every card of the page
+    scraped_at = time.time()
+    with metrics.stage('clean'):
+        for card_fields in company_cards:
+            if card_fields:
+                lead = Lead(**card_fields, industry=search_term, source='Yellow Pages',
+                            date_scraped=scraped_at)
+                page_leads.append(clean_lead(lead))
+    metrics.inc('pages_parsed')
+    metrics.inc('cards_parsed', len(page_leads))
+    
+    # One line per page; per-company lines only at DEBUG, they cost real I/O at volume
+    logger.info(f"Scraped {len(page_leads)} companies for {search_term}")
+    if logger.isEnabledFor(logging.DEBUG):
+        for lead in page_leads:
+            logger.debug(f"Scraped: {lead['company_name']}")
+    return page_leads
+
+# Parsers built once per ParsePool worker process
+_worker_parsers = {}
+
+def parse_result_page_in_worker(content, search_term, parser_backend):
+    """ParsePool entry point: parse_result_page with a per-process parser"""
+    if parser_backend not in _worker_parsers:
+        _worker_parsers[parser_backend] = get_parser(parser_backend)
+    return parse_result_page(_worker_parsers[parser_backend], content, search_term)
+
 class YellowPagesScraper(BaseScraper):
-    def __init__(self, search_term, location="United States"):
-        super().__init__()
+    def __init__(self, search_term, location="United States", checkpoint=None, parser=None,
+                 parse_pool=None, dedup=None, fingerprints=None, **kwargs):
+        super().__init__(**kwargs)
         self.search_term = search_term
         self.location = location
-        self.base_url = "https://www.yellowpages.com"
+        self.base_url = settings.YELLOW_PAGES_BASE_URL
+        # Optional CheckpointStore; finished pages are replayed from it instead of refetched
+        self.checkpoint = checkpoint
+        # Page parser backend ('lxml' or 'bs4'), see scrapers/parsers.py
+        self.parser = parser or get_parser()
+        # Optional ParsePool; pages are then parsed in worker processes
+        # while this thread goes on fetching the next one
+        self.parse_pool = parse_pool
+        # Optional DedupIndex, used to stop once pages only repeat known leads
+        self.dedup = dedup
+        # Optional FingerprintStore; makes this a delta crawl that skips unchanged
+        # pages and yields only new, changed and vanished leads
+        self.fingerprints = fingerprints
+        self._page_prints = {}
+        self._present_ids = set()
+        # Page accounting for the run stats, see TermScheduler.page_stats
+        self.page_stats = Counter()
+        self._term_keys = set()
+        # Fresh pages in a row with only known leads; sizes the async fetch window
+        self._seen_streak = 0
         
-    def search_companies(self, pages_to_scrape=3):
+    def search_companies(self, pages_to_scrape=None):
         """Search for companies and scrape multiple pages"""
+        self.scraped_data.extend(self.iter_companies(pages_to_scrape))
+        return self.scraped_data
+    
+    def iter_companies(self, pages_to_scrape=None):
+        """Yield cleaned companies one at a time without keeping them in memory.
+        
+        ``pages_to_scrape`` is an upper bound; the pages actually fetched
+        follow the result count on page 1.
+        """
         logger.info(f"Starting search for: {self.search_term} in {self.location}")
+        max_pages = pages_to_scrape or settings.MAX_PAGES_PER_TERM
+        found = 0
+        self._seen_streak = 0
+        # Whether every result page was seen, so missing leads really vanished
+        self._complete = False
         
-        for page in range(1, pages_to_scrape + 1):
-            logger.info(f"Scraping page {page}")
-            
-            # Build search URL - THIS WILL NEED UPDATING BASED ON ACTUAL YELLOW PAGES URL STRUCTURE
-            params = {
-                'search_terms': self.search_term,
-                'geo_location_terms': self.location,
-                'page': page
-            }
+        for page, page_leads, last_page, replayed in self._iter_page_results(max_pages):
+            if last_page:
+                logger.warning(f"No companies found on page {page}")
+                self._complete = not self._failed_pages
+                break
+                
+            found += len(page_leads)
+            yield from page_leads
             
-            # This is a hypothetical URL - you need to find the actual search URL
-            search_url = f"{self.base_url}/search"
-            response = self.make_request(search_url, params=params)
+            # Replayed and unchanged pages were indexed by the run that parsed
+            # them, so they always look seen; only fresh pages move the streak
+            only_seen = self._only_seen_leads(page_leads)
+            if not replayed:
+                self._seen_streak = self._seen_streak + 1 if only_seen else 0
+            if settings.SEEN_PAGES_CUTOFF and self._seen_streak >= settings.SEEN_PAGES_CUTOFF:
+                skipped = self._last_planned_page - self._highest_page
+                # Pages of the last async window past this one were fetched for nothing
+                discarded = sum(1 for fetched in self._fetched_pages if fetched > page)
+                self.page_stats['pages_seen_cutoff'] += skipped
+                self.page_stats['pages_discarded'] += discarded
+                logger.info(f"Pages up to {page} only had known leads, skipping {skipped} more"
+                            + (f", dropping {discarded} already fetched" if discarded else ""))
+                self._complete = False
+                break
+        
+        if self.checkpoint and not self._failed_pages:
+            # Lets a resumed run skip this search without opening it
+            self.checkpoint.mark_term_done(self.search_term, self.location)
+        
+        if self.fingerprints is not None and self._complete:
+            vanished = self.fingerprints.pop_vanished(self.search_term, self.location, self._present_ids)
+            self.fingerprints.forget_pages_after(self.search_term, self.location, self._highest_page)
+            self.page_stats['leads_vanished'] += len(vanished)
+            found += len(vanished)
+            yield from vanished
             
+        logger.info(f"Completed search. Found {found} companies.")
+    
+    def _only_seen_leads(self, page_leads):
+        """True if every lead on the page was found before, in this term or an earlier one"""
+        lead_keys = [dedup_keys(lead) for lead in page_leads]
+        seen = self._term_keys
+        if self.dedup is not None:
+            seen = seen | self.dedup.known_keys(
+                {key for keys in lead_keys for key in keys} - seen
+            )
+        only_seen = bool(lead_keys) and all(keys and not seen.isdisjoint(keys) for keys in lead_keys)
+        self._term_keys.update(key for keys in lead_keys for key in keys)
+        return only_seen
+    
+    def _iter_page_results(self, max_pages):
+        """Yield (page, leads, last_page, replayed) in page order.
+        
+        Page 1 comes first and says how many pages there are, so only those
+        are requested. Finished pages come from the checkpoint. The rest are
+        fetched and parsed, on the parse pool if there is one. Pages queue up
+        in order and are handed back as soon as the oldest is parsed.
+        """
+        completed = {}
+        total_pages = None
+        if self.checkpoint:
+            completed = self.checkpoint.completed_pages(self.search_term, self.location)
+            total_pages = self.checkpoint.get_total_pages(self.search_term, self.location)
+        in_flight = deque()
+        self._highest_page = 0
+        self._fetched_pages = set()
+        self._unchanged_pages = set()
+        self._failed_pages = False
+        # Last page the result count promised listings up to (0 while unknown),
+        # and the pages already counted against the host as empty
+        self._listed_pages = 0
+        self._empty_pages = set()
+        # Fetched responses not yet handed back; only the async backend fetches ahead
+        self._window_left = None
+        
+        if completed and self.checkpoint.term_done(self.search_term, self.location):
+            # Finished by an earlier run, possibly at the cutoff: nothing left to fetch
+            for page in sorted(completed):
+                yield self._finish_page(*self._replay_page(page, completed[page]))
+            return
+        
+        if 1 in completed:
+            in_flight.append(self._replay_page(1, completed[1]))
+        else:
+            _, response = next(self._iter_responses([1]))
             if not response:
-                continue
+                # Without page 1 there is nothing to plan from
+                logger.warning(f"Page 1 failed, skipping {self.search_term}")
+                self._failed_pages = True
+                return
+            total_pages = self._read_page_count(response)
+            in_flight.append(self._queue_page(1, response))
+        
+        if total_pages is None:
+            # Unknown size: walk up to the cap and stop at the first empty page
+            last_planned = max_pages
+        else:
+            last_planned = min(total_pages, max_pages)
+            self.page_stats['pages_planned'] += max(last_planned, 1)
+            if total_pages < max_pages:
+                # The plan saves the request that would find the empty page
+                self.page_stats['empty_probes_avoided'] += 1
+            logger.info(f"{self.search_term}: {total_pages} result pages, fetching {last_planned}")
+        self._last_planned_page = last_planned
+        self._listed_pages = last_planned if total_pages is not None else 0
+        # A plan that covers the whole result count sees every listing
+        self._complete = total_pages is not None and total_pages <= max_pages
+        
+        pages = range(2, last_planned + 1)
+        responses = self._iter_responses([page for page in pages if page not in completed])
+        for page in pages:
+            if page in completed:
+                in_flight.append(self._replay_page(page, completed[page]))
+            else:
+                if self._window_left == 0 and settings.SEEN_PAGES_CUTOFF:
+                    # The next window is sized from the seen-page streak, so
+                    # every page before it has to be counted first
+                    while in_flight:
+                        yield self._finish_page(*in_flight.popleft())
+                _, response = next(responses)
+                if not response:
+                    self._failed_pages = True
+                    self._complete = False
+                    continue
+                in_flight.append(self._queue_page(page, response))
                 
-            soup = BeautifulSoup(response.content, 'lxml')
-            company_cards = soup.find_all('div', class_='result')  # UPDATE THIS SELECTOR
-            
-            if not company_cards:
-                logger.warning(f"No companies found on page {page}")
-                break
+            while in_flight and not self._is_pending(in_flight[0][1]):
+                yield self._finish_page(*in_flight.popleft())
                 
-            for card in company_cards:
-                company_data = self._parse_company_card(card)
-                if company_data:
-                    cleaned_data = clean_company_data(company_data)
-                    self.scraped_data.append(cleaned_data)
-                    logger.info(f"Scraped: {cleaned_data['company_name']}")
-            
-        logger.info(f"Completed search. Found {len(self.scraped_data)} companies.")
-        return self.scraped_data
+        while in_flight:
+            yield self._finish_page(*in_flight.popleft())
     
-    def _parse_company_card(self, card):
-        """Extract company information from a single result card"""
-        try:
-            # THESE SELECTORS ARE EXAMPLES - YOU MUST INSPECT THE WEBSITE AND UPDATE THEM
-            company_name = card.find('h2', class_='company-name').text.strip() if card.find('h2', class_='company-name') else "N/A"
-            
-            # Phone number
-            phone_elem = card.find('div', class_='phones')
-            phone = phone_elem.text.strip() if phone_elem else "N/A"
-            
-            # Website
-            website_elem = card.find('a', class_='website-link')
-            website = website_elem['href'] if website_elem else "N/A"
-            
-            # Address
-            address_elem = card.find('div', class_='address')
-            address = address_elem.text.strip() if address_elem else "N/A"
-            
-            return {
-                'company_name': company_name,
-                'phone': phone,
-                'website': website,
-                'address': address,
-                'industry': self.search_term,
-                'source': 'Yellow Pages',
-                'date_scraped': str(self.get_current_timestamp())
-            }
+    def _replay_page(self, page, last_page):
+        page_leads = self.checkpoint.get_leads(self.search_term, self.location, page)
+        logger.info(f"Page {page} already done, replaying {len(page_leads)} leads from checkpoint")
+        self.page_stats['pages_replayed'] += 1
+        self._highest_page = max(self._highest_page, page)
+        if self.fingerprints is not None:
+            # The checkpoint only holds the page's delta; the store knows all its leads
+            self._present_ids.update(self.fingerprints.page_lead_ids(self.search_term, self.location, page))
+        return page, page_leads, last_page
+    
+    def _queue_page(self, page, response):
+        """Start parsing a fetched page, unless the delta crawl has it unchanged"""
+        if self.fingerprints is not None:
+            fingerprint = page_fingerprint(response.content)
+            lead_ids = self.fingerprints.unchanged_page(self.search_term, self.location, page, fingerprint)
+            if lead_ids is not None:
+                # Same listings as last crawl: nothing to parse or emit
+                self._present_ids.update(lead_ids)
+                self.page_stats['pages_unchanged'] += 1
+                self._unchanged_pages.add(page)
+                return page, [], None
+            self._page_prints[page] = fingerprint
+        return page, self._parse_page(response), None
+    
+    def _read_page_count(self, response):
+        """Page count from page 1, remembered in the checkpoint for resumed runs"""
+        total_pages = self.parser.page_count(response.content)
+        if total_pages is not None and self.checkpoint:
+            self.checkpoint.set_total_pages(self.search_term, self.location, total_pages)
+        return total_pages
+    
+    @staticmethod
+    def _is_pending(outcome):
+        return isinstance(outcome, Future) and not outcome.done()
+    
+    def _finish_page(self, page, outcome, replayed_last_page):
+        """Resolve a queued page, recording freshly parsed ones in the checkpoint"""
+        if replayed_last_page is not None:
+            return page, outcome, replayed_last_page, True
             
-        except Exception as e:
-            logger.error(f"Error parsing company card: {e}")
-            return None
+        page_leads = outcome.result() if isinstance(outcome, Future) else outcome
+        last_page = page_leads is None
+        if last_page:
+            self._record_empty(page)
+        page_leads = page_leads or []
+        if self.fingerprints is not None and page_leads:
+            page_leads, lead_ids = self.fingerprints.record_page(
+                self.search_term, self.location, page, self._page_prints.pop(page), page_leads
+            )
+            self._present_ids.update(lead_ids)
+        if self.checkpoint:
+            # Unchanged pages too, with no leads: a replay takes their ids from the fingerprints
+            self.checkpoint.mark_done(
+                self.search_term, self.location, page, page_leads, last_page
+            )
+        return page, page_leads, last_page, page in self._unchanged_pages
+    
+    def _record_empty(self, page, blocked=False):
+        """Count a page that came back without listings against the host, once.
+        
+        Only a bot check, or an empty page before the last one the result
+        count planned, means trouble; the empty page ending the results doesn't.
+        """
+        if page in self._empty_pages or not (blocked or page < self._listed_pages):
+            return
+        self._empty_pages.add(page)
+        self.rate_limiter.record_empty(self.base_url)
+    
+    def _iter_responses(self, pages):
+        """Yield (page, response) pairs in page order"""
+        if self.backend == 'async':
+            # Fan out a window of pages at once, then hand them back in order
+            # so the "stop at the first empty page" rule still applies. The
+            # next window is only requested once the consumer gets there.
+            start = 0
+            while start < len(pages):
+                batch = pages[start:start + self._window_size()]
+                start += len(batch)
+                logger.info(f"Fetching {len(batch)} pages concurrently")
+                self._count_fetched(batch)
+                responses = self.make_requests([self._page_request(page) for page in batch])
+                for i, item in enumerate(zip(batch, responses)):
+                    self._window_left = len(batch) - i - 1
+                    yield item
+        else:
+            # Pages are only requested when the consumer asks for them
+            for page in pages:
+                logger.info(f"Scraping page {page}")
+                self._count_fetched([page])
+                search_url, params = self._page_request(page)
+                yield page, self.make_request(search_url, params=params)
+    
+    def _window_size(self):
+        """Pages to request at once; no more than the seen-page cutoff could still need"""
+        window = settings.PAGE_FETCH_WINDOW
+        if settings.SEEN_PAGES_CUTOFF and self._seen_streak:
+            window = min(window, settings.SEEN_PAGES_CUTOFF - self._seen_streak)
+        return max(window, 1)
+    
+    def _count_fetched(self, pages):
+        self.page_stats['pages_fetched'] += len(pages)
+        self._highest_page = max(self._highest_page, *pages)
+        self._fetched_pages.update(pages)
+    
+    def _page_request(self, page):
+        """Build the (url, params) pair for one page of search results"""
+        # Build search URL - THIS WILL NEED UPDATING BASED ON ACTUAL YELLOW PAGES URL STRUCTURE
+        params = {
+            'search_terms': self.search_term,
+            'geo_location_terms': self.location,
+            'page': page
+        }
+        
+        # This is a hypothetical URL - you need to find the actual search URL
+        search_url = f"{self.base_url}/search"
+        return search_url, params
+    
+    def _parse_page(self, response):
+        """Parse a result page now, or return a Future when a parse pool is set"""
+        if self.parse_pool:
+            return self.parse_pool.submit(
+                parse_result_page_in_worker, response.content, self.search_term, self.parser.name
+            )
+        return parse_result_page(self.parser, response.content, self.search_term)
     
     def get_current_timestamp(self):
         from datetime import datetime
@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from benchmarks.stand_in_server import StandInHandler, StandInServer
+from config import settings
+from core.async_fetcher import AsyncFetcher
+from core.http_cache import ResponseCache
+from core.metrics import metrics
+from core.rate_controller import RETRY_STATUSES, AdaptiveRateController
+from core.rate_limiter import HostRateLimiter
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(settings, 'RETRY_BACKOFF_BASE', 0.01)
+    monkeypatch.setattr(settings, 'RETRY_BACKOFF_MAX', 0.05)
+
+def make_fetcher(**kwargs):
+    kwargs.setdefault('rate_limiter', HostRateLimiter(1000, capacity=1000))
+    return AsyncFetcher(**kwargs)
+
+def page_requests(server, pages):
+    return [(f"{server.url}/search", {'search_terms': 'plumber', 'page': page}) for page in pages]
+
+@pytest.mark.parametrize('status', sorted(RETRY_STATUSES))
+def test_retry_statuses_are_retried(status):
+    with StandInServer(latency=0, error_status=status, fail_first=2) as server:
+        fetcher = make_fetcher()
+        [result] = fetcher.fetch_many(page_requests(server, [1]))
+        fetcher.close()
+    assert result.status_code == 200
+    assert server.httpd.request_count == 3
+
+def test_client_errors_are_not_retried():
+    with StandInServer(latency=0, error_status=404, fail_first=1) as server:
+        fetcher = make_fetcher()
+        assert fetcher.fetch_many(page_requests(server, [1])) == [None]
+        fetcher.close()
+    assert server.httpd.request_count == 1
+
+def test_stale_cache_entry_is_revalidated_with_a_304(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=0, offline=False)
+    with StandInServer(latency=0) as server:
+        fetcher = make_fetcher(cache=cache)
+        [first] = fetcher.fetch_many(page_requests(server, [1]))
+        revalidated = metrics.counters.get('cache_revalidated', 0)
+        [second] = fetcher.fetch_many(page_requests(server, [1]))
+        fetcher.close()
+    assert server.httpd.request_count == 2
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert metrics.counters['cache_revalidated'] == revalidated + 1
+
+@pytest.fixture
+def peak_requests(monkeypatch):
+    """Most search requests the stand-in server was handling at once"""
+    lock = threading.Lock()
+    counts = {'now': 0, 'peak': 0}
+    do_get = StandInHandler.do_GET
+
+    def counting_get(handler):
+        with lock:
+            counts['now'] += 1
+            counts['peak'] = max(counts['peak'], counts['now'])
+        try:
+            do_get(handler)
+        finally:
+            with lock:
+                counts['now'] -= 1
+
+    monkeypatch.setattr(StandInHandler, 'do_GET', counting_get)
+    return counts
+
+def test_connections_per_host_are_capped(peak_requests):
+    with StandInServer(latency=0.05) as server:
+        fetcher = make_fetcher(per_host_limit=2, max_concurrency=10)
+        results = fetcher.fetch_many(page_requests(server, range(1, 9)))
+        fetcher.close()
+    assert all(result.status_code == 200 for result in results)
+    assert peak_requests['peak'] == 2
+
+def test_adaptive_controller_caps_requests_in_flight(peak_requests):
+    controller = AdaptiveRateController(1000, capacity=1000, max_concurrency=1)
+    with StandInServer(latency=0.05) as server:
+        fetcher = make_fetcher(per_host_limit=10, rate_limiter=controller)
+        results = fetcher.fetch_many(page_requests(server, range(1, 7)))
+        fetcher.close()
+    assert all(result.status_code == 200 for result in results)
+    assert peak_requests['peak'] == 1
+    assert controller._state(server.url).in_flight == 0
@@ -0,0 +1,112 @@
+import importlib.util
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+from benchmarks.stand_in_server import StandInServer
+
+HAS_SELENIUM = all(importlib.util.find_spec(name) for name in ('selenium', 'selenium_stealth'))
+requires_selenium = pytest.mark.skipif(not HAS_SELENIUM, reason="selenium not installed")
+
+class StubWebDriverException(Exception):
+    def __init__(self, msg=None):
+        super().__init__(msg)
+        self.msg = msg
+
+@pytest.fixture
+def stub_browser_pool(monkeypatch):
+    """core.browser_pool loaded against stand-in selenium modules, with no Chrome"""
+    names = ['selenium', 'selenium.webdriver', 'selenium.webdriver.chrome',
+             'selenium.webdriver.chrome.options', 'selenium.webdriver.chrome.service',
+             'selenium.common', 'selenium.common.exceptions', 'selenium_stealth']
+    modules = {name: types.ModuleType(name) for name in names}
+    modules['selenium.common.exceptions'].WebDriverException = StubWebDriverException
+    modules['selenium.webdriver.chrome.options'].Options = object
+    modules['selenium.webdriver.chrome.service'].Service = object
+    modules['selenium_stealth'].stealth = lambda driver, **kwargs: None
+    modules['selenium'].webdriver = modules['selenium.webdriver']
+    for name, module in modules.items():
+        monkeypatch.setitem(sys.modules, name, module)
+    path = Path(__file__).parent.parent / 'core' / 'browser_pool.py'
+    spec = importlib.util.spec_from_file_location('stub_browser_pool', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    monkeypatch.setattr(module.BrowserWorker, 'start', lambda worker: setattr(worker, 'driver', StubDriver()))
+    return module
+
+class StubDriver:
+    def __init__(self):
+        self.page_source = None
+
+    def get(self, url):
+        if 'crash' in url:
+            raise StubWebDriverException('tab crashed')
+        self.page_source = f"<html>{url}</html>"
+
+    def quit(self):
+        pass
+
+class RecordingLimiter:
+    def __init__(self, fail_acquire=False):
+        self.fail_acquire = fail_acquire
+        self.released = []
+
+    def acquire(self, url):
+        if self.fail_acquire:
+            raise RuntimeError("limiter closed")
+
+    def release(self, url, latency=None, status=None):
+        self.released.append((url, status))
+
+def test_fetch_releases_only_slots_it_acquired(stub_browser_pool):
+    limiter = RecordingLimiter()
+    with stub_browser_pool.BrowserPool(workers=1, rate_limiter=limiter) as pool:
+        assert pool.fetch('http://site.test/a').content == b"<html>http://site.test/a</html>"
+        assert pool.fetch('http://site.test/crash') is None
+        assert limiter.released == [('http://site.test/a', 200), ('http://site.test/crash', None)]
+
+        limiter.fail_acquire = True
+        with pytest.raises(RuntimeError):
+            pool.fetch('http://site.test/b')
+        assert len(limiter.released) == 2
+        # The worker went back to the pool either way
+        limiter.fail_acquire = False
+        assert pool.fetch('http://site.test/c') is not None
+        assert pool.pages_loaded == 2
+
+def start_pool(**kwargs):
+    from selenium.common.exceptions import WebDriverException
+    from core.browser_pool import BrowserPool
+    try:
+        return BrowserPool(delay_range=(0, 0), **kwargs)
+    except WebDriverException as e:
+        pytest.skip(f"Chrome not available: {e.msg}")
+
+@requires_selenium
+def test_pool_renders_pages_across_warm_recycled_browsers(monkeypatch):
+    from core.browser_pool import BrowserWorker
+    from scrapers.parsers import get_parser
+    starts = []
+    start = BrowserWorker.start
+    monkeypatch.setattr(BrowserWorker, 'start', lambda worker: starts.append(worker) or start(worker))
+    parser = get_parser()
+    with StandInServer(latency=0, cards_per_page=5, total_pages=6) as server:
+        urls = [f"{server.url}/search?search_terms=plumber&page={page}" for page in range(1, 7)]
+        with start_pool(workers=2, max_pages_per_driver=2) as pool:
+            assert len(starts) == 2
+            responses = pool.fetch_many(urls)
+        assert pool.pages_loaded == 6
+        assert [len(parser.parse_cards(response.content)) for response in responses] == [5] * 6
+        # Two pages per driver: six pages need at least a third Chrome
+        assert len(starts) >= 3
+        # Images, stylesheets and fonts were never downloaded
+        assert server.httpd.asset_requests == 0
+
+@requires_selenium
+def test_unblocked_browser_downloads_page_assets():
+    with StandInServer(latency=0, cards_per_page=5, total_pages=1) as server:
+        with start_pool(workers=1, block_resources=False) as pool:
+            assert pool.fetch(f"{server.url}/search?search_terms=plumber&page=1") is not None
+        assert server.httpd.asset_requests > 0
@@ -0,0 +1,41 @@
+import run
+from benchmarks.stand_in_server import StandInServer
+from config import settings
+from core.checkpoint import CheckpointStore
+from core.rate_limiter import HostRateLimiter
+from scrapers.yellow_pages_scraper import YellowPagesScraper
+
+def scrape(server, checkpoint, pages):
+    scraper = YellowPagesScraper('plumber', location='Springfield, IL', checkpoint=checkpoint,
+                                 backend='sync', cache=False, rate_limiter=HostRateLimiter(1000, capacity=1000))
+    scraper.base_url = server.url
+    try:
+        return scraper.search_companies(pages_to_scrape=pages)
+    finally:
+        scraper.close()
+
+def test_planned_crawl_is_finished_and_not_refetched(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'CHECKPOINT_DB', tmp_path / 'checkpoints.db')
+    monkeypatch.setattr(settings, 'SEEN_PAGES_CUTOFF', 0)
+    job = ('plumber', 'Springfield, IL')
+    checkpoint = CheckpointStore()
+    with StandInServer(latency=0, cards_per_page=5, total_pages=3) as server:
+        # The page count plans exactly three pages, so no page is ever the empty last one
+        leads = scrape(server, checkpoint, pages=3)
+        assert server.httpd.request_count == 3
+        assert not any(checkpoint.completed_pages(*job).values())
+        assert checkpoint.term_done(*job)
+        assert run.unfinished_jobs([job, ('roofer', 'Springfield, IL')]) == [('roofer', 'Springfield, IL')]
+
+        replayed = scrape(server, checkpoint, pages=3)
+        assert server.httpd.request_count == 3
+        assert len(replayed) == len(leads) == 15
+    checkpoint.close()
+
+def test_failed_page_leaves_term_unfinished(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'MAX_RETRIES', 0)
+    checkpoint = CheckpointStore(tmp_path / 'checkpoints.db')
+    with StandInServer(latency=0, cards_per_page=5, total_pages=3, error_rate=1.0) as server:
+        assert scrape(server, checkpoint, pages=3) == []
+    assert not checkpoint.term_done('plumber', 'Springfield, IL')
+    checkpoint.close()
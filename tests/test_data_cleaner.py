@@ -0,0 +1,62 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from utils.data_cleaner import (clean_address_text, clean_dataframe, clean_phone_number,
+                                clean_website_url)
+
+RULES = {
+    'phone': clean_phone_number,
+    'website': clean_website_url,
+    'company_name': str.strip,
+    'industry': lambda value: value.strip().title(),
+    'address': clean_address_text,
+}
+
+def as_text(value):
+    """What clean_dataframe documents for odd values: missing is '', numbers are their text"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def per_row(df):
+    return pd.DataFrame({column: [rule(as_text(value)) for value in df[column]]
+                         for column, rule in RULES.items()})
+
+def test_vectorized_cleaning_matches_per_row_rules_on_mixed_input():
+    df = pd.DataFrame({
+        'company_name': ['  Acme Plumbing ', None, 'Caf\xe9 Roma　', 42, '\tApex\x1f'],
+        'phone': ['(212) 555-0100', 12125550101, np.nan, '+44 20 7946 0000', 2125550102.0],
+        'website': [' WWW.Acme.com ', np.nan, 'https://Cafe.IT', '', 'shop.example.com\x0b'],
+        'address': ['100 Main St,\n   Springfield', '\xa0Rue de l’\xc9glise,\xa0Montr\xe9al ', None,
+                    'a\x1cb\x0bc', 7],
+        'industry': [' plumbing supplies ', "o'neil electrical", None, '\xe9lectriciens', 'roofers'],
+    }, dtype=object)
+    cleaned = clean_dataframe(df)
+    expected = per_row(df)
+    for column in RULES:
+        assert cleaned[column].astype(object).tolist() == expected[column].tolist(), column
+    assert cleaned['phone'].tolist()[:2] == ['+12125550100', '+12125550101']
+
+def test_reread_export_is_cleaned(tmp_path):
+    path = tmp_path / 'leads.csv'
+    pd.DataFrame({
+        'company_name': ['Acme Plumbing', 'Apex Roofing', 'Blue Star'],
+        'phone': ['+12125550100', '+12125550101', ''],
+        'website': ['https://acme.com', '', 'https://bluestar.com'],
+        'address': ['100 Main St', '', '5 Elm St'],
+        'industry': ['Plumbers', 'Roofers', 'Plumbers'],
+    }).to_csv(path, index=False)
+    df = pd.read_csv(path)
+    assert df['phone'].dtype.kind == 'f'  # read back as numbers, with a NaN
+    cleaned = clean_dataframe(df)
+    assert cleaned['phone'].tolist() == ['+12125550100', '+12125550101', '']
+    assert cleaned['address'].tolist() == ['100 Main St', '', '5 Elm St']
+    assert cleaned.equals(clean_dataframe(cleaned))
+
+    df = pd.read_csv(path, nrows=2)
+    assert df['phone'].dtype.kind == 'i'
+    assert clean_dataframe(df)['phone'].tolist() == ['+12125550100', '+12125550101']
@@ -0,0 +1,51 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from core.dedup_index import DedupIndex, _key_hash, dedup_keys
+
+ROOT = Path(__file__).parent.parent
+
+def lead(name, phone='', website='', address=''):
+    return {'company_name': name, 'phone': phone, 'website': website, 'address': address}
+
+ACME = lead('Acme Plumbing', '(212) 555-0100', 'https://www.acmeplumbing.com/contact')
+
+def test_keys_ignore_formatting_and_shared_hosts():
+    assert dedup_keys(ACME) == dedup_keys(lead('ACME PLUMBING INC', '212.555.0100', 'acmeplumbing.com'))
+    branch = lead('Bob Electric', website='https://facebook.com/bobelectric', address='1 Main St')
+    other = dict(branch, address='9 Oak Ave')
+    assert all(key.startswith('name:') for key in dedup_keys(branch))
+    assert dedup_keys(branch) != dedup_keys(other)
+
+def test_duplicates_in_one_batch_are_dropped(tmp_path):
+    index = DedupIndex(tmp_path / 'dedup.db')
+    moved = lead('Acme Plumbing', '(212) 555-0199', 'acmeplumbing.com')
+    batch = [ACME, lead('Zed Roofing', '646-555-0142'), dict(ACME), moved, lead('', '')]
+    assert index.filter_new(batch) == [batch[0], batch[1], batch[4]]
+    assert index.duplicates == 2
+    index.close()
+
+def test_index_survives_reopening(tmp_path):
+    path = tmp_path / 'dedup.db'
+    index = DedupIndex(path, flush_every=1000)
+    index.filter_new([ACME, lead('Zed Roofing', '646-555-0142')])
+    index.close()
+
+    index = DedupIndex(path)
+    assert index.is_duplicate(lead('Acme Plumbing Co', '212-555-0100'))
+    assert index.known_keys(['phone:+16465550142', 'phone:+10000000000']) == {'phone:+16465550142'}
+    assert not index.is_duplicate(lead('New Co', '718-555-0123'))
+    index.close()
+
+def test_keys_hash_the_same_in_every_process():
+    script = ("import json; from core.dedup_index import _key_hash, dedup_keys; "
+              f"keys = dedup_keys({ACME!r}); print(json.dumps([keys, [_key_hash(k) for k in keys]]))")
+    for seed in ('1', '2'):
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        output = subprocess.run([sys.executable, '-c', script], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        keys = dedup_keys(ACME)
+        assert json.loads(output) == [keys, [_key_hash(key) for key in keys]]
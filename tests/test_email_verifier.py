@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+from benchmarks.stand_in_server import StandInServer
+from config import settings
+from core.email_verifier import EmailVerifier
+
+@pytest.fixture
+def hunter_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'HUNTER_CACHE_DB', tmp_path / 'hunter_cache.db')
+
+def make_verifier(server, **kwargs):
+    return EmailVerifier(api_key='test', api_base=f"{server.url}/v2", **kwargs)
+
+def test_batches_dedupe_and_repeat_lookups_are_cached(hunter_cache):
+    with StandInServer(latency=0) as server:
+        verifier = make_verifier(server)
+        results = verifier.verify_many(['info@acme.com', ' INFO@acme.com', 'bounce@acme.com', 'not-an-email'])
+        assert results['info@acme.com']['result'] == 'deliverable'
+        assert results['bounce@acme.com']['result'] == 'undeliverable'
+        assert results['not-an-email']['result'] == 'invalid'
+        domains = verifier.search_domains(['acme.com', 'ACME.com'])
+        assert [email['value'] for email in domains['acme.com']] == ['info@acme.com', 'sales@acme.com']
+        assert server.httpd.hunter_calls == 3
+        verifier.close()
+
+        # A later run answers the same lookups from the cache
+        verifier = make_verifier(server)
+        assert verifier.verify_email('info@acme.com')['result'] == 'deliverable'
+        assert verifier.extract_domain_emails('acme.com')
+        assert verifier.api_calls == 0
+        verifier.close()
+    assert server.httpd.hunter_calls == 3
+
+def test_rate_limited_call_waits_for_retry_after():
+    with StandInServer(latency=0, error_status=429, fail_first=1, retry_after=1) as server:
+        # The rejected first try doesn't use up the one-call budget
+        verifier = make_verifier(server, use_cache=False, max_calls=1)
+        start = time.perf_counter()
+        assert verifier.verify_email('info@acme.com')['result'] == 'deliverable'
+        assert time.perf_counter() - start >= 1
+        verifier.close()
+    assert server.httpd.errors_injected == 1
+    assert server.httpd.hunter_calls == 1
+    assert (verifier.api_calls, verifier.calls_left) == (1, 0)
+    assert not verifier.quota_exhausted
+
+def test_call_budget_stops_lookups():
+    with StandInServer(latency=0) as server:
+        verifier = make_verifier(server, use_cache=False, max_calls=2, max_workers=1)
+        results = verifier.verify_many([f"user{i}@acme.com" for i in range(5)])
+        verifier.close()
+    assert server.httpd.hunter_calls == 2
+    assert verifier.quota_exhausted
+    assert sorted(result['result'] for result in results.values()) == ['deliverable'] * 2 + ['unknown'] * 3
@@ -0,0 +1,60 @@
+import time
+
+from benchmarks.bench_enrich import LoopbackResolver
+from benchmarks.stand_in_server import StandInServer, site_kind
+from core.enrichment import WebsiteEnricher
+
+def one_host_per_kind():
+    hosts = {}
+    for i in range(100):
+        hosts.setdefault(site_kind(f"www.company-{i}.example.com"), f"www.company-{i}.example.com")
+    return hosts
+
+def test_site_crawls_stay_within_their_budgets():
+    hosts = one_host_per_kind()
+    with StandInServer(slow_site_delay=0.4) as server:
+        port = server.httpd.server_address[1]
+        homepages = {host[4:]: f"http://{host}:{port}/" for host in hosts.values()}
+        with WebsiteEnricher(max_pages=3, max_bytes=64 * 1024, timeout=0.6,
+                             resolver=LoopbackResolver()) as enricher:
+            start = time.perf_counter()
+            reports = enricher.crawl(homepages)
+            elapsed = time.perf_counter() - start
+    reports = {kind: reports[host[4:]] for kind, host in hosts.items()}
+
+    normal = reports['normal']
+    assert normal.pages == 3
+    assert normal.email.startswith(('info@', 'contact@', 'hello@', 'sales@'))
+    assert normal.email.endswith(hosts['normal'][4:])
+    assert set(normal.social) == {'facebook', 'linkedin', 'twitter'}
+    assert reports['no_email'].email is None
+
+    # The megabyte homepage is cut off at the byte budget and nothing more is fetched
+    huge = reports['huge']
+    assert huge.bytes == 64 * 1024
+    assert huge.pages == 1
+
+    # The slow site's second page doesn't fit the time budget; its homepage still counts
+    slow = reports['slow']
+    assert slow.timed_out
+    assert slow.pages == 1
+    assert elapsed < 1.5
+
+    assert server.httpd.site_requests <= 3 * len(hosts)
+
+def test_enrich_fills_columns_and_crawls_each_domain_once():
+    hosts = one_host_per_kind()
+    with StandInServer() as server:
+        port = server.httpd.server_address[1]
+        website = f"http://{hosts['normal']}:{port}/"
+        leads = [{'company_name': 'Branch 1', 'website': website},
+                 {'company_name': 'Branch 2', 'website': website},
+                 {'company_name': 'Known', 'website': f"http://{hosts['no_email']}:{port}/",
+                  'email': 'owner@known.com'},
+                 {'company_name': 'No website', 'website': ''}]
+        with WebsiteEnricher(resolver=LoopbackResolver()) as enricher:
+            enricher.enrich(leads)
+        assert server.httpd.site_requests == 3
+    assert leads[0]['email'] and leads[0]['email'] == leads[1]['email']
+    assert leads[2]['email'] == 'owner@known.com'
+    assert leads[3]['email'] == leads[3]['facebook'] == ''
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from core.entity_resolution import prepare, resolve_entities
+
+def test_records_of_one_company_merge():
+    df = pd.DataFrame([
+        {'company_name': 'Acme Plumbing Corp.', 'phone': '(212) 555-0100', 'website': '',
+         'address': '100 Main Street, Springfield, NY 10001', 'industry': 'plumbers'},
+        {'company_name': 'Acme Plumbing Corporation', 'phone': '', 'website': 'www.acmeplumbing.com',
+         'address': '100 Main St, Springfield, NY 10001', 'industry': 'plumbers'},
+    ])
+    merged = resolve_entities(df)
+    assert len(merged) == 1
+    assert merged.loc[0, 'records'] == 2
+    assert merged.loc[0, 'website'] and merged.loc[0, 'phone']
+
+def test_placeholder_addresses_are_no_evidence():
+    df = pd.DataFrame([
+        {'company_name': 'Acme Plumbing', 'phone': 'N/A', 'website': 'N/A', 'address': 'N/A', 'industry': 'plumbers'},
+        {'company_name': 'Acme Plumbing', 'phone': '', 'website': '', 'address': 'n/a', 'industry': 'plumbers'},
+        {'company_name': 'Acme Plumbing', 'phone': '', 'website': '', 'address': ' None ', 'industry': 'plumbers'},
+    ])
+    _, keys = prepare(df)
+    assert (keys[['phone', 'domain', 'street', 'zip']] == '').all().all()
+    # A shared name alone doesn't merge branches of a chain
+    assert len(resolve_entities(df)) == 3
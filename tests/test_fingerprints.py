@@ -0,0 +1,59 @@
+from benchmarks.stand_in_server import StandInServer, render_results_page
+from core.checkpoint import CheckpointStore
+from core.fingerprints import FingerprintStore, lead_fingerprint, lead_identity, page_fingerprint
+from core.rate_limiter import HostRateLimiter
+from scrapers.yellow_pages_scraper import YellowPagesScraper
+
+def results_page(cards, phone_edit=None):
+    html = render_results_page('plumber', 1, cards_per_page=cards, total_pages=1)
+    if phone_edit:
+        html = html.replace(*phone_edit)
+    return html.encode('utf-8')
+
+def crawl(server, fingerprints, checkpoint=None):
+    scraper = YellowPagesScraper('plumber', location='Springfield, IL', fingerprints=fingerprints,
+                                 checkpoint=checkpoint, backend='sync', cache=False,
+                                 rate_limiter=HostRateLimiter(1000, capacity=1000))
+    scraper.base_url = server.url
+    try:
+        return scraper.search_companies(pages_to_scrape=3), scraper.page_stats
+    finally:
+        scraper.close()
+
+def test_fingerprints_ignore_markup_outside_the_listings():
+    page = results_page(5)
+    assert page_fingerprint(page) == page_fingerprint(page.replace(b'<title>', b'<title>Ad 123 '))
+    assert page_fingerprint(page) != page_fingerprint(results_page(4))
+    lead = {'company_name': 'Acme Plumbing Inc', 'phone': '+12125550100', 'address': '1 Main St'}
+    edited = dict(lead, phone='+12125550199')
+    assert lead_identity(lead) == lead_identity(edited)
+    assert lead_fingerprint(lead) != lead_fingerprint(edited)
+
+def test_delta_crawl_emits_only_changed_and_vanished_leads(tmp_path):
+    fixtures = tmp_path / 'fixtures'
+    fixtures.mkdir()
+    (fixtures / 'page.html').write_bytes(results_page(5))
+    fingerprints = FingerprintStore(tmp_path / 'fingerprints.db')
+    with StandInServer(latency=0, total_pages=1, fixtures_dir=fixtures) as server:
+        leads, _ = crawl(server, fingerprints)
+        assert [lead['change'] for lead in leads] == ['new'] * 5
+
+        # Unchanged page: nothing parsed or emitted, but the page is checkpointed
+        checkpoint = CheckpointStore(tmp_path / 'checkpoints.db')
+        leads, stats = crawl(server, fingerprints, checkpoint)
+        assert leads == []
+        assert stats['pages_unchanged'] == 1
+        assert checkpoint.completed_pages('plumber', 'Springfield, IL') == {1: False}
+        requests = server.httpd.request_count
+        assert crawl(server, fingerprints, checkpoint)[0] == []
+        assert server.httpd.request_count == requests
+        checkpoint.close()
+
+        # One lead edited, the last one gone
+        server.httpd.fixtures[0] = results_page(4, phone_edit=('(200) 555-0000', '(200) 555-0999'))
+        leads, stats = crawl(server, fingerprints)
+    changes = {lead['company_name']: lead['change'] for lead in leads}
+    assert changes == {'Plumber Company 0': 'changed', 'Plumber Company 4': 'vanished'}
+    assert next(lead for lead in leads if lead['change'] == 'changed')['phone'] == '+12005550999'
+    assert stats['leads_vanished'] == 1
+    fingerprints.close()
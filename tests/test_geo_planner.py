@@ -0,0 +1,30 @@
+from config import settings
+from core.geo_planner import QueryPlanner, YieldHistory, load_locations
+
+def test_single_location_without_a_locations_file():
+    assert settings.LOCATIONS_FILE is None
+    assert load_locations() == [settings.DEFAULT_LOCATION]
+
+def test_plan_orders_by_known_then_estimated_yield(tmp_path):
+    locations = tmp_path / 'locations.txt'
+    locations.write_text('New York, NY\nnew york ny\nNY\nChicago, IL\nBoston, MA\n')
+    assert load_locations(locations) == ['New York, NY', 'Chicago, IL', 'Boston, MA']
+
+    history = YieldHistory(tmp_path / 'yield.db')
+    history.record('Plumbers', 'New York, NY', 10, 50)
+    history.record('Plumbers', 'Chicago, IL', 10, 10)
+    history.record('Roofers', 'Chicago, IL', 10, 30)
+    planner = QueryPlanner(locations=load_locations(locations), history=history)
+    jobs = planner.plan(['Plumbers', 'Roofers', 'Dentists'])
+    assert list(zip(jobs, planner.expected_yields(jobs))) == [
+        (('Dentists', 'Boston, MA'), float('inf')),  # nothing to estimate from: measured first
+        (('Plumbers', 'New York, NY'), 5.0),
+        (('Dentists', 'New York, NY'), 5.0),  # the location's mean
+        (('Plumbers', 'Boston, MA'), 3.0),  # the term's mean
+        (('Roofers', 'New York, NY'), 3.0),
+        (('Roofers', 'Chicago, IL'), 3.0),
+        (('Roofers', 'Boston, MA'), 3.0),
+        (('Dentists', 'Chicago, IL'), 2.0),
+        (('Plumbers', 'Chicago, IL'), 1.0),
+    ]
+    history.close()
@@ -0,0 +1,36 @@
+import time
+
+from core.http_cache import ResponseCache
+
+URL = 'https://www.yellowpages.com/search'
+PARAMS = {'search_terms': 'plumber', 'page': 2}
+
+def test_stale_entry_revalidates_with_stored_validators(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=60, offline=False)
+    cache.store(URL, PARAMS, 200, {'ETag': '"abc"'}, b'<html>page</html>')
+    result, entry = cache.get(URL, PARAMS)
+    assert result.content == b'<html>page</html>'
+
+    entry.fetched_at = time.time() - 120
+    cache._write_entry(entry)
+    result, entry = cache.get(URL, PARAMS)
+    assert result is None
+    assert cache.revalidation_headers(entry) == {'If-None-Match': '"abc"'}
+    assert cache.revalidated(entry).content == b'<html>page</html>'
+
+def test_entry_with_evicted_body_is_a_miss(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=60, offline=False)
+    cache.store(URL, PARAMS, 200, {'ETag': '"abc"'}, b'<html>page</html>')
+    _, entry = cache.get(URL, PARAMS)
+    entry.fetched_at = time.time() - 120
+    cache._write_entry(entry)
+    for body in cache.bodies_dir.iterdir():
+        body.unlink()
+
+    result, entry = cache.get(URL, PARAMS)
+    assert (result, entry) == (None, None)
+    # No validators, so the server sends the full page instead of a 304
+    assert cache.revalidation_headers(entry) == {}
+    # The refetched page is stored again
+    cache.store(URL, PARAMS, 200, {'ETag': '"abc"'}, b'<html>page</html>')
+    assert cache.get(URL, PARAMS)[0].content == b'<html>page</html>'
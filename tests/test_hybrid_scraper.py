@@ -0,0 +1,19 @@
+from benchmarks.stand_in_server import render_results_page
+from core.fetch_result import FetchResult
+from scrapers.hybrid_scraper import browser_reason
+
+def response(html):
+    return FetchResult('https://www.yellowpages.com/search', 200, {}, html.encode('utf-8'), 'utf-8')
+
+def test_pages_with_listing_cards_need_no_browser():
+    assert browser_reason(response(render_results_page('plumber', 1))) is None
+    assert browser_reason(response("<div class='srp result featured'>Acme</div>")) is None
+
+def test_lookalike_classes_are_not_listings():
+    empty = render_results_page('plumber', 11)  # past the last page
+    assert browser_reason(response(empty)) == 'no listings'
+    page = '<div class="no-result">Try another search</div><span class="result-count">0</span>'
+    assert browser_reason(response(page)) == 'no listings'
+    assert browser_reason(response(page + '<p>Are you a robot?</p>')) == 'bot check'
+    assert browser_reason(response(page + '<p>No results found</p>')) is None
+    assert browser_reason(None) == 'request failed or blocked'
@@ -0,0 +1,44 @@
+
+from core.lead_store import LeadStore
+
+def make_lead(industry, **fields):
+    lead = {
+        'company_name': 'Aladdin Plumbing Corp.',
+        'phone': '+13473954715',
+        'website': 'https://www.aladdinplumbing.com',
+        'address': '100 Main St, Brooklyn, NY 11201',
+        'industry': industry,
+        'source': 'Yellow Pages',
+        'date_scraped': '2024-01-01 00:00:00',
+    }
+    lead.update(fields)
+    return lead
+
+def test_batch_with_duplicate_identities(tmp_path):
+    store = LeadStore(tmp_path / 'leads.db', batch_size=100)
+    store.write_many([
+        make_lead('Plumbers'),
+        make_lead('Electricians', email='info@aladdinplumbing.com', date_scraped='2024-02-01 00:00:00'),
+    ])
+    store.flush()
+
+    rows = store.query()
+    assert len(rows) == 1
+    assert rows[0]['industry'] == 'Electricians'
+    assert rows[0]['email'] == 'info@aladdinplumbing.com'
+    assert rows[0]['first_seen'] < rows[0]['last_seen']
+    # Indexed once, under the text the row ended up with
+    assert store.count('electricians') == 1
+    assert store.count('plumbers') == 0
+    store._conn.execute("INSERT INTO leads_fts (leads_fts) VALUES ('integrity-check')")
+    store.close()
+
+def test_reseen_lead_updates_in_place(tmp_path):
+    store = LeadStore(tmp_path / 'leads.db', batch_size=1)
+    store.write(make_lead('Plumbers'))
+    store.write(make_lead('Electricians', email_result='deliverable'))
+    assert store.count() == 1
+    assert store.count('electricians', verified=True) == 1
+    assert store.count(industry='plumbers', zip_prefix='112') == 0
+    assert store.count(industry='electricians', zip_prefix='112', has_website=True) == 1
+    store.close()
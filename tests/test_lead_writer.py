@@ -0,0 +1,52 @@
+import csv
+
+from config import settings
+from core.base_scraper import BaseScraper
+from utils.lead_writer import CSVLeadWriter, ParquetDatasetWriter, open_lead_writer
+
+def test_delta_dataset_is_separate_from_lead_history(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'LEAD_DATASET_DIR', tmp_path / 'leads_dataset')
+    leads = open_lead_writer(output_format='dataset')
+    delta = open_lead_writer(output_format='dataset', prefix='delta')
+    assert isinstance(delta, ParquetDatasetWriter)
+    assert leads.path == tmp_path / 'leads_dataset'
+    assert delta.path == tmp_path / 'delta_dataset'
+
+def test_dataset_read_keeps_columns_of_later_parts(tmp_path):
+    from utils.lead_writer import read_lead_dataset
+
+    writer = ParquetDatasetWriter(tmp_path / 'dataset', batch_size=1)
+    writer.write({'company_name': 'Acme Plumbing', 'phone': '+12125550100', 'industry': 'Plumbers'})
+    writer.write({'company_name': 'Apex Plumbing', 'phone': '+12125550101', 'industry': 'Plumbers',
+                  'email': 'info@apex.com', 'change': 'new'})
+    writer.close()
+
+    df = read_lead_dataset(tmp_path / 'dataset').sort_values('company_name')
+    assert {'email', 'change'} <= set(df.columns)
+    assert df['email'].tolist()[1] == 'info@apex.com'
+    assert df['change'].isna().tolist() == [True, False]
+    assert len(read_lead_dataset(tmp_path / 'dataset', industry='Plumbers')) == 2
+
+def read_csv_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+def test_csv_batches_are_on_disk_before_close(tmp_path):
+    leads = [{'company_name': f"Company {i}", 'phone': f"+1212555010{i}"} for i in range(7)]
+    writer = CSVLeadWriter(tmp_path / 'leads.csv', batch_size=3)
+    writer.write_many(leads)
+    # Two full batches flushed, one row still buffered; no close yet
+    rows = read_csv_rows(writer.path)
+    assert rows[0] == ['company_name', 'phone']
+    assert [row[0] for row in rows[1:]] == [f"Company {i}" for i in range(6)]
+    assert writer.rows_written == 6
+    writer.close()
+    rows = read_csv_rows(writer.path)
+    assert rows.count(['company_name', 'phone']) == 1
+    assert len(rows) == 8
+
+def test_save_to_csv_goes_through_the_writer(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'OUTPUT_DIR', tmp_path)
+    path = BaseScraper(cache=False).save_to_csv([{'company_name': 'Acme Plumbing', 'phone': '+12125550100'}])
+    assert path.parent == tmp_path
+    assert read_csv_rows(path) == [['company_name', 'phone'], ['Acme Plumbing', '+12125550100']]
@@ -0,0 +1,39 @@
+import argparse
+import json
+
+import run
+from config import settings
+from core.metrics import Metrics
+
+def test_exported_summary_feeds_run_stats(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(settings, 'METRICS_DIR', tmp_path / 'metrics')
+    monkeypatch.setattr(settings, 'METRICS_PROMETHEUS', True)
+    monkeypatch.setattr(settings, 'YIELD_DB', tmp_path / 'query_yield.db')
+    recorded = Metrics()
+    for _ in range(2):
+        with recorded.stage('parse'):
+            recorded.inc('cards_parsed', 15)
+    recorded.inc('pages_fetched', 3)
+    recorded.inc('fetch_requests', 3)
+    recorded.inc('cache_hits')
+
+    # A worker process's numbers are merged into the parent's
+    worker = Metrics()
+    worker.inc('leads_written', 12)
+    worker.observe('parse_seconds', 0.5)
+    recorded.merge(worker.drain())
+    assert worker.counters == {}
+
+    path = recorded.export()
+    summary = json.loads(path.read_text())
+    assert summary['counters'] == {'cache_hits': 1, 'cards_parsed': 30, 'fetch_requests': 3,
+                                   'leads_written': 12, 'pages_fetched': 3}
+    assert summary['cache_hit_rate'] == 0.25
+    assert summary['timings']['parse_seconds']['count'] == 3
+    assert summary['timings']['parse_seconds']['max'] == 0.5
+    assert 'leadbuilder_cards_parsed_total 30' in path.with_suffix('.prom').read_text()
+
+    assert run.stats(argparse.Namespace(top=5)) == 0
+    out = capsys.readouterr().out
+    assert "12 leads written, 3 pages fetched" in out
+    assert "cache hit rate 0.25" in out
@@ -0,0 +1,53 @@
+import threading
+import time
+
+import pytest
+
+from core.metrics import metrics
+from core.parse_pool import ParsePool
+
+def slow_square(n):
+    time.sleep(0.05)
+    metrics.inc('squared')
+    return n * n
+
+def fail(n):
+    raise ValueError(f"bad page {n}")
+
+def test_backpressure_order_and_failures():
+    pool = ParsePool(workers=2, max_pending=3)
+    running = peak = 0
+    lock = threading.Lock()
+    submit = pool._executor.submit
+
+    def counting_submit(*args):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        job = submit(*args)
+        job.add_done_callback(lambda job: finished())
+        return job
+
+    def finished():
+        nonlocal running
+        with lock:
+            running -= 1
+
+    pool._executor.submit = counting_submit
+    metrics.reset()
+    try:
+        futures = []
+        for n in range(12):
+            futures.append(pool.submit(slow_square, n))
+            time.sleep(0.005)  # a fetcher handing over pages as they arrive
+        failed = pool.submit(fail, 7)
+        assert [future.result(timeout=10) for future in futures] == [n * n for n in range(12)]
+        with pytest.raises(ValueError, match='bad page 7'):
+            failed.result(timeout=10)
+    finally:
+        pool.close()
+    # The producer outran two workers, so submit had to block
+    assert peak == 3
+    # Worker metrics come back to the parent
+    assert metrics.counters['squared'] == 12
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from config import settings
+from core.rate_controller import AdaptiveRateController, parse_retry_after, percentile
+
+URL = 'http://example.test/search'
+
+@pytest.fixture
+def controller(monkeypatch):
+    monkeypatch.setattr(settings, 'ADAPTIVE_INTERVAL', 0)
+    monkeypatch.setattr(settings, 'ADAPTIVE_RATE_STEP', 0.5)
+    monkeypatch.setattr(settings, 'ADAPTIVE_LATENCY_TARGET', 3.0)
+    return AdaptiveRateController(2.0, capacity=100, min_rate=0.25, max_rate=3.0, max_concurrency=4)
+
+def respond(controller, status, latency=0.1, times=1):
+    for _ in range(times):
+        controller.acquire(URL)
+        controller.release(URL, latency, status)
+    return controller.stats()['example.test']
+
+def test_healthy_responses_raise_rate_and_concurrency_additively(controller):
+    assert respond(controller, 200, times=4)['rate'] == 2.0
+    host = respond(controller, 200)
+    assert (host['rate'], host['concurrency']) == (2.5, 3)
+    host = respond(controller, 200, times=10)
+    assert (host['rate'], host['concurrency']) == (3.0, 4)
+
+@pytest.mark.parametrize('status', [403, 429, 503])
+def test_throttle_statuses_halve_rate_and_concurrency(controller, status):
+    host = respond(controller, status)
+    assert (host['rate'], host['concurrency'], host['slowdowns']) == (1.0, 1, 1)
+    assert respond(controller, status, times=3)['rate'] == 0.25
+
+def test_request_errors_do_not_count_as_health(controller):
+    host = respond(controller, 404, times=10)
+    assert (host['rate'], host['concurrency'], host['slowdowns']) == (2.0, 2, 0)
+    assert host['p95'] is None
+
+def test_high_p95_latency_slows_down(controller):
+    respond(controller, 200, latency=0.5, times=3)
+    host = respond(controller, 200, latency=10.0, times=2)
+    assert (host['rate'], host['slowdowns']) == (1.0, 1)
+    assert host['p50'] == 0.5
+    assert host['p95'] == percentile([0.5] * 3 + [10.0] * 2, 95) > 3.0
+    assert percentile(list(range(1, 101)), 95) == pytest.approx(95.05)
+
+def test_retry_after(controller):
+    assert parse_retry_after('7') == 7.0
+    assert parse_retry_after('-3') == 0.0
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 < parse_retry_after(format_datetime(when, usegmt=True)) <= 30
+    controller.pause(URL, 5)
+    assert controller.bucket_for(URL)._reserve() >= 5
+
+def test_async_waiters_wake_on_release_and_give_back_cancelled_slots(controller):
+    async def scenario():
+        await controller.acquire_async(URL)
+        await controller.acquire_async(URL)
+        waiter = asyncio.ensure_future(controller.acquire_async(URL))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        # Released from another thread, as the sync scrapers do
+        threading.Thread(target=controller.release, args=(URL, 0.1, 200)).start()
+        await asyncio.wait_for(waiter, 1)
+
+        cancelled = asyncio.ensure_future(controller.acquire_async(URL))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+        # Cancelled while waiting for a token after taking the slot
+        controller.release(URL, 0.1, 200)
+        controller.bucket_for(URL).pause(60)
+        blocked = asyncio.ensure_future(controller.acquire_async(URL))
+        await asyncio.sleep(0.01)
+        blocked.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await blocked
+
+    asyncio.run(scenario())
+    state = controller._state(URL)
+    assert state.in_flight == 1
+    assert state.waiters == []
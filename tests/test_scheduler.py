@@ -0,0 +1,75 @@
+import pickle
+from collections import Counter
+
+import pytest
+
+from benchmarks.stand_in_server import StandInServer
+from config import settings
+from core.dedup_index import DedupIndex
+from core.scheduler import SharedResources, TermScheduler
+
+TERMS = ['plumber', 'electrician', 'roofer', 'broken', 'locksmith']
+
+@pytest.fixture
+def server(monkeypatch):
+    with StandInServer(latency=0, cards_per_page=4, total_pages=1) as server:
+        monkeypatch.setattr(settings, 'YELLOW_PAGES_BASE_URL', server.url)
+        monkeypatch.setattr(settings, 'HTTP_CACHE_ENABLED', False)
+        monkeypatch.setattr(settings, 'DELTA_CRAWL', False)
+        monkeypatch.setattr(settings, 'BROWSER_FALLBACK', False)
+        monkeypatch.setattr(settings, 'ADAPTIVE_RATE_CONTROL', False)
+        monkeypatch.setattr(settings, 'HOST_RATE_LIMIT', 1000)
+        monkeypatch.setattr(settings, 'HOST_BURST', 1000)
+        monkeypatch.setattr(settings, 'PARSE_WORKERS', 0)
+        yield server
+
+def test_thread_mode_runs_every_term_once_despite_failures(server, monkeypatch):
+    calls = Counter()
+    scrape = SharedResources.scrape
+
+    def flaky_scrape(resources, search_term, pages_to_scrape, location=None):
+        calls[search_term] += 1
+        if search_term == 'broken':
+            raise RuntimeError("parser crashed")
+        return scrape(resources, search_term, pages_to_scrape, location)
+
+    monkeypatch.setattr(SharedResources, 'scrape', flaky_scrape)
+    scheduler = TermScheduler(workers=2, mode='thread', pages_to_scrape=1, backend='sync',
+                              use_checkpoints=False)
+    try:
+        results = dict(scheduler.run(TERMS))
+    finally:
+        scheduler.close()
+    assert calls == Counter(TERMS)
+    assert {term: len(leads) for term, leads in results.items()} == {
+        term: 0 if term == 'broken' else 4 for term in TERMS
+    }
+    assert scheduler.page_stats['pages_fetched'] == 4
+
+def test_process_mode_scrapes_in_workers(server, tmp_path):
+    dedup = DedupIndex(tmp_path / 'dedup.db')
+    scheduler = TermScheduler(workers=2, mode='process', pages_to_scrape=1, backend='sync',
+                              use_checkpoints=False, dedup=dedup)
+    try:
+        results = dict(scheduler.run(TERMS[:3]))
+    finally:
+        scheduler.close()
+        dedup.close()
+    assert {term: len(leads) for term, leads in results.items()} == dict.fromkeys(TERMS[:3], 4)
+
+def test_shared_resources_pickle_as_fresh_copies(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'CHECKPOINT_DB', tmp_path / 'checkpoints.db')
+    resources = SharedResources(workers=2, rate_share=0.5, backend='sync', use_checkpoints=True,
+                                dedup=DedupIndex(tmp_path / 'dedup.db'))
+    copy = pickle.loads(pickle.dumps(resources))
+    try:
+        assert copy.session is not resources.session
+        assert copy.checkpoint is not None and copy.checkpoint is not resources.checkpoint
+        assert copy.dedup.path == resources.dedup.path
+        assert copy.rate_limiter.rate == resources.rate_limiter.rate == 500
+        leads, page_stats = copy.scrape('plumber', 1)
+        assert len(leads) == 4
+    finally:
+        for shared in (copy, resources):
+            shared.close()
+            shared.dedup.close()
@@ -0,0 +1,6 @@
+from benchmarks.bench_startup import DEFAULT_BUDGET_MS, heavy_imports, help_import_times
+
+def test_help_imports_stay_light_and_within_budget():
+    total, times = help_import_times(repeat=3)
+    assert heavy_imports(times) == []
+    assert total < DEFAULT_BUDGET_MS
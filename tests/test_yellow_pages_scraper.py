@@ -0,0 +1,89 @@
+import pytest
+
+from benchmarks.stand_in_server import StandInServer
+from config import settings
+from core.dedup_index import DedupIndex
+from core.rate_limiter import HostRateLimiter
+from scrapers.hybrid_scraper import HybridYellowPagesScraper
+from scrapers.yellow_pages_scraper import YellowPagesScraper
+
+class CountingRateLimiter(HostRateLimiter):
+    def __init__(self):
+        super().__init__(1000, capacity=1000)
+        self.empty_pages = 0
+
+    def record_empty(self, url):
+        self.empty_pages += 1
+
+class FailingBrowserPool:
+    def fetch(self, url):
+        return None
+
+def make_scraper(server, backend, scraper_class=YellowPagesScraper, **kwargs):
+    kwargs.setdefault('rate_limiter', HostRateLimiter(1000, capacity=1000))
+    scraper = scraper_class('plumber', backend=backend, cache=False, **kwargs)
+    scraper.base_url = server.url
+    return scraper
+
+@pytest.mark.parametrize('backend', ['sync', 'async'])
+def test_seen_page_cutoff_fetches_no_page_it_drops(tmp_path, monkeypatch, backend):
+    monkeypatch.setattr(settings, 'SEEN_PAGES_CUTOFF', 2)
+    monkeypatch.setattr(settings, 'PAGE_FETCH_WINDOW', 3)
+    dedup = DedupIndex(tmp_path / 'dedup.db')
+    with StandInServer(latency=0, cards_per_page=5, total_pages=6) as server:
+        scraper = make_scraper(server, backend)
+        dedup.filter_new(scraper.search_companies(pages_to_scrape=6))
+        scraper.close()
+        assert server.httpd.request_count == 6
+
+        # Every lead is known now: pages 1 and 2 end the term
+        scraper = make_scraper(server, backend, dedup=dedup)
+        assert len(scraper.search_companies(pages_to_scrape=6)) == 10
+        scraper.close()
+    assert server.httpd.request_count == 8
+    assert scraper.page_stats['pages_fetched'] == 2
+    assert scraper.page_stats['pages_seen_cutoff'] == 4
+    assert scraper.page_stats['pages_discarded'] == 0
+    dedup.close()
+
+def test_pages_fetched_past_the_cutoff_are_reported(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'SEEN_PAGES_CUTOFF', 2)
+    monkeypatch.setattr(settings, 'PAGE_FETCH_WINDOW', 4)
+    dedup = DedupIndex(tmp_path / 'dedup.db')
+    with StandInServer(latency=0, cards_per_page=5, total_pages=8) as server:
+        scraper = make_scraper(server, 'sync')
+        leads = scraper.search_companies(pages_to_scrape=3)
+        scraper.close()
+        dedup.filter_new(leads[5:])  # pages 2 and 3
+
+        # Page 1 has new leads, so pages 2-5 go out as one window and the
+        # cutoff at page 3 leaves 4 and 5 unused
+        scraper = make_scraper(server, 'async', dedup=dedup)
+        scraper.search_companies(pages_to_scrape=8)
+        scraper.close()
+    assert scraper.page_stats['pages_fetched'] == 5
+    assert scraper.page_stats['pages_seen_cutoff'] == 3
+    assert scraper.page_stats['pages_discarded'] == 2
+    dedup.close()
+
+@pytest.mark.parametrize('scraper_class, browser_pool', [
+    (YellowPagesScraper, None), (HybridYellowPagesScraper, FailingBrowserPool()),
+])
+def test_only_unexpected_empty_pages_count_against_the_host(monkeypatch, scraper_class, browser_pool):
+    kwargs = {'browser_pool': browser_pool} if browser_pool else {}
+    with StandInServer(latency=0, cards_per_page=5, total_pages=3) as server:
+        # No result count: walking on to the empty page 4 is how the search ends
+        limiter = CountingRateLimiter()
+        scraper = make_scraper(server, 'sync', scraper_class, rate_limiter=limiter, **kwargs)
+        monkeypatch.setattr(scraper.parser, 'page_count', lambda content: None)
+        assert len(scraper.search_companies(pages_to_scrape=5)) == 15
+        scraper.close()
+        assert limiter.empty_pages == 0
+
+        # A result count of 6 pages makes the same empty page 4 a warning sign, counted once
+        limiter = CountingRateLimiter()
+        scraper = make_scraper(server, 'sync', scraper_class, rate_limiter=limiter, **kwargs)
+        monkeypatch.setattr(scraper.parser, 'page_count', lambda content: 6)
+        assert len(scraper.search_companies(pages_to_scrape=6)) == 15
+        scraper.close()
+        assert limiter.empty_pages == 1
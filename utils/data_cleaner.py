@@ -1,7 +1,9 @@
 
 import re
+import sys
 import pandas as pd
 from typing import Dict, Any
+from urllib.parse import urlsplit
 
 def clean_phone_number(phone: str) -> str:
     """Clean and standardize phone numbers"""
@@ -30,6 +32,39 @@ def clean_website_url(url: str) -> str:
         
     return url
 
+def extract_domain(url: str) -> str:
+    """Host of a website URL without 'www.'; '' if there is no usable host"""
+    try:
+        host = urlsplit(clean_website_url(url)).hostname or ''
+    except ValueError:
+        return ''
+    if host.startswith('www.'):
+        host = host[4:]
+    return host if '.' in host else ''
+
+# Legal-form words dropped from the end of company names before comparing them
+COMPANY_SUFFIXES = frozenset({
+    'co', 'company', 'corp', 'corporation', 'inc', 'incorporated',
+    'llc', 'llp', 'ltd', 'limited', 'pc', 'pllc', 'plc',
+})
+NAME_TOKEN_RE = re.compile(r'[^\W_]+')
+
+def normalize_company_name(name: str) -> str:
+    """Comparable form of a company name: 'Aladdin Plumbing Corp.' -> 'aladdin plumbing'"""
+    if not name or name.strip().upper() == 'N/A':
+        return ''
+    tokens = NAME_TOKEN_RE.findall(name.lower().replace('&', ' and '))
+    # 'Smith & Co' keeps its 'co'; only trailing legal forms are dropped
+    while len(tokens) > 1 and tokens[-1] in COMPANY_SUFFIXES and tokens[-2] != 'and':
+        tokens.pop()
+    return ' '.join(tokens)
+
+def clean_address_text(address: Any) -> str:
+    """Collapse whitespace in an address; non-string values become ''"""
+    if isinstance(address, str):
+        return ' '.join(address.split())
+    return ''
+
 def clean_company_data(company_data: Dict[str, Any]) -> Dict[str, Any]:
     """Clean all company data fields"""
     cleaned_data = company_data.copy()
@@ -39,11 +74,102 @@ def clean_company_data(company_data: Dict[str, Any]) -> Dict[str, Any]:
     cleaned_data['company_name'] = company_data.get('company_name', '').strip()
     cleaned_data['industry'] = company_data.get('industry', '').strip().title()
     
-    # Clean address
-    address = company_data.get('address', '')
-    if isinstance(address, str):
-        cleaned_data['address'] = ' '.join(address.split())
-    else:
-        cleaned_data['address'] = ''
+    cleaned_data['address'] = clean_address_text(company_data.get('address', ''))
     
-    return cleaned_data
\ No newline at end of file
+    return cleaned_data
+
+def clean_lead(lead):
+    """clean_company_data for a Lead, in place instead of on a copy"""
+    lead.phone = clean_phone_number(lead.phone)
+    lead.website = clean_website_url(lead.website)
+    lead.company_name = lead.company_name.strip()
+    lead.industry = sys.intern(lead.industry.strip().title())
+    lead.address = clean_address_text(lead.address)
+    return lead
+
+# Python's str.isspace() characters within ASCII, as a regex class both
+# Python's re and pyarrow's RE2 read the same way
+ASCII_WHITESPACE = ' \t\n\x0b\x0c\r\x1c\x1d\x1e\x1f'
+ASCII_WHITESPACE_RUN = '[' + ''.join(f'\\x{ord(c):02x}' for c in ASCII_WHITESPACE) + ']+'
+
+def _as_text(values: pd.Series) -> pd.Series:
+    """Values as strings: missing ones '', numbers as their text.
+
+    read_csv parses a column of phone numbers like +12125550100 as
+    integers (floats once one is missing), so a re-read export has them.
+    """
+    if pd.api.types.is_string_dtype(values.dtype) and values.dtype != object:
+        return values.fillna('')
+
+    def text(value):
+        if isinstance(value, str):
+            return value
+        if pd.isna(value):
+            return ''
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+    return values.map(text).astype(object)
+
+# The clean_company_data rules as pandas string operations. ``space`` is
+# None for Python str semantics, or ASCII_WHITESPACE where only ASCII
+# whitespace can occur
+
+def _clean_phones(values, space):
+    digits = values.str.replace(r'[^\d+]', '', regex=True)
+    length = digits.str.len()
+    has_country_code = digits.str.startswith('1') & (length == 11)
+    needs_country_code = ~has_country_code & (length == 10)
+    return digits.mask(has_country_code, '+' + digits).mask(needs_country_code, '+1' + digits)
+
+def _clean_websites(values, space):
+    url = values.str.strip(space).str.lower()
+    needs_scheme = (url != '') & ~url.str.startswith(('http://', 'https://'))
+    return url.mask(needs_scheme, 'https://' + url)
+
+def _clean_addresses(values, space):
+    # ' '.join(address.split())
+    run = ASCII_WHITESPACE_RUN if space else r'\s+'
+    return values.str.replace(run, ' ', regex=True).str.strip(space)
+
+COLUMN_RULES = {
+    'phone': _clean_phones,
+    'website': _clean_websites,
+    'company_name': lambda values, space: values.str.strip(space),
+    'industry': lambda values, space: values.str.strip(space).str.title(),
+    'address': _clean_addresses,
+}
+
+def _clean_column(values: pd.Series, rule) -> pd.Series:
+    """Apply a rule on Arrow-backed strings where they behave like Python's.
+
+    pyarrow's string kernels and RE2 agree with str and re on ASCII text
+    only, so non-ASCII values go through the rule on Python objects.
+    Without pyarrow every value does.
+    """
+    text = _as_text(values)
+    try:
+        fast = text.astype('string[pyarrow]')
+    except ImportError:
+        return rule(text.astype(object), None)
+    # A regex, since pandas' str.isascii isn't an Arrow kernel
+    non_ascii = fast.str.contains(r'[^\x00-\x7f]', regex=True)
+    if not non_ascii.any():
+        return rule(fast, ASCII_WHITESPACE)
+    cleaned = rule(fast.mask(non_ascii, ''), ASCII_WHITESPACE)
+    cleaned[non_ascii] = rule(text[non_ascii].astype(object), None)
+    return cleaned
+
+def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """Vectorized clean_company_data over a whole DataFrame of leads.
+
+    Applies the same phone, URL, name, industry and address rules column
+    by column and gives exactly the values per-row cleaning would. Missing
+    values are treated as empty strings and numbers (as read_csv parses
+    phone columns) as their text.
+    """
+    cleaned = df.copy()
+    for column, rule in COLUMN_RULES.items():
+        values = df[column] if column in df else pd.Series('', index=df.index, dtype=object)
+        cleaned[column] = _clean_column(values, rule)
+    return cleaned
@@ -0,0 +1,118 @@
+
+import sys
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+MISSING = sys.intern("N/A")
+
+def _timestamp(value) -> Optional[float]:
+    """Seconds since the epoch from a float, datetime or ISO string"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return None
+
+class Lead:
+    """One scraped company, in a fraction of the memory of a dict row.
+
+    Fields live in slots, ``industry`` and ``source`` are interned so every
+    lead of a term shares one string, and ``date_scraped`` is a float
+    (seconds since the epoch) shared by all cards of a page. Fields beyond
+    the fixed ones (an email from verification, say) go to ``extra``.
+
+    Leads read like dicts (``lead['phone']``, ``lead.get('website')``,
+    ``dict(lead)``), so code that handled dict rows keeps working;
+    ``to_dict`` gives the output form with a readable ``date_scraped``.
+    """
+
+    FIELDS = ('company_name', 'phone', 'website', 'address', 'industry', 'source', 'date_scraped')
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, company_name=MISSING, phone=MISSING, website=MISSING, address=MISSING,
+                 industry='', source='', date_scraped=None, **extra):
+        self.company_name = company_name
+        self.phone = phone
+        self.website = website
+        self.address = address
+        self.industry = sys.intern(industry)
+        self.source = sys.intern(source)
+        self.date_scraped = _timestamp(date_scraped)
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Lead':
+        return cls(**data)
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            setattr(self, key, _timestamp(value) if key == 'date_scraped' else value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        return key in self.FIELDS or bool(self.extra and key in self.extra)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> List[str]:
+        return list(self.FIELDS) + list(self.extra or ())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.FIELDS) + len(self.extra or ())
+
+    def __eq__(self, other):
+        if not isinstance(other, Lead):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"Lead({self.company_name!r}, {self.industry!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict row as written to CSV, with ``date_scraped`` as local time text"""
+        row = {name: getattr(self, name) for name in self.FIELDS}
+        if self.date_scraped is not None:
+            row['date_scraped'] = str(datetime.fromtimestamp(self.date_scraped))
+        if self.extra:
+            row.update(self.extra)
+        return row
+
+def as_dict(lead) -> Dict[str, Any]:
+    """Output row of a Lead, or a dict row unchanged"""
+    return lead.to_dict() if isinstance(lead, Lead) else lead
+
+def lead_columns(leads: Iterable) -> Dict[str, list]:
+    """Column lists of many leads (Leads or dict rows), fields in first-seen order.
+
+    ``date_scraped`` of Leads stays a float here; output code picks the type.
+    """
+    leads = list(leads)
+    names = {}
+    for lead in leads:
+        if isinstance(lead, Lead) and not lead.extra:
+            names.update(dict.fromkeys(Lead.FIELDS))
+        else:
+            names.update(dict.fromkeys(lead.keys()))
+    return {name: [lead.get(name) for lead in leads] for name in names}
@@ -0,0 +1,215 @@
+
+import csv
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import settings
+from utils.lead import as_dict, lead_columns
+
+logger = logging.getLogger(__name__)
+
+class LeadWriter:
+    """Buffer leads and append them to disk in batches.
+
+    Every flush leaves a readable file behind, so rows written before a
+    crash survive and memory stays bounded by ``batch_size``.
+    """
+
+    def __init__(self, path, batch_size: Optional[int] = None):
+        self.path = Path(path)
+        self.batch_size = batch_size or settings.WRITE_BATCH_SIZE
+        self.rows_written = 0
+        self._buffer: List[Dict[str, Any]] = []
+
+    def write(self, lead: Dict[str, Any]):
+        self._buffer.append(lead)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, leads: Iterable[Dict[str, Any]]):
+        for lead in leads:
+            self.write(lead)
+
+    def flush(self):
+        if not self._buffer:
+            return
+        self._write_batch(self._buffer)
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class CSVLeadWriter(LeadWriter):
+    """Append leads to a single CSV file, writing the header with the first batch"""
+
+    def __init__(self, path, batch_size: Optional[int] = None):
+        super().__init__(path, batch_size)
+        self._file = None
+        self._writer = None
+
+    def _write_batch(self, batch):
+        rows = [as_dict(lead) for lead in batch]
+        if self._file is None:
+            self._file = open(self.path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.DictWriter(
+                self._file, fieldnames=list(rows[0]), extrasaction='ignore', lineterminator='\n'
+            )
+            self._writer.writeheader()
+        self._writer.writerows(rows)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        super().close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class ParquetLeadWriter(LeadWriter):
+    """Write each batch as its own part file inside a Parquet dataset directory.
+
+    A Parquet file is only readable once its footer is written, so one
+    part per flush is what keeps already-written rows safe on a crash.
+    """
+
+    def _write_batch(self, batch):
+        import pyarrow.parquet as pq
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        part = self.path / f"part-{self.rows_written:012d}.parquet"
+        pq.write_table(lead_table(batch), part)
+
+class ParquetDatasetWriter(LeadWriter):
+    """Append leads to one long-lived Parquet dataset, partitioned by run date and industry.
+
+    Files go to ``run_date=YYYY-MM-DD/industry=<name>/`` (hive layout), so
+    a query for one industry only opens that industry's directories. The
+    low-cardinality columns are dictionary encoded and ``date_scraped``
+    becomes a second-resolution timestamp, which is most of the size win
+    over CSV. Every flush adds new part files and never rewrites old ones.
+    """
+
+    def __init__(self, path, batch_size: Optional[int] = None):
+        super().__init__(path, batch_size)
+        started = datetime.now()
+        self.run_date = started.strftime('%Y-%m-%d')
+        # Part names are unique per run so concurrent or later runs never collide
+        self._run_id = f"{started.strftime('%H%M%S')}-{os.getpid()}"
+
+    def _write_batch(self, batch):
+        import pyarrow.dataset as ds
+
+        table = lead_table(batch, self.run_date)
+        ds.write_dataset(
+            table,
+            self.path,
+            format='parquet',
+            partitioning=ds.partitioning(table.select(PARTITION_COLUMNS).schema, flavor='hive'),
+            basename_template=f"part-{self._run_id}-{self.rows_written:012d}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore',
+            file_options=ds.ParquetFileFormat().make_write_options(compression='zstd'),
+        )
+
+# Columns with a handful of distinct values, stored as dictionary indices
+DICTIONARY_COLUMNS = ('industry', 'source', 'category')
+PARTITION_COLUMNS = ['run_date', 'industry']
+
+def _parse_timestamp(value):
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value)
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+def lead_table(leads: List[Any], run_date: Optional[str] = None):
+    """Arrow table of leads (Leads or dict rows) with compact column types.
+
+    With ``run_date``, the dataset's partition columns are added too.
+    """
+    import pyarrow as pa
+
+    columns = lead_columns(leads)
+    dates = columns.pop('date_scraped', None)
+    table = pa.table(columns)
+    for name in DICTIONARY_COLUMNS:
+        if name in table.column_names:
+            index = table.column_names.index(name)
+            column = table.column(name).cast(pa.string()).dictionary_encode()
+            table = table.set_column(index, name, column)
+    if dates is not None:
+        table = table.append_column(
+            'date_scraped', pa.array([_parse_timestamp(value) for value in dates], type=pa.timestamp('s'))
+        )
+    if run_date is None:
+        return table
+    if 'industry' not in table.column_names:
+        table = table.append_column('industry', pa.array([''] * len(table)).dictionary_encode())
+    return table.append_column('run_date', pa.array([run_date] * len(table)).dictionary_encode())
+
+def read_lead_dataset(path=None, industry: Optional[str] = None, columns: Optional[List[str]] = None):
+    """Load a lead dataset into a DataFrame, optionally one industry only.
+
+    The industry filter is applied to the partition directories, so other
+    industries' files are never opened. Columns only some parts have (the
+    enrichment columns, a delta's ``change``) are kept, empty elsewhere.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    path = path or settings.LEAD_DATASET_DIR
+    partitioning = ds.partitioning(flavor='hive', dictionaries='infer')
+    dataset = ds.dataset(path, format='parquet', partitioning=partitioning)
+    # The inferred schema is the first part's; later parts may have more columns
+    schema = pa.unify_schemas(
+        [dataset.schema] + [fragment.physical_schema for fragment in dataset.get_fragments()],
+        promote_options='permissive',
+    )
+    dataset = ds.dataset(path, schema=schema, format='parquet', partitioning=partitioning)
+    expression = ds.field('industry') == industry if industry is not None else None
+    return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+WRITERS = {
+    'csv': CSVLeadWriter,
+    'parquet': ParquetLeadWriter,
+    'dataset': ParquetDatasetWriter,
+}
+
+def open_lead_writer(path=None, output_format: Optional[str] = None,
+                     batch_size: Optional[int] = None, prefix: str = 'leads') -> LeadWriter:
+    """Create a writer for ``output_format``.
+
+    Defaults to a timestamped file in OUTPUT_DIR, or for 'dataset' to the
+    shared LEAD_DATASET_DIR that every run appends to. Other prefixes
+    (delta changesets) get a dataset of their own next to it, so they
+    never mix with the full lead history.
+    """
+    output_format = output_format or settings.OUTPUT_FORMAT
+    if output_format not in WRITERS:
+        raise ValueError(f"Unknown output format: {output_format}")
+
+    if path is None and output_format == 'dataset':
+        path = settings.LEAD_DATASET_DIR
+        if prefix != 'leads':
+            path = path.with_name(f"{prefix}_dataset")
+    elif path is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = settings.OUTPUT_DIR / f"{prefix}_{timestamp}.{output_format}"
+    return WRITERS[output_format](path, batch_size)
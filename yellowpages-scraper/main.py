@@ -45,6 +45,12 @@
 #     scraper.scrape(search_term="plumber", location="New York", pages=2)
 #     scraper.close()
 
+import sys
+from pathlib import Path
+
+# The browser pool lives in the main package one directory up
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
 from scrapers.yellow_pages_scraper import YellowPagesScraper
 
 if __name__ == "__main__":
@@ -125,63 +125,45 @@
 
 # scrapers/yellow_pages_scraper.py
 
-import time
-import random
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium_stealth import stealth
 from bs4 import BeautifulSoup
 
+from core.browser_pool import BrowserPool
+from core.rate_controller import create_rate_limiter
+
 class YellowPagesScraper:
-    def __init__(self, headless=True, delay_range=(2,5)):
-        self.delay_range = delay_range
-
-        options = Options()
-        if headless:
-            options.add_argument("--headless=new")  # new headless mode
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-extensions")
-        options.add_argument("--start-maximized")
-
-        # Random user-agent
-        USER_AGENTS = [
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.5 Safari/605.1.15",
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:115.0) Gecko/20100101 Firefox/115.0",
-        ]
-        options.add_argument(f"user-agent={random.choice(USER_AGENTS)}")
-
-        self.driver = webdriver.Chrome(service=Service(), options=options)
-
-        # Apply stealth
-        stealth(
-            self.driver,
-            languages=["en-US", "en"],
-            vendor="Google Inc.",
-            platform="Win32",
-            webgl_vendor="Intel Inc.",
-            renderer="Intel Iris OpenGL Engine",
-            fix_hairline=True,
+    def __init__(self, headless=True, delay_range=None, workers=None, pool=None,
+                 max_pages_per_driver=None):
+        # Warm drivers shared across scrape() calls; a pool passed in is not closed here.
+        # Page loads are paced by the adaptive per-host controller unless a
+        # fixed delay_range, e.g. (2, 5), is given
+        self.pool = pool or BrowserPool(
+            workers=workers,
+            max_pages_per_driver=max_pages_per_driver,
+            headless=headless,
+            delay_range=delay_range,
+            rate_limiter=None if delay_range else create_rate_limiter(),
         )
-
-    def random_delay(self):
-        time.sleep(random.uniform(*self.delay_range))
+        self._owns_pool = pool is None
+        self.base_url = "https://www.yellowpages.com"
 
     def scrape(self, search_term="plumber", location="New York", pages=2):
         all_data = []
 
-        for page in range(1, pages + 1):
-            url = f"https://www.yellowpages.com/search?search_terms={search_term}&geo_location_terms={location}&page={page}"
+        urls = [
+            f"{self.base_url}/search?search_terms={search_term}&geo_location_terms={location}&page={page}"
+            for page in range(1, pages + 1)
+        ]
+        for url in urls:
             print(f"🔎 Scraping: {url}")
 
-            self.driver.get(url)
-            self.random_delay()  # human-like wait
+        # Pages load in parallel across the pool's browsers, results come back in order
+        for url, response in zip(urls, self.pool.fetch_many(urls)):
+            if response is None:
+                print(f"⚠️ Failed to load {url}")
+                continue
 
-            soup = BeautifulSoup(self.driver.page_source, "lxml")
+            soup = BeautifulSoup(response.content, "lxml")
 
             listings = soup.find_all("div", class_="result")  # adjust if needed
 
@@ -202,8 +184,6 @@ class YellowPagesScraper:
                 }
                 all_data.append(data)
 
-            self.random_delay()  # human-like wait between pages
-
         df = pd.DataFrame(all_data)
         if not df.empty:
             df.to_csv("yellowpages_data.csv", index=False)
@@ -212,4 +192,5 @@ class YellowPagesScraper:
             print("⚠️ No new data scraped.")
 
     def close(self):
-        self.driver.quit()
+        if self._owns_pool:
+            self.pool.close()